@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse
+import numpy as np
+
+import FuelFinder_v2
+from FuelE85Ratio import solve, refillCalcul, ethanolOf
+from SnapshotCache import maxAge
+
+############################# [ VARIABLES ] #############################
+
+bases = {"E10": "E10", "SP95": "E5", "SP98": "E5"}  # Fuels of the stations completing the E85, and their ethanol grade
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 BlendPlanner.py")  # Create an object to get args
+    # Options of this program
+    parser.add_argument("-C", "-c", "--city", dest="address", help="Enter the city, the zipcode or the address you are")
+    parser.add_argument("--coords", nargs=2, dest="coords", help="Enter the latitude and longitude you are instead of an address", type=float)
+    parser.add_argument("-D", "-d", "--distance", dest="dist", help="Enter the distance you want in kilometer (<=20km) (default: 5)", type=float, default=5)
+    parser.add_argument("-L", "-l", "--lasting", dest="lasting", help="Enter the percentage of fuel lasting (default: 20)", type=float, default=20)
+    parser.add_argument("-A", "-a", "--capacity", dest="capacity", help="Enter the fuel capacity in liters (default: 50)", type=float, default=50)
+    parser.add_argument("-E", "-e", "--ethanol", nargs="+", dest="ethanol", help="Enter the percentage of ethanol you want, or a range MIN MAX (default: 30 85)", type=float, default=[30, 85])
+    parser.add_argument("-T", "-t", "--top", dest="top", help="Enter the number of stations you want (default: 3)", type=int, default=3)
+    parser.add_argument("--offline", dest="offline", help="Use the national snapshot already cached (by FuelServer, PriceHistory or the batch mode) without any request", action="store_true")
+    parser.add_argument("--max-age", dest="maxAge", help=f"Seconds during which the cached data is used without asking the server (default: {maxAge})", type=float, default=maxAge)
+    options = parser.parse_args()
+
+    if (options.address is None) == (options.coords is None):  # Exactly one location
+        parser.error("\n\t[-] Error in the command : please specify a city/zipcode/address or coordinates")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if len(options.ethanol) > 2 or not all(0 <= ethanol <= 100 for ethanol in options.ethanol) or not 0 <= options.lasting <= 100:
+        parser.error("\n\t[-] Error in the command : please specify percentages between 0 and 100 (one ethanol target or a range MIN MAX)")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.dist > 20 or options.top < 1:
+        parser.error("\n\t[-] Error in the command : please specify a distance (in km) under 20 and a number of stations above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    return options
+
+# --------------------------------------------------
+# Function to get the (low, high) liters of E85 reaching an ethanol range with a base fuel, None if out of reach
+def e85Range(fuelLasting, capacity, ethanolMin, ethanolMax, base):
+    refill = refillCalcul(fuelLasting, capacity)
+    _, low, _ = solve(fuelLasting, capacity, ethanolMin, ethanolOf[bases[base]])  # The liters of E85 grow with the ethanol wanted
+    _, high, _ = solve(fuelLasting, capacity, ethanolMax, ethanolOf[bases[base]])
+    low, high = max(float(low), 0.0), min(float(high), refill)
+    return (low, high) if low <= high else None
+
+# --------------------------------------------------
+# Function to get the cheapest blend at every station : {rows, base, fuelLiters, e85Liters, cost}, rows without blend are dropped
+# The cost is linear in the liters of E85 on a range : each station x base fuel is an LP solved at one end of the range
+def planBlends(stations, rows, fuelLasting, capacity, ethanolMin, ethanolMax):
+    refill = refillCalcul(fuelLasting, capacity)
+    e85Prices = stations.prices["E85"][rows]
+    costs = np.full((len(bases), len(rows)), np.inf)  # Cheapest cost of each base fuel at each station
+    e85Liters = np.zeros((len(bases), len(rows)))
+    for i, base in enumerate(bases):
+        reach = e85Range(fuelLasting, capacity, ethanolMin, ethanolMax, base)
+        if reach is None:
+            continue
+        basePrices = stations.prices[base][rows]
+        for e85 in reach:  # Both ends of the range, for every station at once
+            fuelLiters = refill - e85
+            cost = np.zeros(len(rows))  # Stays an array when nothing is bought (full tank)
+            if fuelLiters > 0:
+                cost = cost + basePrices * fuelLiters
+            if e85 > 0:
+                cost = cost + e85Prices * e85
+            cost = np.where(np.isnan(cost), np.inf, cost)  # A fuel needed but not sold
+            better = cost < costs[i]
+            costs[i][better], e85Liters[i][better] = cost[better], e85
+    best = np.argmin(costs, axis=0) if len(rows) else np.zeros(0, dtype=np.intp)  # Cheapest base fuel at each station
+    cost, e85 = costs[best, np.arange(len(rows))], e85Liters[best, np.arange(len(rows))]
+    feasible = np.isfinite(cost)
+    return {"rows": rows[feasible], "base": np.array(list(bases))[best][feasible], "fuelLiters": (refill - e85)[feasible],
+            "e85Liters": e85[feasible], "cost": cost[feasible]}
+
+# --------------------------------------------------
+# Function to get the stations around a location (offline : from the cached national snapshot), returns (stations, rows, distances)
+def nearStations(coords, dist, maxAge=maxAge, offline=False):
+    if offline:
+        data = FuelFinder_v2.loadSnapshot(maxAge, offline=True)
+    else:  # Only the stations around, every fuel
+        data = FuelFinder_v2.mergeSlices(FuelFinder_v2.downloadSlices([FuelFinder_v2.URLForger([], where) for where in FuelFinder_v2.nearSlices([coords], dist)], maxAge))
+    stations = FuelFinder_v2.loadPumps(data)
+    rows = FuelFinder_v2.registerNearPumps(stations, coords, dist, FuelFinder_v2.indexPumps(stations))
+    rows = FuelFinder_v2.ascOrder(stations, rows, "E85")  # Stations without E85 have nothing to blend
+    rows, distances = stations.within(coords, dist, rows)
+    return stations, rows, distances
+
+# --------------------------------------------------
+# Main function
+def main():
+    options = getArgs()
+    coords = tuple(options.coords) if options.coords is not None else FuelFinder_v2.getAddress(options.address)
+    if coords is None:
+        print("[-] Wasn't able to retrieve the address")
+        exit()
+    ethanolMin, ethanolMax = min(options.ethanol) / 100, max(options.ethanol) / 100
+
+    stations, rows, distances = nearStations(coords, options.dist, options.maxAge, options.offline)
+    plan = planBlends(stations, rows, options.lasting / 100, options.capacity, ethanolMin, ethanolMax)
+    order = np.lexsort((distances[np.searchsorted(rows, plan["rows"])], plan["cost"]))[:options.top]  # Cheapest, then closest
+    if len(order) == 0:
+        print(f"[-] There is no station with E85 in {options.dist}km around able to reach {ethanolMin * 100:g} to {ethanolMax * 100:g} % of ethanol")
+        return
+
+    print(f"[*] Refill of {refillCalcul(options.lasting / 100, options.capacity):.2f}L, {ethanolMin * 100:g} to {ethanolMax * 100:g} % of ethanol")
+    for index in order:
+        row = plan["rows"][index]
+        station = stations.records[row]
+        print("#----------#")
+        print(f"[+] {station['adresse']}, {station['cp']} {station['ville']} ({distances[np.searchsorted(rows, row)]:.2f}km)")
+        print(f"\t[+] {plan['fuelLiters'][index]:.2f}L of {plan['base'][index]} at {stations.prices[plan['base'][index]][row]}")
+        print(f"\t[+] {plan['e85Liters'][index]:.2f}L of E85 at {stations.prices['E85'][row]}")
+        print(f"\t[+] Total : {plan['cost'][index]:.2f} EUR")
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()
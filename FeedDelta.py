@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import numpy as np
+
+from bisect import bisect_left, insort
+from collections import namedtuple
+from GeoIndex import GeoIndex
+from StationTable import StationTable
+from Ranking import score, kmWeight
+
+############################# [ VARIABLES ] #############################
+
+Delta = namedtuple('Delta', ['inserted', 'updated', 'removed'])  # {station id: row} of each kind of change
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to get the fingerprint of a station of the export (its prices with their update date, its location, its fuels)
+def fingerprint(station):
+    prix = station.get('prix')  # The export gives it as a JSON string : hashed without being parsed
+    geom = station.get('geom') or {}
+    return hash((prix if isinstance(prix, str) else repr(prix), geom.get('lat'), geom.get('lon'), tuple(station.get('carburants_disponibles') or ())))
+
+# --------------------------------------------------
+# Class to keep the stations of the last snapshot and apply the next ones as deltas (only the changed stations are parsed)
+class LiveStations:
+    def __init__(self):
+        self.table = StationTable.fromExport([])  # Rows are reused, len(table) is a capacity
+        self.index = GeoIndex([])
+        self.rows = {}  # {station id: row}
+        self.fingerprints = {}  # {station id: fingerprint}, kept in memory only
+        self.free = []  # Rows of the removed stations
+        self.filenames = None  # Files of the last snapshot applied
+
+    # Function to get a row for a new station
+    def newRow(self):
+        if self.free:
+            return self.free.pop()
+        row = len(self.rows)
+        if row >= len(self.table):  # Doubling keeps the growth amortized
+            self.table.resize(max(2 * len(self.table), 1024))
+        return row
+
+    # Function to write a station in a row of the table and of the index
+    def store(self, row, station):
+        self.table.setExport(row, station)
+        geom = station.get('geom')
+        self.index.add(row, (geom['lat'], geom['lon']) if geom else None)
+
+    # Function to apply a snapshot (list of export stations), returns what changed since the last one
+    def apply(self, data):
+        delta = Delta({}, {}, {})
+        seen = set()
+        for station in data:
+            stationId = station.get('id')
+            if stationId is None or stationId in seen:  # Same station in two slices
+                continue
+            seen.add(stationId)
+            stationPrint = fingerprint(station)
+            if self.fingerprints.get(stationId) == stationPrint:  # Most of the stations
+                continue
+            if stationId in self.rows:
+                delta.updated[stationId] = self.rows[stationId]
+            else:
+                self.rows[stationId] = delta.inserted[stationId] = self.newRow()
+            self.fingerprints[stationId] = stationPrint
+            self.store(self.rows[stationId], station)
+        if len(seen) < len(self.rows):  # Some stations are gone
+            for stationId in [stationId for stationId in self.rows if stationId not in seen]:
+                row = delta.removed[stationId] = self.rows.pop(stationId)
+                del self.fingerprints[stationId]
+                self.store(row, {})
+                self.free.append(row)
+        return delta
+
+    # Function to apply the files of a snapshot (same files as the last time => same content, nothing is read)
+    def applyFiles(self, filenames, loader):
+        if filenames == self.filenames:  # The snapshot cache names its files by digest of their content
+            return Delta({}, {}, {})
+        self.filenames = filenames
+        return self.apply(loader(filenames))
+
+# --------------------------------------------------
+# Class to keep the stations of an area sorted by price of a fuel (or by price and distance), updated from the deltas
+class AreaRanking:
+    def __init__(self, live, coords, dist, fuel, rank="price", kmWeight=kmWeight):
+        self.live, self.coords, self.dist, self.fuel, self.rank, self.kmWeight = live, coords, dist, fuel, rank, kmWeight
+        candidates = np.fromiter(live.index.candidates(coords, dist), dtype=np.intp)
+        self.entries = sorted(self.entriesOf(candidates))  # [(score, -update, row), ...] sorted like FuelFinder_v2.ascOrder
+        self.keys = {entry[2]: entry for entry in self.entries}  # {row: entry}
+
+    # Function to get the sort entries of the rows in the area selling the fuel (computed as arrays)
+    def entriesOf(self, rows):
+        table = self.live.table
+        rows, distances = table.within(self.coords, self.dist, rows)
+        prices = table.prices[self.fuel][rows]
+        sold = ~np.isnan(prices)
+        rows, distances, prices = rows[sold], distances[sold], prices[sold]
+        scores = score(prices, distances, self.rank, self.kmWeight)
+        updates = -table.updates[self.fuel][rows].astype(np.float64)  # Most recent first, unknown last
+        return zip(scores.tolist(), updates.tolist(), rows.tolist())
+
+    # Function to move the rows of a delta in the ranking, O(log n) per changed station of the area
+    def update(self, delta):
+        rows = [row for changes in delta for row in changes.values()]
+        for row in rows:
+            old = self.keys.pop(row, None)
+            if old is not None:
+                del self.entries[bisect_left(self.entries, old)]
+        for entry in self.entriesOf(np.array(rows, dtype=np.intp)):
+            insort(self.entries, entry)
+            self.keys[entry[2]] = entry
+
+    # Function to get the rows of the best stations
+    def top(self, k=None):
+        return np.array([entry[2] for entry in self.entries[:k]], dtype=np.intp)
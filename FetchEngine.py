@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import asyncio, random, weakref
+# requests is imported by the engine only, importing the scripts stays cheap
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+############################# [ VARIABLES ] #############################
+
+timeout = (10, 60)  # Seconds to connect, seconds between two bytes of the answer
+retries = 3  # Attempts after the first one
+backoff = 0.5  # Seconds before the first retry, doubled at each attempt
+perHost = 8  # Requests running at the same time on one host
+workers = 16  # Threads doing the blocking I/O of the requests
+retryStatus = {429, 500, 502, 503, 504}  # Answers worth asking again
+default = None  # FetchEngine shared by the scripts
+
+############################# [ FUNCTIONS ] #############################
+
+# Class to run HTTP requests from asyncio : pooled connections, limits per host, timeouts and retries with exponential backoff
+# The requests themselves go through a requests.Session in a thread pool, the bodies are streamed by the callers
+class FetchEngine:
+    def __init__(self, session=None, perHost=perHost, workers=workers, timeout=timeout, retries=retries, backoff=backoff):
+        if session is None:  # Pooled connections, shared by the concurrent requests
+            import requests
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.perHost, self.timeout, self.retries, self.backoff = perHost, timeout, retries, backoff
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.limits = weakref.WeakKeyDictionary()  # {event loop: {host: semaphore}}, a semaphore only works in its loop
+
+    # Function to get the semaphore limiting the requests to a host
+    def limit(self, host):
+        return self.limits.setdefault(asyncio.get_running_loop(), {}).setdefault(host, asyncio.Semaphore(self.perHost))
+
+    # Function to run a blocking function in the I/O threads
+    async def call(self, function, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    # Function to send a GET request, the body is not read yet (response.iter_content streams it)
+    # Connection errors, timeouts and 429/5xx answers are retried, the last error is raised
+    async def get(self, url, headers=None):
+        import requests
+        for attempt in range(self.retries + 1):
+            async with self.limit(urlsplit(url).netloc):
+                try:
+                    response = await self.call(self.session.get, url, headers=headers, stream=True, timeout=self.timeout)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+                else:
+                    if response.status_code not in retryStatus or attempt == self.retries:
+                        return response
+                    response.close()
+                    error = requests.exceptions.HTTPError(f"{response.status_code} answered by {url}", response=response)
+            if attempt == self.retries:
+                raise error
+            await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))  # Jitter : retries do not come back together
+
+    # Function to get the whole body of a URL (for small pages)
+    async def read(self, url, headers=None):
+        response = await self.get(url, headers)
+        try:
+            response.raise_for_status()
+            return await self.call(lambda: response.content)
+        finally:
+            response.close()
+
+# --------------------------------------------------
+# Function to get the engine shared by the scripts
+def engine():
+    global default
+    if default is None:
+        default = FetchEngine()
+    return default
@@ -1,55 +1,117 @@
 #!/usr/bin/env python3
 ############################# [ IMPORTS ] #############################
 
+import argparse, sys
 import numpy as np
 
 
 ############################# [ VARIABLES ] #############################
 
+e85 = 0.85  # Percentage of ethanol in E85
+ethanolOf = {"E10": 0.1, "E5": 0.05}  # Percentage of ethanol in the fuel completing the E85
+columns = ["fuel_lasting", "capacity", "ethanol", "fuel"]  # Columns of the input CSV (percentages, liters, percentage, E5/E10)
 
-fuelLasting = int(input("Enter percentage of fuel lasting : "))/100
-capacity = int(input("Enter fuel capacity : "))
-acceptance = int(input("Enter percentage of Ethnaol you want : "))/100
-fuelType = str(input("Do you want E10 or E5 to complete the E85 you put ? :")).upper()
 
-while fuelType not in ["E10","E5"] :
-	print("[-] Wrong fuel type. Please choose 'E5' or 'E10'")
-	fuelType = str(input("Do you want E10 or E5 to complete the E85 you put ? :")).upper()
+############################# [ FUNCTIONS ] #############################
 
-fuel = 0.1 if fuelType == "E10" else 0.05  # Choose fuel percentage in ethanol
+# Handling the args
+def getArgs():
+	parser = argparse.ArgumentParser("python3 FuelE85Ratio.py")  # Create an object to get args
+	# Options of this program
+	parser.add_argument("-I", "-i", "--input", dest="input", help=f"Solve every vehicle of a CSV ({','.join(columns)} columns) instead of asking for one")
+	parser.add_argument("-O", "-o", "--output", dest="output", help="File to write the results in (default: stdout)")
+	return parser.parse_args()
 
+# --------------------------------------------------
+# Function to convert fuel lasting fraction into fuel amount to refill
+def refillCalcul(fuelLasting, capacity):
+	return (1-fuelLasting) * capacity
 
-############################# [ FUNCTIONS ] #############################
+# --------------------------------------------------
+# Function to find solutions of the equations for arrays of vehicles, returns (x, y, feasible)
+def solve(fuelLasting, capacity, acceptance, fuel):
+	# x => E10 Amount, y=> E85 Amount, z => fuel lasting, A => tank capacity, B => percentage of ethanol, f => ethanol of E10/E5
+	# f.x + 0.85y = A * B - (z * A * B)
+	# x + y = (1-z)*A
+	# => y = (1-z)*A * (B-f) / (0.85-f) and x = (1-z)*A - y  (closed form, no matrix to invert)
+	fuelLasting, capacity, acceptance, fuel = (np.asarray(array, dtype=np.float64) for array in (fuelLasting, capacity, acceptance, fuel))
+	refill = refillCalcul(fuelLasting, capacity)  # Get the amount of fuel to refill to get full tank
+	y = refill * (acceptance - fuel) / (e85 - fuel)
+	x = refill - y
+	feasible = (x >= 0) & (y >= 0) & (fuelLasting >= 0) & (fuelLasting <= 1)  # False for NaN too
+	return x, y, feasible
 
-# Function to convert fuel lasting percentage into fuel amount to refill
-def refillCalcul():
-	return (1-fuelLasting/100) * capacity
+# --------------------------------------------------
+# Function to read the vehicles of a CSV as arrays (fractions for the percentages)
+def readVehicles(filename):
+	with open(filename) as file:
+		header = [name.strip() for name in file.readline().split(",")]
+		missing = [name for name in columns if name not in header]
+		if missing:
+			raise ValueError(f"Missing columns in {filename}: {', '.join(missing)}")
+	indexes = [header.index(name) for name in columns]
+	numbers = np.loadtxt(filename, delimiter=",", usecols=indexes[:3], skiprows=1, ndmin=2)  # C parser, no Python per row
+	fuelTypes = np.loadtxt(filename, delimiter=",", usecols=indexes[3], skiprows=1, dtype="S8", ndmin=1)
+	names, inverse = np.unique(fuelTypes, return_inverse=True)  # Only the few distinct types are normalized
+	names = np.array([name.decode().strip().upper() for name in names.tolist()], dtype=str)
+	fuel = np.array([ethanolOf.get(name, np.nan) for name in names.tolist()])[inverse]  # Unknown type => infeasible
+	return numbers[:, 0] / 100, numbers[:, 1], numbers[:, 2] / 100, fuel, names[inverse]
 
 # --------------------------------------------------
-# Function to find solutions of the equations
+# Function to write the solutions as CSV (empty amounts for the infeasible vehicles)
+def writeSolutions(output, fuelTypes, x, y, feasible):
+	output.write("fuel,fuel_liters,e85_liters,feasible\n")
+	x, y = np.round(x, 3), np.round(y, 3)
+	for start in range(0, len(x), 1 << 16):  # Rows formatted by blocks, written at once
+		end = start + (1 << 16)
+		output.write("".join(f"{fuelType},{fuelLiters},{e85Liters},1\n" if ok else f"{fuelType},,,0\n"
+		                     for fuelType, fuelLiters, e85Liters, ok in zip(fuelTypes[start:end].tolist(), x[start:end].tolist(), y[start:end].tolist(), feasible[start:end].tolist())))
 
-def main():
-	refill = refillCalcul()  # Get the amount of fuel to refill to get full tank
+# --------------------------------------------------
+# Function to ask for a single vehicle
+def interactive():
+	fuelLasting = int(input("Enter percentage of fuel lasting : "))/100
+	capacity = int(input("Enter fuel capacity : "))
+	acceptance = int(input("Enter percentage of Ethnaol you want : "))/100
+	fuelType = str(input("Do you want E10 or E5 to complete the E85 you put ? :")).upper()
+
+	while fuelType not in ["E10","E5"] :
+		print("[-] Wrong fuel type. Please choose 'E5' or 'E10'")
+		fuelType = str(input("Do you want E10 or E5 to complete the E85 you put ? :")).upper()
 
-	# x => E10 Amount, y=> E85 Amount, z => , A => tank capacity, B => percentage of ethanol
-	# 0,1x + 0.85y = A * B - (z * A * B)
-	# x + y = (1-z)*a
+	fuel = ethanolOf[fuelType]  # Choose fuel percentage in ethanol
+	x, y, feasible = solve(fuelLasting, capacity, acceptance, fuel)
+	if feasible:
+		print("[+] Thoses parameters are possible:")
+		print(f"\t You have to put {round(float(x),3)}L of {fuelType} and {round(float(y),3)}L of E85\n")
+	else :
+		print("[+] Thoses parameters ain't possible")
 
-	leftSide = np.array([[fuel, 0.85], [1, 1]]) #  Define left side of the equations
-	rightSide = np.array([capacity * acceptance - (fuelLasting * capacity * acceptance) , (1-fuelLasting)*capacity])   #  Define right side of the equations
-	
-	x,y = np.linalg.inv(leftSide).dot(rightSide)  # Solve for x and y where x is E10 amount and y is E85 amount
-	return x,y
+# --------------------------------------------------
+# Main function
+def main():
+	options = getArgs()
+	if options.input is None:
+		interactive()
+		return
+
+	try:
+		fuelLasting, capacity, acceptance, fuel, fuelTypes = readVehicles(options.input)
+	except (OSError, ValueError) as e:
+		print(f"[-] Wasn't able to read the vehicles: {str(e)}", file=sys.stderr)
+		exit()
+	x, y, feasible = solve(fuelLasting, capacity, acceptance, fuel)
+	if options.output is None:
+		writeSolutions(sys.stdout, fuelTypes, x, y, feasible)
+	else:
+		with open(options.output, "w") as output:
+			writeSolutions(output, fuelTypes, x, y, feasible)
+	print(f"[+] {len(x)} vehicles, {int((~feasible).sum())} infeasible", file=sys.stderr)
 
 ############################# [ LAUNCH ] #############################
 
-x,y = main()
-if x >= 0 and y >= 0:
-	print("[+] Thoses parameters are possible:")
-	print(f"\t You have to put {round(x,3)}L of E10 and {round(y,3)}L of E85\n")
-else :
-	print("[+] Thoses parameters ain't possible")
+if __name__ == "__main__":
+	main()
 
 #time.sleep(0.052)
 #time.sleep(0.045)
-
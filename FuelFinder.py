@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 ############################# [ IMPORTS ] #############################
 
-import requests, zipfile, os, argparse
+import asyncio, zipfile, os, argparse
 import xml.etree.ElementTree as ET
 
 from io import BytesIO
-from geopy.geocoders import Nominatim
+from GeoCache import geocode
+from SnapshotCache import fetch, maxAge
+from FetchEngine import engine
 from math import *
+from StationTable import StationTable
+from GeoIndex import haversine
+from Ranking import topK, score, Newest, ranks, kmWeight
 
 ############################# [ VARIABLES ] #############################
 
 url = "https://donnees.roulez-eco.fr/opendata/instantane"  # Output : zip file
 filename = "InstantFuelPrice.xml"
+member = "PrixCarburants_instantane.xml"  # Name of the XML file inside the zip
 
 ############################# [ FUNCTIONS ] #############################
 
@@ -22,6 +28,11 @@ def getArgs():
     parser.add_argument("-F", "-f", "--fuel", dest="fuel", help="Enter the fuel you want (default='SP95')", type=str)
     parser.add_argument("-C", "-c", "--city", dest="city", help="Enter the address, the city or the zipcode you are")
     parser.add_argument("-D", "-d", "--distance", dest="dist", help="Enter the distance you want (default=5)", type=float)
+    parser.add_argument("--no-stream", dest="stream", action="store_false", help="Extract the feed on disk and parse it as a whole instead of streaming it")
+    parser.add_argument("-T", "-t", "--top", dest="top", help="Enter the number of pumps you want (default=3)", type=int, default=3)
+    parser.add_argument("-R", "-r", "--rank", dest="rank", help="Rank the pumps by 'price' or by price and distance 'combined' (default='price')", choices=ranks, default="price")
+    parser.add_argument("--km-weight", dest="kmWeight", help=f"With --rank combined, price (EUR/L) added per km away (default={kmWeight})", type=float, default=kmWeight)
+    parser.add_argument("--max-age", dest="maxAge", help=f"Seconds during which the cached feed is used without asking the server (default={maxAge})", type=float, default=maxAge)
     options = parser.parse_args()
     #print(parser.parse_args())
     if options.fuel is not None:  # Check if fuel option is empty
@@ -45,6 +56,11 @@ def getArgs():
     else:  # default value
         options.dist = 5
 
+    if options.top < 1:  # Check if top option is valid
+        parser.error("\n    [-] Error in the command : please specify a number of pumps above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
     return options
 
 # --------------------------------------------------
@@ -65,30 +81,68 @@ def registerPumps(filename, coords, dist):
     return output
 
 # --------------------------------------------------
-# Function to find the nearest pump
-def pumpOrdering(pumpList, fuel):
+# Function to stream the pumps in a given distance without building the whole tree
+def streamPumps(xmlFile, coords, dist):
+    # Get zone
+    coords1 = getCoordZone(coords, dist)  # Get coordinates + distance(m)
+    coords2 = getCoordZone(coords, -dist)  # Get coordinates - distance(m)
+    context = ET.iterparse(xmlFile, events=("start", "end"))
+    _, root = next(context)  # First event is the opening of <pdv_liste>
+    for event, child in context:
+        if event != "end" or child.tag != "pdv":  # Wait for a whole <pdv> element
+            continue
+        lat = child.attrib.get('latitude')
+        lon = child.attrib.get('longitude')
+        if lat and lon:  # Some stations are published without coordinates
+            lat = float(lat) / 10 ** 5  # Get the good lat format
+            lon = float(lon) / 10 ** 5  # Get the good lon format
+            if coords1[0] >= lat >= coords2[0] and coords1[1] >= lon >= coords2[1]:
+                yield child  # Only the matching pumps stay alive (if the consumer keeps them)
+        root.clear()  # Drop the processed <pdv> so the memory stays flat
+
+# --------------------------------------------------
+# Function to keep only the pumps in the circle (the zone above is the box around it)
+def circleFilter(pumpList, coords, dist):
+    stations = StationTable.fromPumps(pumpList)  # Columns of lat/lon/prices
+    rows, _ = stations.within(coords, dist)  # Exact distance for every pump at once
+    return [pumpList[row] for row in rows]
+
+# --------------------------------------------------
+# Function to keep only the pumps in the circle one by one (pumps streamed from the feed)
+def circlePumps(pumps, coords, dist):
+    for pump in pumps:
+        if haversine(coords[0], coords[1], float(pump.get('latitude')) / 10 ** 5, float(pump.get('longitude')) / 10 ** 5) <= dist:
+            yield pump
+
+# --------------------------------------------------
+# Function to find the nearest pump (offers are yielded one by one to be ranked on the fly)
+def pumpOrdering(pumpList, fuel, coords=None):
     # Fuels available: 'SP98' / 'SP95' / 'Gazole' / 'E10' / 'E85' / 'GPLc'
-    nearPumpList = []
     for pump in pumpList:
         for attribute in range(len(pump)):
             if pump[attribute].tag == 'prix':  # Check if the attribute is the price
                 if pump[attribute].get('nom') == fuel:  # Check if the fuel is the chosen one
-                    # Make a list of dict with useful infos
-                    nearPumpList.append({"Address": f"{pump[0].text}, {pump[1].text}, {getAddress(pump[1].text)[0]}",
-                                         "Latitude": float(pump.attrib.get('latitude'))/10**5,
-                                         "Longitude": float(pump.attrib.get('longitude'))/10**5,
-                                         "Data": {"Last MAJ": pump[attribute].get('maj'),
-                                                  "Fuel": pump[attribute].get('nom'),
-                                                  "Price": float(pump[attribute].get('valeur'))}
-                                         })
-
-    return nearPumpList
+                    # Make a dict with useful infos
+                    # The feed already gives the zipcode, only geocode the city when it is missing
+                    zipcode = pump.get('cp') or getAddress(pump.findtext('ville'))[0]
+                    lat = float(pump.attrib.get('latitude'))/10**5
+                    lon = float(pump.attrib.get('longitude'))/10**5
+                    offer = {"Address": f"{pump.findtext('adresse')}, {pump.findtext('ville')}, {zipcode}",
+                             "Latitude": lat,
+                             "Longitude": lon,
+                             "Data": {"Last MAJ": pump[attribute].get('maj'),
+                                      "Fuel": pump[attribute].get('nom'),
+                                      "Price": float(pump[attribute].get('valeur'))}
+                             }
+                    if coords is not None:
+                        offer["Distance (km)"] = round(haversine(coords[0], coords[1], lat, lon), 2)
+                    yield offer
 
 # --------------------------------------------------
-# Function to order pumps by price of the chosen fuel
-def ascOrder(nearPumpList):
-    orderedList = sorted(nearPumpList, key=lambda x: x['Data']['Price'])
-    return orderedList[:3]  # return only 3 best
+# Function to keep the best pumps of the chosen fuel (by price, or by price and distance), most recent update first on ties
+def ascOrder(nearPumpList, top=3, rank="price", kmWeight=kmWeight):
+    offerScore = lambda x: score(x['Data']['Price'], x.get('Distance (km)', 0.0), rank, kmWeight)
+    return topK(nearPumpList, top, key=lambda x: (offerScore(x), Newest(x['Data']['Last MAJ'])), score=offerScore)  # return only the top best
 
 # --------------------------------------------------
 # Function to determine the coords of the zone
@@ -105,56 +159,71 @@ def getCoordZone(coords, dist):
 # --------------------------------------------------
 # Function to get the zipcode from the city name
 def getAddress(city):
-    locator = Nominatim(user_agent=f"python-getzipcode")
-    geoLoc = locator.geocode(city)
-    address = tuple(geoLoc.address.split(','))  # Get the whole address
+    geoLoc = geocode(city, userAgent="python-getzipcode")  # Cached, each city is only sent once to Nominatim
+    address = tuple(geoLoc[0].split(','))  # Get the whole address
     zipcode = address[-2][1:]  # Get the zipcode
-    lat = geoLoc.latitude
-    lon = geoLoc.longitude
+    lat, lon = geoLoc[1], geoLoc[2]
     return zipcode, (lat, lon)
 
 # --------------------------------------------------
 # Function to download and set the path of the file
 def download():
-    req = requests.get(url)  # Get zip file
-    zip = zipfile.ZipFile(BytesIO(req.content))  # Write the zip file
+    content = asyncio.run(engine().read(url))  # Get zip file (timeout and retries of the fetch engine)
+    zip = zipfile.ZipFile(BytesIO(content))  # Write the zip file
     zip.extractall("New Folder")  # Extract it
     if os.path.isfile(filename):  # Deleting the file if exists
         os.remove(filename)
     os.replace("New Folder/PrixCarburants_instantane.xml", "./" + filename)  # Moving and renaming the file
     os.rmdir("New Folder")  # Deleting the directory
 
+# --------------------------------------------------
+# Function to open the XML feed straight from the cached zip (nothing is extracted)
+def fetchFeed(maxAge=maxAge):
+    zip = zipfile.ZipFile(fetch(url, maxAge))  # Only downloaded again when stale and changed on the server
+    return zip.open(member)  # File object decompressing the XML on the fly
+
 # --------------------------------------------------
 # Main function
-def main(fuel, coords, dist):
-    download()
+def main(fuel, coords, dist, stream=True, maxAge=maxAge, top=3, rank="price", kmWeight=kmWeight):
     # Available fuel: 'SP98' / 'SP95' / 'Gazole' / 'E10' / 'E85' / 'GPLc'
-    availablePumps = pumpOrdering(registerPumps(filename, coords, dist), fuel)  # Determine which pumps are available
+    if stream:
+        with fetchFeed(maxAge) as xmlFile:
+            zonePumps = circlePumps(streamPumps(xmlFile, coords, dist), coords, dist)  # Box filter while parsing, then the circle
+            return ascOrder(pumpOrdering(zonePumps, fuel, coords), top, rank, kmWeight)  # Ranked while the feed is read
+    download()
+    zonePumps = registerPumps(filename, coords, dist)
     os.remove(filename)
-    return ascOrder(availablePumps)  # Return ascendant order
+    availablePumps = pumpOrdering(circleFilter(zonePumps, coords, dist), fuel, coords)  # Determine which pumps are available
+    return ascOrder(availablePumps, top, rank, kmWeight)  # Return ascendant order
 
 
-############################# [ LAUNCH ] #############################
+# --------------------------------------------------
+# Function to print the pumps of the command line
+def printPumps():
+    options = getArgs()
+
+    pumpList = main(options.fuel, getAddress(options.city)[1], options.dist, options.stream, options.maxAge,
+                    options.top, options.rank, options.kmWeight)
+    if len(pumpList) == 0:
+        print(f"\t[-] There is no {options.fuel} in {options.dist}km around")
+
+    for pump in pumpList:
+        print("#----------#")
+        for key in pump.keys():
+            if type(pump[key]) != dict:
+                print(f"\t[+] {key} : {pump[key]}")
+            else:
+                print(f"\t[+] {key} :")
+                for key2 in pump[key]:
+                    if not key2 == 'Price':
+                        print(f"\t\t[*] {key2} : {pump[key][key2]}")
+                    else:
+                        print(f"\t\t[*] {key2} : {pump[key][key2]}€/L")
+
 
-options = getArgs()
-#print(options)
-#time.sleep(0.052)
-#time.sleep(0.045)
-
-pumpList = main(options.fuel, getAddress(options.city)[1], options.dist)
-if len(pumpList) == 0:
-    print(f"\t[-] There is no {options.fuel} in {options.dist}km around")
-
-for pump in pumpList:
-    print("#----------#")
-    for key in pump.keys():
-        if type(pump[key]) != dict:
-            print(f"\t[+] {key} : {pump[key]}")
-        else:
-            print(f"\t[+] {key} :")
-            for key2 in pump[key]:
-                if not key2 == 'Price':
-                    print(f"\t\t[*] {key2} : {pump[key][key2]}")
-                else:
-                    print(f"\t\t[*] {key2} : {pump[key][key2]}€/L")
+############################# [ LAUNCH ] #############################
 
+if __name__ == "__main__":
+    printPumps()
+    #time.sleep(0.052)
+    #time.sleep(0.045)
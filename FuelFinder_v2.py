@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 ############################# [ IMPORTS ] #############################
 
-import requests, os, time, json, argparse
-from datetime import datetime
-from geopy.geocoders import Nominatim
-from geopy.distance import great_circle
+import json, argparse, csv, sys, time
+from itertools import islice
+import numpy as np
+from math import isnan
+from urllib.parse import quote
+from GeoCache import geocode
+from SnapshotCache import fetchedAt, fetchMany, maxAge
+from GeoIndex import GeoIndex
+from StationTable import StationTable, haversineMany, fuelNames, parsePrices
+from Ranking import topK, ranks, kmWeight
+from FeedDelta import LiveStations, AreaRanking
+import RowWriter
 
 ############################# [ VARIABLES ] #############################
-data = []
-timestamp = int(time.time())
-#datetimeString = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")  # different naming system
-
-# Check if datetimeString is in variables
-dateChoice = datetimeString if 'datetimeString' in globals() else timestamp
+exportURL = "https://data.economie.gouv.fr/api/explore/v2.1/catalog/datasets/prix-des-carburants-en-france-flux-instantane-v2/exports/json"
+formats = ["text"] + RowWriter.formats  # 'text' is the list of station blocks
+stationColumns = ["Address", "Zip code", "City", "Latitude", "Longitude"] + fuelNames + ["Update"]  # One price column per fuel, last update of them
 
 ############################# [ FUNCTIONS ] #############################
 
@@ -21,8 +26,16 @@ def getArgs():
     parser = argparse.ArgumentParser("python3 FuelFinder_v2.py")  # Create an object to get args
     # Options of this program
     parser.add_argument("-F", "-f", "--fuel", nargs="*", dest="fuels", help="Enter the fuel(s) you want separted by a space (default: 'SP95')", type=str)
-    parser.add_argument("-C", "-c", "--city", dest="address", help="Enter the city, the zipcode or the address you are")
+    parser.add_argument("-C", "-c", "--city", nargs="+", dest="addresses", help="Enter the city, the zipcode or the address you are (several ones can be given, quoted, to query the same data)")
     parser.add_argument("-D", "-d", "--distance", dest="dist", help="Enter the distance you want in kilometer (<=20km) (default: 5)", type=float)
+    parser.add_argument("-T", "-t", "--top", dest="top", help="Enter the number of stations you want (default: all of them)", type=int)
+    parser.add_argument("-R", "-r", "--rank", dest="rank", help="Rank the stations by 'price' or by price and distance 'combined' (default: 'price')", choices=ranks, default="price")
+    parser.add_argument("--km-weight", dest="kmWeight", help=f"With --rank combined, price (EUR/L) added per km away (default: {kmWeight})", type=float, default=kmWeight)
+    parser.add_argument("-B", "-b", "--batch", dest="batch", help="Answer every query of a CSV (address,fuels,radius columns) or JSONL file, results are written as JSONL")
+    parser.add_argument("-O", "-o", "--output", dest="output", help="File to write the batch results in (default: stdout)")
+    parser.add_argument("-W", "-w", "--watch", dest="watch", help="Poll the prices every given seconds and print the stations again when their order changes", type=float)
+    parser.add_argument("--format", dest="format", help="Print the stations as 'text' blocks, or as rows : 'table' (streamed as 'github' above 1000 rows), 'github', 'csv' or 'jsonl' (default: 'text')", choices=formats, default="text")
+    parser.add_argument("--max-age", dest="maxAge", help=f"Seconds during which the cached data is used without asking the server (default: {maxAge})", type=float, default=maxAge)
     options = parser.parse_args()
     if options.fuels is not None: 
         for fuel in options.fuels :
@@ -33,7 +46,7 @@ def getArgs():
     else:  # default value
         options.fuels = ["SP95"]
 
-    if options.address is None:  # Check if city option is empty
+    if options.addresses is None and options.batch is None:  # Check if city option is empty
         parser.error("\n\t[-] Error in the command : please specify a city/zipcode/address")
         parser.error("Check -h or --help for help")
         exit()
@@ -46,34 +59,70 @@ def getArgs():
     else:  # default value
         options.dist = 5
 
+    if options.watch is not None and options.watch <= 0:  # Check if watch option is valid
+        parser.error("\n\t[-] Error in the command : please specify a polling period above 0 seconds")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.top is not None and options.top < 1:  # Check if top option is valid
+        parser.error("\n\t[-] Error in the command : please specify a number of stations above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
     return options
 
 # --------------------------------------------------
-# Function to forge url depending on the fuels chosen
-def URLForger(fuelList):
-    urlBase = "https://data.economie.gouv.fr/api/explore/v2.1/catalog/datasets/prix-des-carburants-en-france-flux-instantane-v2/exports/json?select=geom%2Cadresse%2Ccp%2Cville%2Cprix&lang=fr&timezone=Europe%2FParis&limit=2000"
+# Function to forge url depending on the fuels chosen (and on a where clause selecting a slice of the stations)
+def URLForger(fuelList, where=None):
+    urlBase = f"{exportURL}?select=id%2Cgeom%2Cadresse%2Ccp%2Cville%2Cprix%2Ccarburants_disponibles&lang=fr&timezone=Europe%2FParis&limit=-1"  # No row cap
     urlEnd = "".join(f"&refine=carburants_disponibles%3A%22{fuel}%22" for fuel in fuelList)  # Add filter for each fuel wanted
+    if where is not None:
+        urlEnd += f"&where={quote(where)}"
     return urlBase+urlEnd
 
 # --------------------------------------------------
-# Function to download the file in the ./tmp/ directory
-def download(url, fuels):
-    response = None  # Initialize the response variable
-    filename = os.path.join(f"{os.getcwd()}/tmp/",f"{'_'.join(fuels)}_{dateChoice}.json")  # Create a file into ./tmp depending on the fuels chosen
+# Function to get the where clauses selecting only the stations around each coordinates
+def nearSlices(coordsList, dist):
+    return [f"within_distance(geom, geom'POINT({lon} {lat})', {dist:g}km)" for lat, lon in coordsList]
+
+# --------------------------------------------------
+# Function to get the where clauses splitting the whole snapshot (by first digit of the zipcode)
+def snapshotSlices():
+    return [f'startswith(cp, "{digit}")' for digit in range(10)] + ["cp is null"]
+
+# --------------------------------------------------
+# Function to get the files of several slices, downloaded concurrently through the snapshot cache (offline : cached files only)
+# The scripts exit on an error, a library (e.g. the server) gets the exception with exitOnError=False
+def downloadSlices(urls, maxAge=maxAge, offline=False, exitOnError=True):
     try:
-        response = requests.get(url)
-        if response.status_code == 200:  # Check if response is 200 OK
-            with open(filename, 'wb') as file:
-                file.write(response.content)
-        return filename
-    
+        return fetchMany(urls, maxAge, offline)
     except Exception as e:
-        if response is not None:
-            print(f"[-] Wasn't able to download the file. Status code: {response.status_code}")
-        else:
-            print(f"[-] An error occurred while making the request: {str(e)}")
+        if not exitOnError:
+            raise
+        print(f"[-] Wasn't able to download the files: {str(e)}")
         exit()
 
+# --------------------------------------------------
+# Function to parse the files of several slices into one list (a station in two slices is kept once)
+def mergeSlices(filenames):
+    data, seen = [], set()
+    for filename in filenames:
+        for station in JSONParser(filename):
+            if station.get('id') is None or station['id'] not in seen:
+                seen.add(station.get('id'))
+                data.append(station)
+    return data
+
+# --------------------------------------------------
+# Function to get every station of the country (the fuels are filtered afterward)
+def loadSnapshot(maxAge=maxAge, offline=False, exitOnError=True):
+    return mergeSlices(downloadSlices([URLForger([], where) for where in snapshotSlices()], maxAge, offline, exitOnError))
+
+# --------------------------------------------------
+# Function to get when the oldest slice of the cached snapshot was downloaded (epoch seconds)
+def snapshotTime():
+    return min(fetchedAt(URLForger([], where)) for where in snapshotSlices())
+
 # --------------------------------------------------
 # Function to parse the file into a dictionary
 def JSONParser(filename) :
@@ -82,53 +131,212 @@ def JSONParser(filename) :
     return data # {{geom:dict,adresse:str,cp:str,ville:str,prix:list(dict)},{},{},...}
 
 # --------------------------------------------------
-# Function to register all the pumps in a given distance
-def registerNearPumps(data, coords, dist):
-    nearPumpList = []
-    lat, lon = coords
-    for pump in data:  # Iterate through the whole reverse dict of pumps
-        pumpCoords = tuple(pump['geom'].values())[::-1]  # Get the coords of each pump in the right order
-        if great_circle(pumpCoords, coords).kilometers <= dist :
-            nearPumpList.append(pump)
-    
-    return nearPumpList # [{geom:dict,adresse:str,cp:str,ville:str,prix:list(dict)},{},{},...]
+# Function to store the pumps as columns (lat/lon arrays) to filter them all at once
+def loadPumps(data):
+    return StationTable.fromExport(data)
 
 # --------------------------------------------------
-# # Function to order pumps by price of the chosen fuel
-def ascOrder(stations, firstChoiceFuelName):
-    sortedPumpList = []  # Initialize sortedPumpList
-    for station in stations:
-        fuels = eval(station['prix'])  # Get the dict of fuels available at this station to extract the price of the chosen fuel
-        firstChoiceFuelPrice = None  # Initialize the firstChoiceFuelPrice
-        for fuel in fuels:
-            if fuel['@nom'] == firstChoiceFuelName:
-                firstChoiceFuelPrice = float(fuel['@valeur'])  # Convert the price to a float
-                break  # Stop the search
+# Function to build the spatial index of the pumps (build it once to answer several queries)
+def indexPumps(stations):
+    points = zip(stations.lat.tolist(), stations.lon.tolist())
+    return GeoIndex(None if isnan(lat) else (lat, lon) for lat, lon in points)  # Some pumps have no coordinates
 
-        if firstChoiceFuelPrice is not None:
-            # Add the first choice fuel infos to the station info
-            station['firstChoiceFuel'] = {'name' : firstChoiceFuelName, 'price' : firstChoiceFuelPrice}
-            sortedPumpList.append(station)
+# --------------------------------------------------
+# Function to register all the pumps in a given distance (selling every fuel of the list if given)
+def registerNearPumps(stations, coords, dist, index=None, fuels=None):
+    rows = None  # Without index, the whole table is checked in one vectorized pass
+    if index is not None:
+        rows = np.fromiter(index.candidates(coords, dist), dtype=np.intp)  # Only the cells around coords
+    rows, _ = stations.within(coords, dist, rows)
+    if fuels:  # Needed when the data has not been downloaded for these fuels only
+        rows = stations.selling(fuels, rows)
+
+    return rows # Rows of the pumps in the table, records and prices are read from it
 
-    # Sort the stations by first choice fuel price
-    sortedPumpList = sorted(sortedPumpList, key=lambda x: x['firstChoiceFuel']['price'])
+# --------------------------------------------------
+# # Function to order pumps by price of the chosen fuel (or by price and distance), most recent update first on ties
+def ascOrder(stations, rows, firstChoiceFuelName, top=None, rank="price", coords=None, kmWeight=kmWeight):
+    prices = stations.prices[firstChoiceFuelName][rows]  # Parsed when loading, nothing to evaluate here
+    sold = ~np.isnan(prices)  # Keep only the pumps selling the first choice fuel
+    rows, prices = rows[sold], prices[sold]
+    scores = prices
+    if rank == "combined":  # Trade a few cents for a shorter trip
+        scores = prices + kmWeight * haversineMany(coords[0], coords[1], stations.lat[rows], stations.lon[rows])
+    updates = -stations.updates[firstChoiceFuelName][rows].astype(np.float64)  # Most recent first, unknown last
 
-    return sortedPumpList
+    if top is None:  # Sort the stations by first choice fuel price
+        return rows[np.lexsort((updates, scores))]
+    best = topK(range(len(rows)), top, key=lambda i: (scores[i], updates[i]), score=lambda i: scores[i])  # Only the top best are kept
+    return rows[np.array(best, dtype=np.intp)]
 
 # --------------------------------------------------
 # Function to get the coordinates from the address
 def getAddress(address):
-    locator = Nominatim(user_agent=f"python-getCoordsAddr")
-    geoLoc = locator.geocode(address)
-    lat, lon = geoLoc.latitude, geoLoc.longitude
+    geoLoc = geocode(address, userAgent="python-getCoordsAddr")  # Cached, each address is only sent once to Nominatim
+    if geoLoc is None:  # Unknown address
+        return None
+    lat, lon = geoLoc[1], geoLoc[2]
     return (lat, lon)
 
+# --------------------------------------------------
+# Function to get a JSON-ready dict of a station
+def stationRecord(stations, row, firstChoiceFuelName):
+    station = stations.records[row]
+    return {'lat': station['geom']['lat'], 'lon': station['geom']['lon'],
+            'adresse': station['adresse'], 'cp': station['cp'], 'ville': station['ville'],
+            'price': float(stations.prices[firstChoiceFuelName][row]),
+            'prix': [{'nom': name, 'maj': update, 'valeur': price} for name, update, price in stations.pricesOf(row)]}
+
+# --------------------------------------------------
+# Function to check a row of a batch file and get its query (ValueError if it is not valid)
+def batchQuery(row, defaultDist=5):
+    if not isinstance(row, dict):
+        raise ValueError("not an object")
+    address = row.get('address')
+    if not isinstance(address, str) or not address.strip():
+        raise ValueError("no address")
+    fuels = row.get('fuels') or ["SP95"]
+    if isinstance(fuels, str):  # "E85 SP95" in CSV
+        fuels = fuels.split()
+    try:
+        radius = float(defaultDist if row.get('radius') in (None, "") else row['radius'])
+    except (TypeError, ValueError):
+        raise ValueError(f"radius '{row['radius']}' is not a number")
+    if not 0 < radius <= 20:  # Same limit as -d
+        raise ValueError(f"radius must be above 0 and at most 20 km (got {radius:g})")
+    return {'address': address, 'fuels': fuels, 'radius': radius}
+
+# --------------------------------------------------
+# Function to read the queries of a batch file : CSV (address,fuels,radius columns) or JSONL, the wrong rows are reported and skipped
+def readBatch(filename, defaultDist=5):
+    with open(filename, newline='', encoding='utf-8') as file:
+        if filename.lower().endswith(".csv"):
+            reader = csv.DictReader(file)
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            rows = ((number, line) for number, line in enumerate(file, 1) if line.strip())
+        for number, row in rows:
+            try:
+                query = batchQuery(row if isinstance(row, dict) else json.loads(row), defaultDist)
+            except ValueError as e:  # json.JSONDecodeError included
+                print(f"[-] {filename} line {number} skipped : {str(e)}", file=sys.stderr)
+                continue
+            yield query
+
+# --------------------------------------------------
+# Function to answer every query of a batch file from one loaded snapshot, results are streamed as JSONL
+def runBatch(filename, output, maxAge=maxAge, defaultDist=5, top=None, rank="price", kmWeight=kmWeight):
+    start = time.perf_counter()
+    stations = loadPumps(loadSnapshot(maxAge))  # Every station, the fuels are filtered per query
+    index = indexPumps(stations)
+    loadTime = time.perf_counter() - start
+
+    queries = list(readBatch(filename, defaultDist))
+    start = time.perf_counter()
+    coordsList = {}
+    for address in dict.fromkeys(query['address'] for query in queries):  # Each address once
+        try:
+            coordsList[address] = getAddress(address)
+        except Exception as e:  # One failing address must not stop the whole batch
+            print(f"[-] Wasn't able to geocode '{address}': {str(e)}", file=sys.stderr)
+            coordsList[address] = None
+    geocodeTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        result = dict(query)
+        coords = coordsList[query['address']]
+        unknownFuels = [fuel for fuel in query['fuels'] if fuel not in ['SP98', 'SP95', 'Gazole', 'E10', 'E85', 'GPLc']]
+        if coords is None:
+            result['error'] = "Address not geocoded"
+        elif unknownFuels:
+            result['error'] = f"Unsupported fuel(s): {unknownFuels}"
+        else:
+            result['coords'] = coords
+            rows = registerNearPumps(stations, coords, query['radius'], index, query['fuels'])
+            rows = ascOrder(stations, rows, query['fuels'][0], top, rank, coords, kmWeight)
+            result['stations'] = [stationRecord(stations, row, query['fuels'][0]) for row in rows]
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    queryTime = time.perf_counter() - start
+
+    # Throughput report (stderr, the results may be on stdout)
+    nbQueries = max(len(queries), 1)
+    perQuery = (geocodeTime + queryTime) / nbQueries
+    print(f"[*] {len(queries)} queries ({len(coordsList)} addresses) answered in {geocodeTime + queryTime:.3f}s, "
+          f"{1 / max(perQuery, 1e-9):.0f} queries/sec, after loading {len(stations)} stations in {loadTime:.3f}s", file=sys.stderr)
+    print(f"[*] Reloading the snapshot for every query would cap it at {1 / (loadTime + perQuery):.1f} queries/sec "
+          f"(interpreter startup not included)", file=sys.stderr)
+
 # --------------------------------------------------
 # Function to delete the file 
 # def delete(file):
 #     time.sleep(0.1)  # Sleep to be sure process of parsing in ended
 #     os.remove(file)
 
+# --------------------------------------------------
+# Function to get the stations of a list of rows : address, coordinates and (update, price) of each fuel (None when it is not sold)
+def stationInfos(stations, rows):
+    for start in range(0, len(rows), RowWriter.chunkSize):  # The prices of a whole chunk are read at once
+        chunk = np.asarray(rows[start:start + RowWriter.chunkSize], dtype=np.intp)
+        fuels = [zip(np.datetime_as_string(stations.updates[fuel][chunk], unit='s').tolist(), stations.prices[fuel][chunk].tolist()) for fuel in fuelNames]
+        for row, *sold in zip(chunk.tolist(), *fuels):
+            station = stations.records[row]
+            yield station, [None if isnan(price) else (update.replace('T', ' '), price) for update, price in sold]
+
+# --------------------------------------------------
+# Function to get the rows of the stations, as stationColumns
+def stationRows(stations, rows):
+    for station, sold in stationInfos(stations, rows):
+        yield (station['adresse'], station['cp'], station['ville'], station['geom']['lat'], station['geom']['lon'],
+               *[price and price[1] for price in sold], max((price[0] for price in sold if price), default=None))
+
+# --------------------------------------------------
+# Function to get the text block of a station, its prices as in the feed (order and strings of its 'prix')
+def stationText(station):
+    prices = "".join(f"\t[+] Name: {fuel.get('@nom')}\n\t[+] Update: {fuel.get('@maj')}\n\t[+] Price: {fuel.get('@valeur')}\n\t# ----- #\n"
+                     for fuel in parsePrices(station.get('prix')))
+    return ("#----------#\n[+] Coordinates:\n"
+            f"\t[+] Latitude: {station['geom']['lat']}\n\t[+] Longitude: {station['geom']['lon']}\n"
+            f"[+] Address:\n\t[+] {station['adresse']}, {station['cp']} {station['ville']}\n[+] Prices:\n{prices}")
+
+# --------------------------------------------------
+# Function to print the stations of a list of rows as text blocks or in a RowWriter format, one write per chunk
+def printStations(stations, rows, format="text"):
+    if format != "text":
+        RowWriter.writeRows(stationRows(stations, rows), stationColumns, format)
+        return
+    records = (stations.records[row] for row in rows)
+    while True:
+        chunk = "".join(stationText(station) for station in islice(records, RowWriter.chunkSize))
+        if not chunk:
+            break
+        sys.stdout.write(chunk)
+
+# --------------------------------------------------
+# Function to poll the stations around the addresses, only the stations that changed since the last poll are processed
+def watch(coordsList, urls, fuel, dist, period, top=None, rank="price", kmWeight=kmWeight, format="text"):
+    live = LiveStations()
+    rankings, shown = None, {}  # {address: rows printed the last time}
+    while True:
+        start = time.perf_counter()
+        delta = live.applyFiles(downloadSlices(urls, 0), mergeSlices)  # Revalidated on every poll
+        if rankings is None:  # First snapshot : every station is new
+            rankings = {address: AreaRanking(live, coords, dist, fuel, rank, kmWeight) for address, coords in coordsList.items()}
+        else:
+            for ranking in rankings.values():
+                ranking.update(delta)
+        print(f"\n[*] {time.strftime('%H:%M:%S')} : {len(delta.inserted)} new, {len(delta.updated)} updated, "
+              f"{len(delta.removed)} removed stations ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        changed = set(delta.updated.values())
+        for address, ranking in rankings.items():
+            rows = ranking.top(top)
+            if address not in shown or not np.array_equal(rows, shown[address]) or changed.intersection(rows.tolist()):
+                if len(rankings) > 1:
+                    print(f"\n[*] Address: {address}")
+                printStations(live.table, rows, format)
+                shown[address] = rows
+        time.sleep(period)
+
 # --------------------------------------------------
 # Main function
 def main():
@@ -136,57 +344,67 @@ def main():
         # Get the args
         options = getArgs()
 
+        if options.batch is not None:  # Every query of the file from the same data
+            if options.output is None:
+                runBatch(options.batch, sys.stdout, options.maxAge, options.dist, options.top, options.rank, options.kmWeight)
+            else:
+                with open(options.output, 'w', encoding='utf-8') as output:
+                    runBatch(options.batch, output, options.maxAge, options.dist, options.top, options.rank, options.kmWeight)
+            return
+
+        # Get the coordinates of every address first, only the stations around them are downloaded
+        coordsList = {address: getAddress(address) for address in options.addresses}
+        for address, coords in coordsList.items():
+            if coords is None:
+                print(f"\t[-] Address not found : {address}")
+        wheres = nearSlices([coords for coords in coordsList.values() if coords is not None], options.dist)
+
         # Available fuels: 'SP98' / 'SP95' / 'Gazole' / 'E10' / 'E85' / 'GPLc'
-        url = URLForger(options.fuels)
+        urls = [URLForger(options.fuels, where) for where in wheres]
+
+        if options.watch is not None:  # Keep the stations in memory and apply the changes of each poll
+            watch({address: coords for address, coords in coordsList.items() if coords is not None}, urls, options.fuels[0],
+                  options.dist, options.watch, options.top, options.rank, options.kmWeight, options.format)
+            return
         
-        # Initialize filename variable
-        filename = None
+        # Download the JSON files with the specified fuel types around each address
+        filenames = downloadSlices(urls, options.maxAge)
         
-        # This second try/finally permit to keep filename variable in local 
-        try :
-            # Download the JSON file with the specified fuel types
-            filename = download(url, options.fuels)
-            
-            # Parse the file into a dict
-            data = JSONParser(filename)
+        # Parse the files into a dict
+        data = mergeSlices(filenames)
+
+        # Load and index the pumps once for every address
+        stations = loadPumps(data)
+        index = indexPumps(stations)
+
+        info = sys.stderr if options.format in ("csv", "jsonl") else sys.stdout  # Messages out of the rows
+        for address, coords in coordsList.items():
+            if coords is None:
+                continue
+            if len(options.addresses) > 1:
+                print(f"\n[*] Address: {address}", file=info)
 
             # Get the sorted by first choice fuel price list of near pumps 
-            stationList = ascOrder(registerNearPumps(data, getAddress(options.address), options.dist), options.fuels[0])
+            stationList = ascOrder(stations, registerNearPumps(stations, coords, options.dist, index), options.fuels[0],
+                                   options.top, options.rank, coords, options.kmWeight)
             if len(stationList) == 0:  # Handle in no pumps with chosen fuel
-                print(f"\t[-] There is no stations with {options.fuels} in {options.dist}km around")
+                print(f"\t[-] There is no stations with {options.fuels} in {options.dist}km around", file=info)
                 # raise ValueError  # raise error when 0 pumps to quit
             
-            print(f"[*]You chose '{options.fuels[0]}' as first choice fuel, the next list will be sorted depending on its price.")
-            print("[*]Change the fuel order if you want an other order.")
-            for station in stationList:
-                print("#----------#")
-                print("[+] Coordinates:")
-                print(f"\t[+] Latitude: {station['geom']['lat']}")
-                print(f"\t[+] Longitude: {station['geom']['lon']}")
-                print("[+] Address:")
-                print(f"\t[+] {station['adresse']}, {station['cp']} {station['ville']}")
-                print("[+] Prices:")
-                for fuel in eval(station['prix']):
-                    print(f"\t[+] Name: {fuel['@nom']}")
-                    print(f"\t[+] Update: {fuel['@maj']}")
-                    print(f"\t[+] Price: {fuel['@valeur']}")
-                    print("\t# ----- #")
-        
-        # Remove file if it has been downloaded
-        finally :
-            if filename is not None:
-                os.remove(filename)
+            print(f"[*]You chose '{options.fuels[0]}' as first choice fuel, the next list will be sorted depending on its price.", file=info)
+            print("[*]Change the fuel order if you want an other order.", file=info)
+            printStations(stations, stationList, options.format)
 
-    # Catch any exception of both try block
+    except KeyboardInterrupt:  # End of the watch mode
+        print("\n[*] Stopping")
+    # Catch any exception of the try block
     except Exception as e :
         print("\t[-] An error occurred :")
         print(e)
 
 ############################# [ LAUNCH ] #############################
-# create tmp subdirectory of the current directory 
-if not os.path.exists(f"{os.getcwd()}/tmp"):
-    os.makedirs(f"{os.getcwd()}/tmp")    
 
-main()
+if __name__ == "__main__":
+    main()
 #time.sleep(0.052)
 #time.sleep(0.045)
\ No newline at end of file
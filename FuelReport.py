@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, asyncio, time, zipfile
+import numpy as np
+import xml.etree.ElementTree as ET
+
+import FuelFinder, FuelFinder_v2, LowPriceFuel
+from SnapshotCache import SnapshotCache, maxAge
+from StationTable import fuelNames
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 FuelReport.py")  # Create an object to get args
+    # Options of this program
+    parser.add_argument("--alert-url", dest="alertURL", help="Enter another URL for the at-cost alert page", default=LowPriceFuel.url)
+    parser.add_argument("--zip-url", dest="zipURL", help="Enter another URL for the roulez-eco zip feed", default=FuelFinder.url)
+    parser.add_argument("--export-url", dest="exportURL", help="Enter another URL for the data.economie.gouv.fr export", default=FuelFinder_v2.exportURL)
+    parser.add_argument("--max-age", dest="maxAge", help=f"Seconds during which the cached feeds are used without asking the servers (default: {maxAge})", type=float, default=maxAge)
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to run a coroutine and measure it, returns (result or exception, seconds)
+async def timed(coroutine):
+    start = time.perf_counter()
+    try:
+        result = await coroutine
+    except Exception as e:  # One failing source must not stop the report
+        result = e
+    return result, time.perf_counter() - start
+
+# --------------------------------------------------
+# Function to download every source at the same time : {source: (result, seconds)}
+async def fetchSources(cache, alertURL, zipURL):
+    urls = [FuelFinder_v2.URLForger([], where) for where in FuelFinder_v2.snapshotSlices()]
+    sources = {'alerts': cache.fetchAsync(alertURL),  # Revalidated with its ETag like the feeds
+               'zip feed': cache.fetchAsync(zipURL),
+               'export': cache.fetchManyAsync(urls)}
+    results = await asyncio.gather(*(timed(coroutine) for coroutine in sources.values()))
+    return dict(zip(sources, results))
+
+# --------------------------------------------------
+# Function to summarize the at-cost alerts (not parsed again if the page did not change)
+def alertSummary(path):
+    alerts = LowPriceFuel.alertsOf(path)
+    if not alerts:
+        return "no alert"
+    return f"{len(alerts)} alerts : " + ", ".join(alert['brand'] for alert in alerts)
+
+# --------------------------------------------------
+# Function to summarize the XML feed (stations and last update, streamed from the zip)
+def zipSummary(path):
+    count, last = 0, ""
+    with zipfile.ZipFile(path).open(FuelFinder.member) as xmlFile:
+        for _, element in ET.iterparse(xmlFile):
+            if element.tag == 'prix':
+                last = max(last, element.get('maj') or "")
+            elif element.tag == 'pdv':
+                count += 1
+                element.clear()
+    return f"{count} stations, last update {last.replace('T', ' ')}"
+
+# --------------------------------------------------
+# Function to summarize the export (stations and national min / median price of each fuel)
+def exportSummary(filenames):
+    stations = FuelFinder_v2.loadPumps(FuelFinder_v2.mergeSlices(filenames))
+    lines = [f"{len(stations)} stations"]
+    for fuel in fuelNames:
+        prices = stations.prices[fuel][~np.isnan(stations.prices[fuel])]
+        if len(prices):
+            lines.append(f"{fuel} min {prices.min():.3f} / median {np.median(prices):.3f} EUR/L")
+    return "\n\t    ".join(lines)
+
+# --------------------------------------------------
+# Main function
+def main():
+    options = getArgs()
+    FuelFinder_v2.exportURL = options.exportURL
+    cache = SnapshotCache(maxAge=options.maxAge)
+
+    start = time.perf_counter()
+    results = asyncio.run(fetchSources(cache, options.alertURL, options.zipURL))
+    fetchTime = time.perf_counter() - start
+
+    summaries = {'alerts': alertSummary, 'zip feed': zipSummary, 'export': exportSummary}
+    print("[*] Fuel report")
+    for source, (result, seconds) in results.items():
+        if isinstance(result, Exception):
+            print(f"\t[-] {source} : failed after {seconds:.2f}s ({str(result)})")
+            continue
+        parseStart = time.perf_counter()
+        summary = summaries[source](result)
+        print(f"\t[+] {source} : fetched in {seconds:.2f}s, parsed in {time.perf_counter() - parseStart:.2f}s\n\t    {summary}")
+    print(f"[*] Downloads : {fetchTime:.2f}s for all the sources at once ({sum(seconds for _, seconds in results.values()):.2f}s summed over the sources)")
+    print(f"[*] Total : {time.perf_counter() - start:.2f}s")
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, math, sys, threading, time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qs
+import FuelFinder_v2
+from PriceHistory import PriceHistory
+
+############################# [ VARIABLES ] #############################
+
+fuels = ['SP98', 'SP95', 'Gazole', 'E10', 'E85', 'GPLc']
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 FuelServer.py")  # Create an object to get args
+    # Options of this program
+    parser.add_argument("-H", "--host", dest="host", help="Enter the address to listen on (default: 127.0.0.1)", default="127.0.0.1")
+    parser.add_argument("-P", "-p", "--port", dest="port", help="Enter the port to listen on (default: 8085)", type=int, default=8085)
+    parser.add_argument("-R", "--refresh", dest="refresh", help="Enter the seconds between two snapshot refreshes (default: 300)", type=float, default=300)
+    parser.add_argument("-W", "--workers", dest="workers", help="Enter the number of threads answering the queries (default: 8)", type=int, default=8)
+    parser.add_argument("--feed-url", dest="feedURL", help="Enter another URL for the data.economie.gouv.fr export (e.g. a local fake)")
+    parser.add_argument("--history", dest="history", help="Append every snapshot loaded to the price history (see PriceHistory.py)", action="store_true")
+    options = parser.parse_args()
+
+    if options.refresh <= 0 or options.workers <= 0:
+        parser.error("\n\t[-] Error in the command : please specify a refresh period and a number of workers above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    return options
+
+# --------------------------------------------------
+# Function to load the stations and their index (a snapshot is never modified once built)
+# A download error is raised : an exit() would silently end the refresh thread
+def loadSnapshot(maxAge):
+    stations = FuelFinder_v2.loadPumps(FuelFinder_v2.loadSnapshot(maxAge, exitOnError=False))
+    # Time of the download, not of the load : a cached snapshot served after a network error keeps its age
+    return {'stations': stations, 'index': FuelFinder_v2.indexPumps(stations), 'fetchedAt': FuelFinder_v2.snapshotTime()}
+
+# --------------------------------------------------
+# Class to keep the last snapshot in memory and the latencies of the queries
+class FuelService:
+    def __init__(self, refresh, history=None):
+        self.refresh = refresh
+        self.history = history  # PriceHistory fed with every snapshot, or None
+        self.snapshot = loadSnapshot(refresh)  # Replaced as a whole, a query always sees one consistent snapshot
+        self.recordHistory()
+        self.latencies = deque(maxlen=10000)  # Seconds of the last queries
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    # Function to refresh the snapshot on a schedule (runs in a background thread)
+    def refreshLoop(self):
+        while not self.stopped.wait(self.refresh):
+            try:
+                self.snapshot = loadSnapshot(self.refresh)  # Atomic swap of the reference
+            except Exception as e:  # Keep serving the previous snapshot
+                print(f"[-] Wasn't able to refresh the snapshot: {str(e)}", file=sys.stderr)
+                continue
+            self.recordHistory()
+
+    # Function to append the current snapshot to the price history (only the changed prices are stored)
+    def recordHistory(self):
+        if self.history is not None:
+            try:
+                self.history.ingest(self.snapshot['stations'])
+            except OSError as e:  # A full disk must not stop the service
+                print(f"[-] Wasn't able to record the snapshot: {str(e)}", file=sys.stderr)
+
+    # Function to answer /cheapest?lat=&lon=&fuel=&radius=&top=&rank=
+    def cheapest(self, query):
+        snapshot = self.snapshot
+        lat, lon = float(query['lat'][0]), float(query['lon'][0])
+        fuel = query.get('fuel', ['SP95'])[0]
+        radius = float(query.get('radius', ['5'])[0])
+        top = int(query.get('top', ['10'])[0])
+        rank = query.get('rank', ['price'])[0]
+        if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):  # inf overflows in the grid index
+            raise ValueError("lat must be in [-90, 90] and lon in [-180, 180]")
+        if fuel not in fuels or not 0 < radius <= 20 or top < 1 or rank not in FuelFinder_v2.ranks:
+            raise ValueError("fuel must be one of " + "/".join(fuels) + ", 0 < radius <= 20, top > 0 and rank 'price' or 'combined'")
+
+        stations = snapshot['stations']
+        rows = FuelFinder_v2.registerNearPumps(stations, (lat, lon), radius, snapshot['index'], [fuel])
+        rows = FuelFinder_v2.ascOrder(stations, rows, fuel, top, rank, (lat, lon))
+        return {'snapshotAge': round(time.time() - snapshot['fetchedAt'], 3),
+                'stations': [FuelFinder_v2.stationRecord(stations, row, fuel) for row in rows]}
+
+    # Function to record the latency of a query
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    # Function to answer /stats
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+        percentile = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3) if latencies else None
+        snapshot = self.snapshot
+        return {'queries': len(latencies), 'p50Ms': percentile(0.50), 'p99Ms': percentile(0.99),
+                'snapshotAge': round(time.time() - snapshot['fetchedAt'], 3), 'stations': len(snapshot['stations'])}
+
+# --------------------------------------------------
+# Class of HTTP server answering each request from a pool of threads
+class PooledHTTPServer(HTTPServer):
+    def __init__(self, address, handler, workers):
+        super().__init__(address, handler)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, clientAddress):
+        self.executor.submit(self.processInThread, request, clientAddress)
+
+    def processInThread(self, request, clientAddress):
+        try:
+            self.finish_request(request, clientAddress)
+        except Exception:
+            self.handle_error(request, clientAddress)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+# --------------------------------------------------
+# Function to make the request handler of a service
+def makeHandler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = time.perf_counter()
+            url = urlsplit(self.path)
+            try:
+                if url.path == '/cheapest':
+                    status, body = 200, service.cheapest(parse_qs(url.query))
+                    service.record(time.perf_counter() - start)
+                elif url.path == '/stats':
+                    status, body = 200, service.stats()
+                else:
+                    status, body = 404, {'error': f"Unknown endpoint {url.path}, use /cheapest or /stats"}
+            except (KeyError, ValueError) as e:  # Missing or wrong parameter
+                status, body = 400, {'error': f"Bad query: {str(e)}"}
+            data = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):  # One line per query would slow the service down
+            pass
+
+    return Handler
+
+# --------------------------------------------------
+# Main function
+def main():
+    options = getArgs()
+    if options.feedURL is not None:
+        FuelFinder_v2.exportURL = options.feedURL
+
+    print("[*] Loading the snapshot...")
+    try:
+        service = FuelService(options.refresh, PriceHistory() if options.history else None)
+    except Exception as e:
+        print(f"[-] Wasn't able to load the snapshot: {str(e)}")
+        exit()
+    threading.Thread(target=service.refreshLoop, daemon=True).start()
+    server = PooledHTTPServer((options.host, options.port), makeHandler(service), options.workers)
+    print(f"[+] {len(service.snapshot['stations'])} stations loaded, listening on http://{options.host}:{server.server_port}/cheapest?lat=&lon=&fuel=&radius=")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Stopping")
+    finally:
+        service.stopped.set()
+        server.server_close()
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()
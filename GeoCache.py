@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import os, sqlite3, time
+
+############################# [ VARIABLES ] #############################
+
+cacheDir = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "udscripts")
+ttl = 30 * 24 * 3600  # Addresses barely move : keep them 30 days
+maxEntries = 10000  # Least recently used entries are evicted above this size
+default = None  # GeoCache used by geocode(), swap it to use another geocoder (e.g. a local fake in tests)
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to normalize a query so "  Paris " and "paris" share the same entry
+def normalize(query):
+    return " ".join(query.split()).casefold()
+
+# --------------------------------------------------
+# Function to make a geocoder calling Nominatim : query -> (address, lat, lon) or None
+def nominatim(userAgent):
+    locator = None
+    def geocoder(query):
+        nonlocal locator
+        if locator is None:  # Only build the locator if the cache misses
+            from geopy.geocoders import Nominatim
+            locator = Nominatim(user_agent=userAgent)
+        geoLoc = locator.geocode(query)
+        return None if geoLoc is None else (geoLoc.address, geoLoc.latitude, geoLoc.longitude)
+    return geocoder
+
+# --------------------------------------------------
+# Class to cache geocoding results in memory and in a SQLite file (TTL + LRU eviction)
+class GeoCache:
+    def __init__(self, geocoder, path=None, ttl=ttl, maxEntries=maxEntries):
+        if path is None:
+            os.makedirs(cacheDir, exist_ok=True)
+            path = os.path.join(cacheDir, "geocode.sqlite")
+        self.geocoder = geocoder
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.memo = {}  # In-process results, repeated queries of a run never reach SQLite
+        self.db = sqlite3.connect(path, timeout=30)  # Wait for the other processes using the file
+        self.db.execute("CREATE TABLE IF NOT EXISTS geocode (query TEXT PRIMARY KEY, address TEXT, lat REAL, lon REAL, created REAL, used REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS geocode_used ON geocode (used)")
+        self.db.commit()
+
+    # Function to get the (address, lat, lon) of a query, None if it can't be found
+    def lookup(self, query):
+        key = normalize(query)
+        if key in self.memo:
+            return self.memo[key]
+
+        now = time.time()
+        row = self.db.execute("SELECT address, lat, lon, created FROM geocode WHERE query = ?", (key,)).fetchone()
+        if row is not None and now - row[3] < self.ttl:  # Fresh entry
+            result = row[:3]
+            self.db.execute("UPDATE geocode SET used = ? WHERE query = ?", (now, key))
+        else:
+            result = self.geocoder(query)
+            if result is not None:  # Unknown addresses are only remembered for this run
+                self.db.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)", (key, *result, now, now))
+                self.evict(now)
+        self.db.commit()
+
+        self.memo[key] = result
+        return result
+
+    # Function to drop the expired entries and the least recently used ones above maxEntries
+    def evict(self, now):
+        self.db.execute("DELETE FROM geocode WHERE created < ?", (now - self.ttl,))
+        self.db.execute("DELETE FROM geocode WHERE query NOT IN (SELECT query FROM geocode ORDER BY used DESC LIMIT ?)", (self.maxEntries,))
+
+# --------------------------------------------------
+# Function to geocode a query through the default cache
+def geocode(query, userAgent="python-udscripts"):
+    global default
+    if default is None:
+        default = GeoCache(nominatim(userAgent))
+    return default.lookup(query)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+from math import radians, degrees, sin, cos, asin, sqrt, floor
+
+############################# [ VARIABLES ] #############################
+
+earthRadius = 6371.009  # Mean Earth radius in km (same as geopy's great_circle)
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to get the great-circle distance in km between two points
+def haversine(lat1, lon1, lat2, lon2):
+    dLat = radians(lat2 - lat1)
+    dLon = radians(lon2 - lon1)
+    a = sin(dLat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dLon / 2) ** 2
+    return 2 * earthRadius * asin(min(1, sqrt(a)))
+
+# --------------------------------------------------
+# Class to index points in a grid of lat/lon cells so radius queries only look at nearby cells
+class GeoIndex:
+    def __init__(self, points, cellDeg=0.1):
+        self.cellDeg = cellDeg  # 0.1 deg ~ 11km of latitude
+        self.nbLonCells = round(360 / cellDeg)  # Used to wrap around the antimeridian
+        self.points = []  # [(lat, lon) or None, ...] indexed like the input
+        self.cells = {}  # {(latCell, lonCell): [index, ...]}
+        for index, point in enumerate(points):
+            self.points.append(point)
+            if point is not None:  # Points without coordinates are kept but never found
+                self.cells.setdefault(self.cellOf(*point), []).append(index)
+
+    # Function to store (or move) a point at an index
+    def add(self, index, point):
+        if index < len(self.points):
+            self.remove(index)
+        else:
+            self.points.extend([None] * (index + 1 - len(self.points)))
+        self.points[index] = point
+        if point is not None:
+            self.cells.setdefault(self.cellOf(*point), []).append(index)
+
+    # Function to forget the point at an index (the index is kept, it is never found)
+    def remove(self, index):
+        point = self.points[index]
+        if point is not None:
+            self.cells[self.cellOf(*point)].remove(index)
+            self.points[index] = None
+
+    # Function to get the cell of a point
+    def cellOf(self, lat, lon):
+        return floor(lat / self.cellDeg), floor(lon / self.cellDeg) % self.nbLonCells
+
+    # Function to list the indexes stored in the cells overlapping the query circle
+    def candidates(self, coords, dist):
+        lat, lon = coords
+        dLat = degrees(dist / earthRadius)  # Angular radius of the circle
+        minLat, maxLat = max(lat - dLat, -90), min(lat + dLat, 90)
+        if -90 < minLat and maxLat < 90 and dLat < 90:
+            dLon = degrees(asin(min(1, sin(radians(dLat)) / cos(radians(lat)))))  # Widest longitude of the circle
+        else:  # The circle contains a pole => every longitude
+            dLon = 180
+        latCells = range(floor(minLat / self.cellDeg), floor(maxLat / self.cellDeg) + 1)
+        if dLon >= 180:
+            lonCells = range(self.nbLonCells)
+        else:
+            lonCells = dict.fromkeys(cell % self.nbLonCells for cell in range(floor((lon - dLon) / self.cellDeg), floor((lon + dLon) / self.cellDeg) + 1))
+        for latCell in latCells:
+            for lonCell in lonCells:
+                yield from self.cells.get((latCell, lonCell), ())
+
+    # Function to get the [(index, distance), ...] of the points in a given distance, ordered by index
+    def query(self, coords, dist):
+        lat, lon = coords
+        output = []
+        for index in self.candidates(coords, dist):
+            pointLat, pointLon = self.points[index]
+            distance = haversine(lat, lon, pointLat, pointLon)  # Exact check on the candidates only
+            if distance <= dist:
+                output.append((index, distance))
+        output.sort()
+        return output
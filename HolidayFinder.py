@@ -1,19 +1,19 @@
 #!/usr/bin/env python3
 ############################# [ IMPORTS ] #############################
 
-import pycountry, holidays, argparse, tabulate
+import argparse, json, os, sys
 from datetime import date, timedelta
+from functools import lru_cache
+
+import CodeIndex  # Generated : country and subdivision codes without loading pycountry
+import RowWriter
+# pycountry, holidays, numpy, tabulate and the process pool are imported when needed only
 
 ############################# [ VARIABLES ] #############################
 
-lsDates = {
-    "Holiday name": [],
-    "From": [],
-    "To": [],
-    "Week #": [],
-    "Paid leaves": [],
-    "# of days off": []
-}  # Dict of data related to holidays
+columns = ["Code", "Year", "Holiday name", "From", "To", "Week #", "Paid leaves", "# of days off"]  # Columns of the table
+formats = RowWriter.formats + ["json"]  # 'json' is one list, the others are streamed by RowWriter
+indexPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CodeIndex.py")  # Module generated by --make-index
 
 days = ["Monday", "Tuesday", "Wednesday",
         "Thursday", "Friday", "Saturday", "Sunday"]
@@ -25,129 +25,159 @@ days = ["Monday", "Tuesday", "Wednesday",
 def getArgs():
     parser = argparse.ArgumentParser("python3 HolidayFinder.py")  # Create an object to get args
     # Options of this program
-    parser.add_argument("-Y", "-y", "--year", dest="year", help="Enter the year you want", type=int)
-    parser.add_argument("-C", "-c", "--code", dest="code", help="Enter the country/state code you are (if you know it)", type=str)
+    parser.add_argument("-Y", "-y", "--year", nargs="+", dest="years", help="Enter the year you want, or a range FIRST LAST", type=int)
+    parser.add_argument("-C", "-c", "--code", nargs="+", dest="codes", help="Enter the country/state code(s) you are (if you know it), several ones are planned in one batch", type=str)
+    parser.add_argument("-O", "-o", "--output", dest="output", help="Write the plans of every code and year in a file (CSV or JSON)")
+    parser.add_argument("-F", "-f", "--format", dest="format", help="Format of the output (default: 'table' for one code and year, else 'csv', 'json' for a .json output)", choices=formats)
+    parser.add_argument("-L", "-l", "--leaves", dest="leaves", help="Enter the number of paid leaves you have to get the plan with the most days off", type=int)
+    parser.add_argument("-W", "-w", "--workers", dest="workers", help="Processes computing the batch (default: one per CPU)", type=int)
+    parser.add_argument("--make-index", dest="makeIndex", help="Generate the index of the country/state codes again from pycountry (after its update)", action="store_true")
     options = parser.parse_args()
 
-    if options.year is not None:  # Check if year option is empty
-        if not 1801 < options.year <= 9999 :  # Check if the year is supported
-            parser.error("\n    [-] Error in the command : please chose a year in the range ]1801;9999]")
+    if options.makeIndex:  # Nothing else to check
+        return options
+
+    if options.years is not None:  # Check if year option is empty
+        if len(options.years) > 2 or not all(1801 < year <= 9999 for year in options.years):  # Check if the years are supported
+            parser.error("\n    [-] Error in the command : please chose a year (or FIRST LAST) in the range ]1801;9999]")
             parser.error("Check -h or --help for help")
             exit()
+        options.years = list(range(min(options.years), max(options.years) + 1))
     else:
         parser.error("\n    [-] Error in the command : please specify a year")
         parser.error("Check -h or --help for help")
         exit()
 
-    if options.code is not None:  # Check if code option is empty
-        if options.code != options.code.upper():
-            options.code = options.code.upper()    
-        if pycountry.countries.get(alpha_2=options.code) is not None :  # Check if it's a country code
-            if pycountry.subdivisions.get(country_code=options.code.split("-")[0]) is None :  # Check if it's a subdivision code
-                parser.error("\n    [-] Error in the command : please specify a valid state code or don't specify code")
+    if options.codes is not None:  # Check if code option is empty
+        options.codes = [code.upper() for code in options.codes]
+        for code in options.codes:
+            error = checkCode(code)
+            if error is not None:
+                parser.error(f"\n    [-] Error in the command : please specify a valid {error} code or don't specify code ({code})")
                 parser.error("Check -h or --help for help")
                 exit()
-        else : 
-            parser.error("\n    [-] Error in the command : please specify a valid country code or don't specify code")
-            parser.error("Check -h or --help for help")
-            exit()
+
+    if options.leaves is not None and options.leaves < 0:
+        parser.error("\n    [-] Error in the command : please specify a number of paid leaves above or equal to 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.workers is not None and options.workers < 1:
+        parser.error("\n    [-] Error in the command : please specify a number of workers above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.format is None:
+        if (options.output or "").lower().endswith(".json"):
+            options.format = "json"
+        elif options.output is None and len(options.codes or [None]) == 1 and len(options.years) == 1:
+            options.format = "table"
+        else:
+            options.format = "csv"
 
     return options # options = Namespace object with attributes
 
 
+#--------------------------------------------------
+# Function to generate the index of the codes : {country code: name} and {country code: {subdivision code: (name, type)}}
+def makeCodeIndex(path=indexPath):
+    import pycountry
+    from importlib.metadata import version
+    countries = {country.alpha_2: country.name for country in sorted(pycountry.countries, key=lambda x: x.alpha_2)}
+    subdivisions = {}
+    for subdiv in sorted(pycountry.subdivisions, key=lambda x: x.code):
+        subdivisions.setdefault(subdiv.country_code, {})[subdiv.code] = (subdiv.name, subdiv.type)
+
+    lines = [f'# Generated by "python3 HolidayFinder.py --make-index" from pycountry {version("pycountry")}, do not edit', "",
+             f"version = {version('pycountry')!r}", "", "countries = {"]
+    lines += [f"    {code!r}: {name!r}," for code, name in countries.items()]
+    lines += ["}", "", "subdivisions = {"]
+    for countryCode in sorted(subdivisions):
+        lines.append(f"    {countryCode!r}: {{")
+        lines += [f"        {code!r}: {subdiv!r}," for code, subdiv in subdivisions[countryCode].items()]
+        lines.append("    },")
+    lines += ["}", ""]
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+    return len(countries), sum(len(subdivs) for subdivs in subdivisions.values())
+
+
+#--------------------------------------------------
+# Function to check a country or country-subdivision code in O(1), returns None if valid or the kind of code which is wrong
+def checkCode(code):
+    if code.split("-")[0] not in CodeIndex.countries:  # Check if it's a country code
+        return "country"
+    if "-" in code and code not in CodeIndex.subdivisions.get(code.split("-")[0], {}):  # Check if it's a subdivision code
+        return "state"
+    return None
+
+
 #--------------------------------------------------
 # Function to help user getting his country/state code
 def findCode():
-    # Display a list of available countries to the user
-    availableCountries = {}
-    for country in sorted(list(pycountry.countries),key=lambda x: x.alpha_2): 
-        availableCountries[country.alpha_2] = country.name 
-
+    # Display a list of available countries to the user (the index is sorted by code)
     print("\n[+] Available countries:\n")
-    for countryCode, countryName in availableCountries.items():
-        print(f"{countryCode}: {countryName}")
+    print("\n".join(f"{countryCode}: {countryName}" for countryCode, countryName in CodeIndex.countries.items()))
 
-    # Prompt the user to enter a country code
+    # Prompt the user to enter a country code, until it is valid
     selectedCountryCode = input("\n[+] Enter the country code: ").upper()
-
-    # Check if the entered country code is valid
-    if selectedCountryCode not in availableCountries.keys():
+    while selectedCountryCode not in CodeIndex.countries:
         print("\n[-] Invalid country code. Please enter a valid country code.")
-        findCode()
-    else: 
-        selectedCountry = pycountry.countries.get(alpha_2=selectedCountryCode)
-
-        subdivs = pycountry.subdivisions.get(country_code=selectedCountry.alpha_2)
-        # Check if there is state/province in all subdivisions
-        if any(subdiv.type == 'State' or subdiv.type == 'Province' for subdiv in subdivs): 
-            # Display a list of available state/province to the user
-            availableSubdivs = {}
-            for subdiv in sorted(list(subdivs),key=lambda x: x.code): 
-                availableSubdivs[subdiv.code] = subdiv.name
-
-            print("\n[+] Available subdivisions:\n")
-            for stateCode, stateName in availableSubdivs.items():
-                print(f"{stateCode}: {stateName}")
-
-            # Prompt the user to enter a country code
-            selectedSubdivCode = input("\n[+] Enter the subdivision code: ").upper()
-            
-            # Retrieve the holidays for the selected subdivision (if possible)
-            if selectedSubdivCode not in availableSubdivs.keys():
-                print("\n[-] Invalid state/province code. Please enter a valid code.")
-                findCode()
-            else :
-                print(f"\n[+] Your code is : {selectedSubdivCode}")
-                return selectedSubdivCode # selectedSubdivCode = str
-        else :
-            print(f"\n[+] Your code is : {selectedCountryCode}")
-            return selectedCountryCode # selectedCountryCode = str
+        selectedCountryCode = input("\n[+] Enter the country code: ").upper()
+
+    subdivs = CodeIndex.subdivisions.get(selectedCountryCode, {})
+    # Check if there is state/province in all subdivisions
+    if not any(subdivType in ('State', 'Province') for _, subdivType in subdivs.values()):
+        print(f"\n[+] Your code is : {selectedCountryCode}")
+        return selectedCountryCode # selectedCountryCode = str
+
+    # Display a list of available state/province to the user
+    print("\n[+] Available subdivisions:\n")
+    print("\n".join(f"{stateCode}: {stateName}" for stateCode, (stateName, _) in subdivs.items()))
+
+    # Prompt the user to enter a subdivision code, until it is valid
+    selectedSubdivCode = input("\n[+] Enter the subdivision code: ").upper()
+    while selectedSubdivCode not in subdivs:
+        print("\n[-] Invalid state/province code. Please enter a valid code.")
+        selectedSubdivCode = input("\n[+] Enter the subdivision code: ").upper()
+    print(f"\n[+] Your code is : {selectedSubdivCode}")
+    return selectedSubdivCode # selectedSubdivCode = str
 
 
 #--------------------------------------------------
-# Function to get holidays days depending on the country/state code
-def findHolidays(year, code):
-    if "-" in code:  # Checking if subdivision code 
+# Function to get the holidays of a code over a range of years, kept for the next calls : ((datetime object, name), ...) sorted
+@lru_cache(maxsize=256)
+def calendarOf(code, firstYear, lastYear):
+    import holidays
+    if "-" in code:  # Checking if subdivision code
         countryCode, subdivCode = code.split("-")
-        holidaysList = holidays.CountryHoliday(countryCode, state=subdivCode, years=year)
     else:
-        countryCode = code
-        holidaysList = holidays.CountryHoliday(countryCode, state=None, years=year)
+        countryCode, subdivCode = code, None
+    holidaysList = holidays.country_holidays(countryCode, subdiv=subdivCode, years=range(firstYear, lastYear + 1))
+    return tuple(sorted(holidaysList.items()))
 
+
+#--------------------------------------------------
+# Function to get holidays days depending on the country/state code (lastYear : range cached for the other years)
+def findHolidays(year, code, firstYear=None, lastYear=None):
     filteredHolidays = {}
-    for date, holidayName in holidaysList.items():
-        if 0 <= date.weekday() <= 4:  # Check if the day is a weekday (weekend day is not useful to look up)
-            filteredHolidays[holidayName] = date 
+    for date, holidayName in calendarOf(code, firstYear or year, lastYear or year):
+        if date.year == year and 0 <= date.weekday() <= 4:  # Check if the day is a weekday (weekend day is not useful to look up)
+            filteredHolidays[holidayName] = date
 
     # Sort the dictionary by week number
     sortedHolidays = dict(sorted(filteredHolidays.items(), key=lambda x: x[1].isocalendar()))
-     
-    lsDates["Holiday name"].extend(sortedHolidays.keys())  # Sort the properties of the table too
-    
+
     return sortedHolidays  # filteredHolidays = {str: datetime object}
 
 #--------------------------------------------------
 # Function to calculate ranges for taking paid leaves
 def makeRanges(dateList):
-    rangesCoeff = []
-    for date in dateList.items():  # Calculate number of days to add or subtract to have a range
-        # print(days[date[0].weekday()])
-        if date[1].weekday() == 0:  # Monday
-            rangesCoeff.append((0, 4))  # Before and after weekdays left
-        elif date[1].weekday() == 1:  # Tuesday
-            rangesCoeff.append((1, 3))
-        elif date[1].weekday() == 2:  # Wednesday
-            rangesCoeff.append((2, 2))
-        elif date[1].weekday() == 3:  # Thursday
-            rangesCoeff.append((3, 1))
-        else:  # Friday
-            rangesCoeff.append((4, 0))
-
     rangesDates = []
-    for i in range(len(rangesCoeff)):
-        currentHoliday = list(dateList.items())[i][1]  # datetime object of the list of tuple
-        startDay = currentHoliday - timedelta(days=rangesCoeff[i][0])  # Start paid leave to take
-        endDay = currentHoliday + timedelta(days=rangesCoeff[i][1])  # End paid leave to take
+    for currentHoliday in dateList.values():  # datetime objects, in one pass
+        # Calculate number of days to add or subtract to have a range : before and after weekdays left (Monday (0, 4) ... Friday (4, 0))
+        startDay = currentHoliday - timedelta(days=currentHoliday.weekday())  # Start paid leave to take
+        endDay = currentHoliday + timedelta(days=4-currentHoliday.weekday())  # End paid leave to take
 
         if startDay == currentHoliday:  # If holiday is Monday >> no need to take days before
             tmp = currentHoliday + timedelta(days=1)
@@ -162,34 +192,157 @@ def makeRanges(dateList):
 
 
 #--------------------------------------------------
-# Function to make a clean table
-def makeTabulate(rangesDateList):
-    for date in rangesDateList:
-        lsDates["From"].append(date[0])  # Start date
-        lsDates["To"].append(date[1])  # End date
-        lsDates["Week #"].append(date[0].isocalendar()[1])  # Week number
+# Function to get the days of a year as a bit array : True for a working day (not a weekend or a holiday)
+def workdaysOf(year, code, firstYear=None, lastYear=None):
+    import numpy as np
+    firstDay = date(year, 1, 1)
+    workdays = np.ones((date(year + 1, 1, 1) - firstDay).days, dtype=bool)
+    workdays[(5 - firstDay.weekday()) % 7::7] = False  # Saturdays
+    workdays[(6 - firstDay.weekday()) % 7::7] = False  # Sundays
+    for day, _ in calendarOf(code, firstYear or year, lastYear or year):
+        if day.year == year:
+            workdays[(day - firstDay).days] = False
+    return workdays
+
+
+#--------------------------------------------------
+# Function to find the breaks with the most days off for a number of paid leaves, returns (days off, [(first day, last day, paid leaves), ...])
+# A break is a run of working days taken as paid leaves with the days off around them, breaks are split by a worked day
+# DP over the working days t and the leaves k (vector) : O(working days x leaves)
+#   best[t][k] = most days off with the working days up to t and at most k leaves
+#   open[t][k] = best break ending at day t with k leaves, without its end : it grows one day (k-1) or starts at t after best[t-2]
+def planLeaves(workdays, leaves):
+    import numpy as np
+    positions = np.flatnonzero(workdays)
+    leaves = min(leaves, len(positions))
+    bounds = np.concatenate(([-1], positions, [len(workdays)]))  # bounds[t+1] = position of the working day t
+    best = np.zeros((len(positions) + 2, leaves + 1))  # best[t+2] = best[t], best[0] and best[1] before the first working day
+    opened = np.full(leaves + 1, -np.inf)
+    fromStart = np.zeros((len(positions), leaves + 1), dtype=bool)
+    closed = np.zeros((len(positions), leaves + 1), dtype=bool)
+    start, extend = np.full(leaves + 1, -np.inf), np.full(leaves + 1, -np.inf)
+    for t in range(len(positions)):
+        start[1:] = best[t][:-1] - bounds[t] - 1  # The break begins after the previous working day
+        extend[1:] = opened[:-1]
+        fromStart[t] = start >= extend
+        opened = np.maximum(start, extend)
+        close = opened + bounds[t + 2]  # The break ends before the next working day
+        closed[t] = close > best[t + 1]
+        best[t + 2] = np.maximum(best[t + 1], close)
+
+    breaks, t, k = [], len(positions) - 1, leaves
+    while t >= 0:  # Follow the choices back
+        if not closed[t][k]:
+            t -= 1
+            continue
+        end = t
+        while not fromStart[t][k]:
+            t, k = t - 1, k - 1
+        breaks.append((int(bounds[t]) + 1, int(bounds[end + 2]) - 1, end - t + 1))
+        t, k = t - 2, k - 1
+    return int(best[-1][leaves]), breaks[::-1]
+
+
+#--------------------------------------------------
+# Function to make the rows of a clean table
+def makeTabulate(code, year, dateList, rangesDateList):
+    rows = []
+    for holidayName, date in zip(dateList, rangesDateList):
         deltadays = date[1]-date[0]
-        lsDates["Paid leaves"].append(deltadays.days+1)  # Number of paid leaves to take
-        lsDates["# of days off"].append(deltadays.days+1+4)  # Number of off days (+4 => 2 weekends surrounding the week)
+        rows.append({"Code": code, "Year": year, "Holiday name": holidayName,
+                     "From": date[0],  # Start date
+                     "To": date[1],  # End date
+                     "Week #": date[0].isocalendar()[1],  # Week number
+                     "Paid leaves": deltadays.days+1,  # Number of paid leaves to take
+                     "# of days off": deltadays.days+1+4})  # Number of off days (+4 => 2 weekends surrounding the week)
+    return rows  # rows = [{column: value}, ...]
 
 
 #--------------------------------------------------
-# Function to print a pretty table 
-def tablePrint():
-    return str(tabulate.tabulate(lsDates, headers="keys", tablefmt="github"))  # Make a pretty print
+# Function to make the rows of the breaks of a leave plan
+def makeLeaveTabulate(code, year, breaks, firstYear=None, lastYear=None):
+    firstDay = date(year, 1, 1)
+    rows = []
+    for first, last, leaves in breaks:
+        fromDay, toDay = firstDay + timedelta(days=first), firstDay + timedelta(days=last)
+        names = [holidayName for day, holidayName in calendarOf(code, firstYear or year, lastYear or year) if fromDay <= day <= toDay]
+        rows.append({"Code": code, "Year": year, "Holiday name": ", ".join(names),
+                     "From": fromDay,  # First day off
+                     "To": toDay,  # Last day off
+                     "Week #": fromDay.isocalendar()[1],  # Week number
+                     "Paid leaves": leaves,  # Number of paid leaves to take
+                     "# of days off": last-first+1})  # Number of days off in a row
+    return rows  # rows = [{column: value}, ...]
 
 
-############################# [ LAUNCH ] #############################
+#--------------------------------------------------
+# Function to get the rows of a code for several years (one holiday calendar for all of them), the best leave plan with leaves
+def planCode(code, years, leaves=None):
+    rows = []
+    for year in years:
+        if leaves is not None:
+            _, breaks = planLeaves(workdaysOf(year, code, min(years), max(years)), leaves)
+            rows.extend(makeLeaveTabulate(code, year, breaks, min(years), max(years)))
+            continue
+        dateList = findHolidays(year, code, min(years), max(years))
+        rows.extend(makeTabulate(code, year, dateList, makeRanges(dateList)))
+    return rows
+
+
+#--------------------------------------------------
+# Function to get the rows of every code and year, the codes are shared between processes
+def batchPlans(codes, years, workers=None, leaves=None):
+    if workers == 1 or len(codes) == 1:
+        return [row for code in codes for row in planCode(code, years, leaves)]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [row for rows in executor.map(planCode, codes, [years] * len(codes), [leaves] * len(codes)) for row in rows]
 
-options = getArgs()
-if options.code is None :
-    options.code = findCode()
 
-dateList = findHolidays(options.year,options.code)
-rangesDateList = makeRanges(dateList)
-makeTabulate(rangesDateList)
+#--------------------------------------------------
+# Function to write the rows of the plans in a format to stdout or a file, returns the number of rows
+def writeRows(rows, format, output=None, header=columns):
+    if format != "json":
+        return RowWriter.writeRows(([row[column] for column in header] for row in rows), header, format, output)
+    text = json.dumps([{column: row[column] for column in header} for row in rows], default=str, ensure_ascii=False, indent=2) + "\n"
+    if output is None:
+        sys.stdout.write(text)
+    else:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text)
+    return len(rows)
+
+
+#--------------------------------------------------
+# Main function
+def main():
+    options = getArgs()
+    if options.makeIndex:
+        countries, subdivisions = makeCodeIndex()
+        print(f"[+] {countries} countries and {subdivisions} subdivisions written in {indexPath}")
+        return
+    if options.codes is None :
+        options.codes = [findCode()]
+
+    try:
+        rows = batchPlans(options.codes, options.years, options.workers, options.leaves)
+    except NotImplementedError as e:  # Country or subdivision unknown by holidays
+        print(f"[-] Wasn't able to get the holidays: {str(e)}", file=sys.stderr)
+        exit()
+
+    single = len(options.codes) == 1 and len(options.years) == 1
+    header = columns[2:] if single and options.format in ("table", "github") else columns  # Code and year are known
+    nbRows = writeRows(rows, options.format, options.output, header)
+    if options.output is not None:
+        print(f"[+] {nbRows} ranges of {len(options.codes)} code(s) over {len(options.years)} year(s) written in {options.output}")
+    elif single and options.format == "table" and options.leaves is not None:
+        print(f"\n[+] {sum(row['Paid leaves'] for row in rows)} paid leaves => {sum(row['# of days off'] for row in rows)} days off")
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()
 
 #time.sleep(0.052)
 #time.sleep(0.045)
-
-print(tablePrint())
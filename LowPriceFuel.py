@@ -1,51 +1,186 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse, hashlib, json, os
+from html.parser import HTMLParser
+from GeoCache import cacheDir
+from SnapshotCache import atomicWrite, fetch, maxAge
+# requests and bs4 are imported when fetching and parsing only
 
 # The URL of the web page
 url = "https://www.carburant-prix-coutant.fr/"
+# Alerts of the last page parsed {"digest", "parser", "alerts"}, an unchanged page is not parsed again by the same parser
+alertsCache = os.path.join(cacheDir, "alerts.json")
+parsers = ["stream", "strainer", "soup"]
+alertClass = "feature col"  # Exact class of the div of an alert, the same test for every parser
 
-try:
-    # Send an HTTP GET request to the URL
-    response = requests.get(url)
-
-    # Check if the request was successful (status code 200)
-    if response.status_code == 200:
-        # Parse the HTML content of the page
-        tree = BeautifulSoup(response.text, "html.parser")
-
-        # Find the section with the specified class and ID
-        section = tree.find("section", {"class": "container", "id": "alerte"})
-
-        # Check if the section was found
-        if section:
-            divs = section.find_all("div", {"class": "feature col"})
-            print("[+] Carburant prix coûtant :")
-            for div in divs:
-                # Find the <h3> element and extract its brand
-                h3_element = div.find("h3")
-                if h3_element:
-                    title = h3_element.get_text(strip=True).split()[-1]
-
-                # Find the <p> element and extract its text
-                p_element = div.find("p")
-                if p_element:
-                    description = p_element.get_text()
-
-                # Find the link within the <a> tag
-                link = div.find("a")["href"] if div.find("a") else ""
-
-                print("\t\n####################\n")
-                print("\t[*] Brand:", title)
-                print("\t[*] Description:", description)
-                print("\t[*] Link:", link)
-                
-        
-        else:
-            print("[+] No alert for fuel at cost operation")
-    else:
-        print("[-] Failed to fetch the web page. Status code:", response.status_code)
-except requests.exceptions.RequestException as e:
-    print("[-] An error occurred:", e)
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 LowPriceFuel.py")  # Create an object to get args
+    # Options of this program
+    parser.add_argument("-J", "-j", "--json", dest="json", help="Print the alerts as JSON", action="store_true")
+    parser.add_argument("-O", "-o", "--output", dest="output", help="Write the alerts as JSON in a file")
+    parser.add_argument("-P", "-p", "--parser", dest="parser", help="'stream' stops after the alert section, 'strainer' and 'soup' use BeautifulSoup (default: 'stream')", choices=parsers, default="stream")
+    parser.add_argument("--max-age", dest="maxAge", help=f"Seconds during which the cached page is used without asking the server (default: {maxAge})", type=float, default=maxAge)
+    return parser.parse_args()
+
+# Class to read the alerts while the page is parsed, it stops at the end of the alert section
+class AlertParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.alerts = []
+        self.depth = 0  # Sections opened since the alert section, 0 when outside of it
+        self.done = False
+        self.found = False
+        self.alert = None  # Alert of the current <div class="feature col">, None once it is closed
+        self.divs = 0  # Divs opened since the one of the current alert (itself included)
+        self.field = None  # Field read from the current <h3> ('brand') or <p> ('description')
+        self.filled = set()  # Fields of the current alert already read
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "section":
+            attrs = dict(attrs)
+            if self.depth or (attrs.get("id") == "alerte" and "container" in (attrs.get("class") or "").split()):
+                self.depth += 1
+                self.found = True
+        elif not self.depth:
+            return
+        elif tag == "div" and " ".join((dict(attrs).get("class") or "").split()) == alertClass:  # Like BeautifulSoup : tokens joined by a space
+            self.alert = {"brand": "", "description": "", "link": ""}
+            self.filled = set()
+            self.divs = 1
+            self.alerts.append(self.alert)
+        elif tag == "div" and self.alert is not None:
+            self.divs += 1
+        elif self.alert is not None and tag in ("h3", "p") and self.field is None:
+            field = "brand" if tag == "h3" else "description"
+            if field not in self.filled:  # First one only
+                self.field, self.text = field, []
+        elif self.alert is not None and tag == "a" and not self.alert["link"]:  # First link only
+            self.alert["link"] = dict(attrs).get("href") or ""
+
+    def handle_endtag(self, tag):
+        if not self.depth:
+            return
+        if tag == "section":
+            self.depth -= 1
+            self.done = not self.depth
+        elif tag == "div" and self.alert is not None:
+            self.divs -= 1
+            if not self.divs:  # End of the alert : the text after it belongs to no alert
+                self.alert, self.field = None, None
+        elif self.field is not None and tag == ("h3" if self.field == "brand" else "p"):
+            text = "".join(self.text)
+            if self.field == "brand":  # The brand is the last word of the title
+                text = text.split()[-1] if text.split() else ""
+            self.alert[self.field] = text
+            self.filled.add(self.field)
+            self.field = None
+
+    def handle_data(self, data):
+        if self.field is not None:
+            self.text.append(data)
+
+# Function to get the alerts of the page by parsing only up to the end of the alert section
+def streamAlerts(html, chunkSize=1 << 14):
+    parser = AlertParser()
+    for start in range(0, len(html), chunkSize):
+        parser.feed(html[start:start + chunkSize])
+        if parser.done:  # The rest of the page is never parsed
+            break
+    parser.close()
+    return parser.alerts if parser.found else None
+
+# Function to get the alerts of the page with BeautifulSoup (only the alert section is built with 'strainer')
+def soupAlerts(html, strainer=True):
+    from bs4 import BeautifulSoup, SoupStrainer
+    # Parse the HTML content of the page
+    tree = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("section", id="alerte") if strainer else None)
+
+    # Find the section with the specified class and ID
+    section = tree.find("section", {"class": "container", "id": "alerte"})
+
+    # Check if the section was found
+    if not section:
+        return None
+    alerts = []
+    for div in section.find_all("div", {"class": alertClass}):
+        # Find the <h3> element and extract its brand
+        h3_element = div.find("h3")
+        title = h3_element.get_text(strip=True).split() if h3_element else []
+
+        # Find the <p> element and extract its text
+        p_element = div.find("p")
+
+        # Find the link within the <a> tag
+        a_element = div.find("a")
+
+        alerts.append({"brand": title[-1] if title else "",
+                       "description": p_element.get_text() if p_element else "",
+                       "link": a_element.get("href", "") if a_element else ""})
+    return alerts
+
+# Function to get the alerts of the page [{"brand", "description", "link"}, ...], None if there is no alert section
+def parseAlerts(html, parser="stream"):
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")  # The page is served in UTF-8
+    if parser == "stream":
+        return streamAlerts(html)
+    return soupAlerts(html, parser == "strainer")
+
+# Function to get the alerts of a saved page, parsed only if it changed since the last time
+def alertsOf(path, parser="stream", cachePath=None):
+    cachePath = cachePath if cachePath is not None else alertsCache
+    with open(path, "rb") as file:
+        html = file.read()
+    digest = hashlib.sha256(html).hexdigest()
+    try:
+        with open(cachePath) as file:
+            cached = json.load(file)
+        if cached["digest"] == digest and cached["parser"] == parser:  # Each parser gives its own alerts
+            return cached["alerts"]
+    except (OSError, ValueError, KeyError):
+        pass
+    alerts = parseAlerts(html, parser)
+    os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+    atomicWrite(cachePath, json.dumps({"digest": digest, "parser": parser, "alerts": alerts}).encode())
+    return alerts
+
+# Function to download the web page (revalidated with its ETag, pooled connection, timeout and retries) and get its alerts
+def fetchAlerts(maxAge=maxAge, parser="stream"):
+    return alertsOf(fetch(url, maxAge), parser)
+
+# Function to print the alerts
+def printAlerts(alerts):
+    if alerts is None:  # No alert section, an empty one only prints the header
+        print("[+] No alert for fuel at cost operation")
+        return
+    print("[+] Carburant prix coûtant :")
+    for alert in alerts:
+        print("\t\n####################\n")
+        print("\t[*] Brand:", alert["brand"])
+        print("\t[*] Description:", alert["description"])
+        print("\t[*] Link:", alert["link"])
+
+def main():
+    options = getArgs()
+    import requests  # Errors of the fetch, loaded with it
+    try:
+        alerts = fetchAlerts(options.maxAge, options.parser)
+    except requests.exceptions.HTTPError as e:
+        print("[-] Failed to fetch the web page. Status code:", e.response.status_code)
+        return
+    except requests.exceptions.RequestException as e:
+        print("[-] An error occurred:", e)
+        return
+    if options.output is not None:
+        with open(options.output, "w", encoding="utf-8") as output:
+            json.dump(alerts or [], output, ensure_ascii=False, indent=2)
+    if options.json:
+        print(json.dumps(alerts or [], ensure_ascii=False, indent=2))
+    elif options.output is None:
+        printAlerts(alerts)
+
+if __name__ == "__main__":
+    main()
 
 #time.sleep(0.052)
-#time.sleep(0.045)
\ No newline at end of file
+#time.sleep(0.045)
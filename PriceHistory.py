@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, io, os
+import numpy as np
+
+from datetime import datetime
+from GeoCache import cacheDir
+from SnapshotCache import atomicWrite, maxAge
+from StationTable import fuelNames, haversineMany
+
+############################# [ VARIABLES ] #############################
+
+columns = {'key': np.int64, 'price': np.float32, 'maj': np.int64}  # One raw file per column in each day partition, also the state columns
+stationColumns = {'id': np.int64, 'lat': np.float64, 'lon': np.float64, 'address': str}
+partitionColumns = {'day': str, 'minMaj': np.int64}  # Earliest maj of each day partition
+fuelBits = 3  # key = station id << 3 | fuel index (6 fuels)
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 PriceHistory.py")  # Create an object to get args
+    # Options of this program
+    parser.add_argument("-I", "-i", "--ingest", nargs="*", dest="files", help="Append the current export snapshot, or the given JSON export files, to the history")
+    parser.add_argument("-F", "-f", "--fuel", dest="fuel", help="Enter the fuel you want (default: 'SP95')", choices=fuelNames, default="SP95")
+    parser.add_argument("-C", "-c", "--city", dest="address", help="Enter the city, the zipcode or the address of the area")
+    parser.add_argument("-D", "-d", "--distance", dest="dist", help="Enter the radius of the area in kilometer (default: 5)", type=float, default=5)
+    parser.add_argument("-S", "-s", "--station", nargs="+", dest="stations", help="Enter the id(s) of the station(s) you want", type=int)
+    parser.add_argument("--since", dest="since", help="Enter the start of the period (YYYY-MM-DD[THH:MM]) (default: 7 days ago)")
+    parser.add_argument("--until", dest="until", help="Enter the end of the period, excluded (YYYY-MM-DD[THH:MM]) (default: now)")
+    parser.add_argument("-T", "-t", "--top", dest="top", help="Enter the number of stations you want (default: 10)", type=int, default=10)
+    parser.add_argument("--daily", dest="daily", help="Print the daily min/mean/max of the area instead of the stations", action="store_true")
+    parser.add_argument("--path", dest="path", help="Enter the directory of the history (default: the cache directory)")
+    options = parser.parse_args()
+
+    if options.files is None and options.address is None and options.stations is None:
+        parser.error("\n\t[-] Error in the command : please specify --ingest, a city/zipcode/address or station ids")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    try:
+        options.until = np.datetime64(options.until or datetime.now().replace(microsecond=0), 's')
+        options.since = np.datetime64(options.since, 's') if options.since else options.until - np.timedelta64(7, 'D')
+    except ValueError:
+        parser.error("\n\t[-] Error in the command : please specify the dates as YYYY-MM-DD or YYYY-MM-DDTHH:MM")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    return options
+
+# --------------------------------------------------
+# Function to get the address of a station of the export (dict) or of the XML feed (<pdv> element)
+def addressOf(record):
+    if isinstance(record, dict):
+        return f"{record.get('adresse')}, {record.get('cp')} {record.get('ville')}"
+    return f"{record.findtext('adresse')}, {record.get('cp')} {record.findtext('ville')}"
+
+# --------------------------------------------------
+# Function to read the arrays of an .npz file ({name: dtype}), empty ones if it does not exist
+def readArrays(path, fields):
+    try:
+        with np.load(path) as file:
+            return [file[name] for name in fields]
+    except OSError:
+        return [np.empty(0, dtype=dtype) for dtype in fields.values()]
+
+# --------------------------------------------------
+# Function to write arrays as a compressed .npz file atomically
+def writeArrays(path, **arrays):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    atomicWrite(path, buffer.getvalue())
+
+# --------------------------------------------------
+# Function to keep the last row of each key (rows ordered by key then maj)
+def lastOfKeys(keys, *values):
+    last = np.ones(len(keys), dtype=bool)
+    last[:-1] = keys[1:] != keys[:-1]
+    return (keys[last],) + tuple(value[last] for value in values)
+
+# --------------------------------------------------
+# Class to store the price changes of every station, partitioned by day of ingestion (a late update lands in the day it is seen), read back through mmap
+#   <path>/<YYYY-MM-DD>/{key,price,maj}.bin : rows appended as the changes are ingested, maj is their update date
+#   <path>/state/<YYYY-MM-DD>.npz          : last price of every key at the end of each ingestion day
+#   <path>/partitions.npz                  : earliest maj of each day partition, a query skips the later ones updated after its end
+#   <path>/stations.npz                    : id, lat, lon, address of the stations seen
+class PriceHistory:
+    def __init__(self, path=None):
+        self.path = path if path is not None else os.path.join(cacheDir, "history")
+        os.makedirs(os.path.join(self.path, "state"), exist_ok=True)
+
+    # Function to get the names of the day partitions, sorted
+    def partitions(self):
+        return sorted(name for name in os.listdir(self.path) if name[:4].isdigit())
+
+    # Function to get the names of the state checkpoints, sorted
+    def checkpoints(self):
+        return sorted(name[:-4] for name in os.listdir(os.path.join(self.path, "state")) if name.endswith(".npz"))
+
+    # Function to get the earliest maj of each day partition {day: maj}
+    def earliestMajs(self):
+        days, minMajs = readArrays(os.path.join(self.path, "partitions.npz"), partitionColumns)
+        return dict(zip(days.tolist(), minMajs.tolist()))
+
+    # Function to get the (checkpoint or None, day partitions) needed to know the prices between since and until
+    def needed(self, since, until):
+        since, until = np.datetime64(since, 's'), np.datetime64(until, 's')
+        # The last state before the day of since holds the prices ingested before the partitions read
+        start = str(since.astype('datetime64[D]'))
+        checkpoints = [day for day in self.checkpoints() if day < start]
+        checkpoint = checkpoints[-1] if checkpoints else None
+        # A partition ingested after until is only read if it holds a change made before until (late maj)
+        last, earliest = str((until - np.timedelta64(1, 's')).astype('datetime64[D]')), self.earliestMajs()
+        return checkpoint, [day for day in self.partitions() if (checkpoint is None or day >= checkpoint)
+                            and (day <= last or earliest.get(day, -1 << 62) < until.astype(np.int64))]
+
+    # Function to read a state checkpoint (keys sorted)
+    def readState(self, day):
+        return readArrays(os.path.join(self.path, "state", day + ".npz"), columns)
+
+    # Function to map the columns of a day partition (rows of an interrupted append are ignored)
+    def readPartition(self, day):
+        paths = {name: os.path.join(self.path, day, name + ".bin") for name in columns}
+        size = min(os.path.getsize(path) // np.dtype(columns[name]).itemsize if os.path.exists(path) else 0
+                   for name, path in paths.items())
+        if size == 0:  # np.memmap refuses empty files
+            return [np.empty(0, dtype=dtype) for dtype in columns.values()]
+        return [np.memmap(paths[name], dtype=dtype, mode='r', shape=(size,)) for name, dtype in columns.items()]
+
+    # Function to append the prices of a StationTable that changed since the last ingestion, returns the number of rows added
+    def ingest(self, stations, now=None):
+        now = np.datetime64(now or datetime.now().replace(microsecond=0), 's')
+        ids = np.array([int(record.get('id')) for record in stations.records], dtype=np.int64)
+        keys, prices, majs = [], [], []
+        for fuelId, fuel in enumerate(fuelNames):
+            sold = ~np.isnan(stations.prices[fuel])
+            keys.append((ids[sold] << fuelBits) | fuelId)
+            prices.append(stations.prices[fuel][sold].astype(np.float32))
+            updates = stations.updates[fuel][sold] if fuel in stations.updates else np.full(sold.sum(), 'NaT', dtype='datetime64[s]')
+            majs.append(np.where(np.isnat(updates), now, updates).astype(np.int64))  # No update date : seen now
+        keys, prices, majs = np.concatenate(keys), np.concatenate(prices), np.concatenate(majs)
+        order = np.lexsort((majs, keys))
+        keys, prices, majs = lastOfKeys(keys[order], prices[order], majs[order])
+
+        # Deduplicate : keep the new keys and the prices that changed since a newer update
+        checkpoints = self.checkpoints()
+        stateKeys, statePrices, stateMajs = self.readState(checkpoints[-1] if checkpoints else "none")
+        if len(stateKeys):
+            pos = np.minimum(np.searchsorted(stateKeys, keys), len(stateKeys) - 1)
+            changed = (stateKeys[pos] != keys) | ((prices != statePrices[pos]) & (majs > stateMajs[pos]))
+            keys, prices, majs = keys[changed], prices[changed], majs[changed]
+
+        # Append the changes to the partition of the ingestion day, its earliest maj is lowered first (a crash can only make it too low)
+        day = str(now.astype('datetime64[D]'))
+        if len(keys):
+            first, earliest = int(majs.min()), self.earliestMajs()
+            if first < earliest.get(day, first + 1):  # New partition or late change : the index is rewritten
+                earliest[day] = first
+                writeArrays(os.path.join(self.path, "partitions.npz"), day=np.array(list(earliest), dtype=str),
+                            minMaj=np.array(list(earliest.values()), dtype=np.int64))
+            os.makedirs(os.path.join(self.path, day), exist_ok=True)
+            for name, values in zip(columns, (keys, prices, majs)):
+                with open(os.path.join(self.path, day, name + ".bin"), "ab") as file:
+                    values.tofile(file)
+
+        # Written after the partitions : a crash in between at worst appends the same changes twice
+        stateKeys, statePrices, stateMajs = np.concatenate((stateKeys, keys)), np.concatenate((statePrices, prices)), np.concatenate((stateMajs, majs))
+        order = np.lexsort((stateMajs, stateKeys))
+        stateKeys, statePrices, stateMajs = lastOfKeys(stateKeys[order], statePrices[order], stateMajs[order])
+        writeArrays(os.path.join(self.path, "state", day + ".npz"), key=stateKeys, price=statePrices, maj=stateMajs)
+        self.updateStations(ids, stations.lat, stations.lon, [addressOf(record) for record in stations.records])
+        return len(keys)
+
+    # Function to merge the location and address of the stations into the station list
+    def updateStations(self, ids, lat, lon, addresses):
+        path = os.path.join(self.path, "stations.npz")
+        oldIds, oldLat, oldLon, oldAddresses = readArrays(path, stationColumns)
+        pos = np.minimum(np.searchsorted(oldIds, ids), max(len(oldIds) - 1, 0))
+        if len(oldIds) and (oldIds[pos] == ids).all() and (np.isclose(oldLat[pos], lat, equal_nan=True) & np.isclose(oldLon[pos], lon, equal_nan=True)).all():
+            return  # Nothing new : the list is not rewritten on every snapshot
+        ids = np.concatenate((ids, oldIds))  # New values first : np.unique keeps the first occurrence
+        ids, first = np.unique(ids, return_index=True)
+        writeArrays(path, id=ids, lat=np.concatenate((lat, oldLat))[first], lon=np.concatenate((lon, oldLon))[first],
+                    address=np.concatenate((np.asarray(addresses, dtype=str), oldAddresses.astype(str)))[first])
+
+    # Function to get the (ids, distances) of the known stations in a given distance
+    def near(self, coords, dist):
+        ids, lat, lon, _ = readArrays(os.path.join(self.path, "stations.npz"), stationColumns)
+        distances = haversineMany(coords[0], coords[1], lat, lon)
+        inCircle = distances <= dist
+        return ids[inCircle], distances[inCircle]
+
+    # Function to get the addresses of stations
+    def addresses(self, ids):
+        knownIds, _, _, addresses = readArrays(os.path.join(self.path, "stations.npz"), stationColumns)
+        if not len(knownIds):
+            return [""] * len(ids)
+        pos = np.minimum(np.searchsorted(knownIds, ids), len(knownIds) - 1)
+        return [str(addresses[p]) if knownIds[p] == id else "" for p, id in zip(pos, ids)]
+
+    # Function to read the (keys, prices, majs) of a fuel needed to know the prices between since and until
+    def load(self, since, until, fuel, stations=None):
+        until = np.datetime64(until, 's')
+        checkpoint, days = self.needed(since, until)
+        parts = ([self.readState(checkpoint)] if checkpoint is not None else []) + [self.readPartition(day) for day in days]
+        if not parts:
+            return [np.empty(0, dtype=dtype) for dtype in columns.values()]
+        keys, majs = np.concatenate([part[0] for part in parts]), np.concatenate([part[2] for part in parts])
+        selected = ((keys & ((1 << fuelBits) - 1)) == fuelNames.index(fuel)) & (majs < until.astype(np.int64))
+        if stations is not None:
+            selected &= np.isin(keys >> fuelBits, np.asarray(stations, dtype=np.int64))
+        return keys[selected], np.concatenate([part[1] for part in parts])[selected], majs[selected]
+
+    # Function to get the (ids, prices, majs) in effect between since and until (the price at since counts from since)
+    @staticmethod
+    def window(keys, prices, majs, since, until):
+        since, until = np.datetime64(since, 's').astype(np.int64), np.datetime64(until, 's').astype(np.int64)
+        before = majs < since
+        order = np.lexsort((majs[before], keys[before]))
+        carryKeys, carryPrices, _ = lastOfKeys(keys[before][order], prices[before][order], majs[before][order])
+        inside = ~before & (majs < until)
+        return (np.concatenate((carryKeys, keys[inside])) >> fuelBits, np.concatenate((carryPrices, prices[inside])),
+                np.concatenate((np.full(len(carryKeys), since), majs[inside])))
+
+    # Function to get the min/mean/max/last price of each station between since and until
+    def aggregate(self, since, until, fuel, stations=None):
+        ids, prices, majs = self.window(*self.load(since, until, fuel, stations), since, until)
+        order = np.lexsort((majs, ids))
+        ids, prices = ids[order], prices[order].astype(np.float64)
+        stationIds, first, counts = np.unique(ids, return_index=True, return_counts=True)
+        if not len(stationIds):  # reduceat refuses empty arrays
+            return {'station': stationIds, 'count': counts, 'min': prices, 'max': prices, 'mean': prices, 'last': prices}
+        return {'station': stationIds, 'count': counts, 'min': np.minimum.reduceat(prices, first),
+                'max': np.maximum.reduceat(prices, first), 'mean': np.add.reduceat(prices, first) / counts,
+                'last': prices[first + counts - 1]}
+
+    # Function to get the min/mean/max price of the stations for each day between since and until
+    def daily(self, since, until, fuel, stations=None):
+        keys, prices, majs = self.load(since, until, fuel, stations)
+        days = []
+        day = np.datetime64(since, 'D')
+        while day < np.datetime64(until, 's'):
+            dayStart, dayEnd = max(np.datetime64(day, 's'), np.datetime64(since, 's')), min(np.datetime64(day + 1, 's'), np.datetime64(until, 's'))
+            _, inEffect, _ = self.window(keys, prices, majs, dayStart, dayEnd)
+            if len(inEffect):
+                days.append((str(day), float(inEffect.min()), float(inEffect.mean()), float(inEffect.max()), len(inEffect)))
+            day += 1
+        return days
+
+# --------------------------------------------------
+# Function to download the current export and append it to the history
+def ingestSnapshot(history, maxAge=maxAge):
+    import FuelFinder_v2
+    stations = FuelFinder_v2.loadPumps(FuelFinder_v2.loadSnapshot(maxAge))
+    return history.ingest(stations)
+
+# --------------------------------------------------
+def main():
+    options = getArgs()
+    history = PriceHistory(options.path)
+
+    if options.files is not None:  # Ingestion mode
+        import FuelFinder_v2
+        if options.files:
+            for filename in options.files:
+                added = history.ingest(FuelFinder_v2.loadPumps(FuelFinder_v2.JSONParser(filename)))
+                print(f"[+] {filename} : {added} price changes added")
+        else:
+            print(f"[+] Current snapshot : {ingestSnapshot(history)} price changes added")
+        return
+
+    stations = options.stations
+    if options.address is not None:
+        import FuelFinder_v2
+        coords = FuelFinder_v2.getAddress(options.address)
+        if coords is None:
+            print("[-] Wasn't able to retrieve the address")
+            exit()
+        stations, _ = history.near(coords, options.dist)
+
+    print(f"\n[~] {options.fuel} from {str(options.since).replace('T', ' ')} to {str(options.until).replace('T', ' ')}")
+    if options.daily:
+        for day, low, mean, high, count in history.daily(options.since, options.until, options.fuel, stations):
+            print(f"[+] {day} : min {low:.3f} / mean {mean:.3f} / max {high:.3f} EUR/L ({count} prices)")
+        return
+
+    result = history.aggregate(options.since, options.until, options.fuel, stations)
+    order = np.lexsort((result['mean'], result['min']))[:options.top]  # Cheapest over the period first
+    if len(order) == 0:
+        print("[-] No price recorded for this period")
+    for row, address in zip(order, history.addresses(result['station'][order])):
+        print(f"[+] {result['station'][row]} {address}\n\tmin {result['min'][row]:.3f} / mean {result['mean'][row]:.3f} / "
+              f"max {result['max'][row]:.3f} / last {result['last'][row]:.3f} EUR/L ({result['count'][row]} prices)")
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import heapq
+
+############################# [ VARIABLES ] #############################
+
+ranks = ['price', 'combined']
+kmWeight = 0.005  # In 'combined' rank, each km away costs as much as 0.005€ more per litre
+
+############################# [ FUNCTIONS ] #############################
+
+# Class to order ISO update dates the most recent first (only compared when two scores are equal)
+class Newest:
+    __slots__ = ('update',)
+
+    def __init__(self, update):
+        self.update = update or ''  # Unknown dates come last
+
+    def __lt__(self, other):
+        return other.update < self.update
+
+    def __eq__(self, other):
+        return self.update == other.update
+
+# --------------------------------------------------
+# Class to reverse the order of a key (heapq only keeps the smallest item on top)
+class Reverse:
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+# --------------------------------------------------
+# Function to get the score of an offer, the lower the better
+def score(price, distance=0.0, rank='price', kmWeight=kmWeight):
+    if rank == 'combined':  # Trade a few cents for a shorter trip
+        return price + kmWeight * distance
+    return price
+
+# --------------------------------------------------
+# Function to select the K best items of a stream (sorted best first), O(n log K) and only K items kept in memory
+# key(item)[0] must be score(item) : items scoring worse than the K-th best are dropped without building their key
+def topK(items, k, key, score=None):
+    if score is None:
+        return heapq.nsmallest(k, items, key=key)
+    heap = []  # The K best items so far, the worst of them on top
+    for order, item in enumerate(items):
+        if len(heap) == k and score(item) > heap[0][0].key[0]:
+            continue  # Cheap rejection of most of the stream
+        entry = (Reverse(key(item)), -order, item)  # On equal keys the first item seen wins
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heappushpop(heap, entry)
+    return [entry[2] for entry in sorted(heap, reverse=True)]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import csv, io, json, sys
+from itertools import chain, islice
+# tabulate is imported for the small tables only
+
+############################# [ VARIABLES ] #############################
+
+formats = ["table", "github", "csv", "jsonl"]  # 'table' is aligned by tabulate when it is small, the others are streamed
+chunkSize = 1 << 14  # Rows formatted before each write
+tableLimit = 1000  # Rows above which a 'table' is streamed like 'github' instead of being built by tabulate
+bufferSize = 1 << 20  # Buffer of the files opened here
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to get the text of a cell like tabulate writes it
+def cellText(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return format(value, "g")
+    return str(value)
+
+# --------------------------------------------------
+# Function to check if a value is a number (right-aligned column)
+def isNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# --------------------------------------------------
+# Function to get the text of a list of rows as a GitHub table, aligned by tabulate (whole table in memory)
+def tableText(rows, header):
+    from tabulate import tabulate
+    rows = list(rows)
+    texts = [i for i in range(len(header)) if any(isinstance(row[i], str) for row in rows)]  # Zip codes, ids... are not numbers
+    return tabulate(rows, headers=header, tablefmt="github", disable_numparse=texts)
+
+# --------------------------------------------------
+# Function to get the chunks of a GitHub table, the widths are the ones of the first chunk (longer cells only shift their line), numbers are right-aligned
+def githubChunks(rows, header):
+    chunk = list(islice(rows, chunkSize))
+    numbers = [any(isNumber(row[i]) for row in chunk) and all(isNumber(row[i]) or row[i] is None for row in chunk) for i in range(len(header))]
+    widths = [max([len(name) + 2] + [len(cellText(row[i])) for row in chunk]) for i, name in enumerate(header)]
+    line = ("| " + " | ".join(f"{{:{'>' if number else '<'}{width}}}" for number, width in zip(numbers, widths)) + " |\n").format
+    yield line(*header) + "|" + "|".join("-" * (width + 2) for width in widths) + "|\n"
+    while chunk:
+        yield "".join([line(*map(cellText, row)) for row in chunk])
+        chunk = list(islice(rows, chunkSize))
+
+# --------------------------------------------------
+# Function to get the chunks of the rows as text in a format (a small 'table' is one chunk made by tabulate)
+def textChunks(rows, header, format):
+    rows = iter(rows)
+    if format == "table":
+        head = list(islice(rows, tableLimit + 1))
+        if len(head) <= tableLimit:  # Small enough to be read by someone : exact widths
+            yield tableText(head, header) + "\n"
+            return
+        format, rows = "github", chain(head, rows)
+    if format == "github":
+        yield from githubChunks(rows, header)
+        return
+    buffer = io.StringIO()
+    if format == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(header)
+    while True:
+        chunk = list(islice(rows, chunkSize))
+        if not chunk:
+            break
+        if format == "csv":
+            writer.writerows(chunk)  # In memory, written at once below
+        else:
+            buffer.write("".join(json.dumps(dict(zip(header, row)), default=str, ensure_ascii=False) + "\n" for row in chunk))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # Header of a csv without rows
+        yield buffer.getvalue()
+
+# --------------------------------------------------
+# Function to write the rows chunk by chunk in an opened file (one write per chunk), returns the number of rows
+def streamRows(output, rows, header, format):
+    counted = [0]
+    def counting(rows):
+        for counted[0], row in enumerate(rows, 1):
+            yield row
+    for chunk in textChunks(counting(rows), header, format):
+        output.write(chunk)
+    return counted[0]
+
+# --------------------------------------------------
+# Function to write the rows in a format to stdout or to a file, returns the number of rows
+def writeRows(rows, header, format="table", output=None):
+    if output is None:
+        return streamRows(sys.stdout, rows, header, format)
+    with open(output, "w", newline="", encoding="utf-8", buffering=bufferSize) as file:
+        return streamRows(file, rows, header, format)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import asyncio, hashlib, json, os, tempfile, time
+
+from FetchEngine import FetchEngine
+from GeoCache import cacheDir
+# requests is imported by the downloads only
+
+############################# [ VARIABLES ] #############################
+
+maxAge = 300  # The feeds are refreshed every few minutes : serve the cached payload for 5 minutes
+chunkSize = 1 << 16
+workers = 8  # Downloads running at the same time in fetchMany()
+default = None  # SnapshotCache used by fetch()
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to write a file atomically (readers see the old or the new file, never half of it)
+def atomicWrite(path, data):
+    fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmpPath, path)
+    except BaseException:
+        os.remove(tmpPath)
+        raise
+
+# --------------------------------------------------
+# Class to keep the last payload of each URL, revalidated with conditional requests
+class SnapshotCache:
+    def __init__(self, path=None, maxAge=maxAge, session=None, engine=None):
+        self.path = path if path is not None else os.path.join(cacheDir, "snapshots")
+        self.maxAge = maxAge
+        self.engine = engine if engine is not None else FetchEngine(session, perHost=workers)  # Pooling, timeouts and retries
+        self.session = self.engine.session
+        os.makedirs(self.path, exist_ok=True)
+
+    # Function to get the metadata file of a URL
+    def metaPath(self, url):
+        return os.path.join(self.path, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+    # Function to get the payload file of a digest (content-addressed : same content => same file)
+    def blobPath(self, digest):
+        return os.path.join(self.path, digest + ".bin")
+
+    # Function to read the metadata of a URL, None if it has never been fetched
+    def readMeta(self, url):
+        try:
+            with open(self.metaPath(url)) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.isfile(self.blobPath(meta["digest"])) else None
+
+    # Function to get when the cached payload of a URL was downloaded (epoch seconds, a stale one kept after an error keeps its time)
+    def fetchedAt(self, url):
+        meta = self.readMeta(url)
+        return meta["fetched"] if meta is not None else None
+
+    # Function to get the path of the payload of a URL, downloaded only if the cached one is stale and changed
+    def fetch(self, url, offline=False):
+        return asyncio.run(self.fetchAsync(url, offline))
+
+    # Function to get the path of the payload of a URL from asyncio (several downloads can run at the same time)
+    async def fetchAsync(self, url, offline=False):
+        meta = self.readMeta(url)
+        if meta is not None and (offline or time.time() - meta["fetched"] < self.maxAge):
+            return self.blobPath(meta["digest"])  # Fresh enough, no request at all
+        if offline:
+            raise FileNotFoundError(f"No cached snapshot for {url}")
+
+        import requests
+        headers = {}
+        if meta is not None:  # Ask the server to answer 304 if nothing changed
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("lastModified"):
+                headers["If-Modified-Since"] = meta["lastModified"]
+
+        try:
+            response = await self.engine.get(url, headers)
+            try:
+                if response.status_code != 304 or meta is None:
+                    response.raise_for_status()
+                    meta = {"url": url, "digest": await self.engine.call(self.store, response),  # Streamed to disk in a thread
+                            "etag": response.headers.get("ETag"), "lastModified": response.headers.get("Last-Modified")}
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            if meta is None:
+                raise
+            print(f"[-] Wasn't able to refresh the snapshot ({e}), using the cached one")
+            return self.blobPath(meta["digest"])
+
+        meta["fetched"] = time.time()
+        atomicWrite(self.metaPath(url), json.dumps(meta).encode())
+        return self.blobPath(meta["digest"])
+
+    # Function to get the paths of the payloads of several URLs, downloaded concurrently
+    def fetchMany(self, urls, offline=False, workers=workers):
+        return asyncio.run(self.fetchManyAsync(urls, offline, workers))
+
+    # Function to get the paths of the payloads of several URLs from asyncio
+    async def fetchManyAsync(self, urls, offline=False, workers=workers):
+        running = asyncio.Semaphore(workers)
+        async def fetchOne(url):
+            async with running:
+                return await self.fetchAsync(url, offline)
+        return list(await asyncio.gather(*(fetchOne(url) for url in urls)))
+
+    # Function to store a payload for a URL as if it had just been downloaded (e.g. a recorded fixture)
+    def put(self, url, data):
+        digest = hashlib.sha256(data).hexdigest()
+        atomicWrite(self.blobPath(digest), data)
+        atomicWrite(self.metaPath(url), json.dumps({"url": url, "digest": digest, "fetched": time.time()}).encode())
+        return self.blobPath(digest)
+
+    # Function to stream a response body into the cache, return its digest
+    def store(self, response):
+        digest = hashlib.sha256()
+        fd, tmpPath = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in response.iter_content(chunkSize):  # Never hold the whole body in memory
+                    digest.update(chunk)
+                    file.write(chunk)
+            os.replace(tmpPath, self.blobPath(digest.hexdigest()))
+        except BaseException:
+            os.remove(tmpPath)
+            raise
+        self.prune()
+        return digest.hexdigest()
+
+    # Function to delete the payloads no URL points to anymore
+    def prune(self, grace=3600):
+        used = set()
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.path, name)) as file:
+                        used.add(json.load(file)["digest"])
+                except (OSError, ValueError, KeyError):
+                    pass
+        now = time.time()
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            try:
+                # Recent files may belong to another process which did not write its metadata yet
+                if name.endswith(".bin") and name[:-4] not in used and now - os.path.getmtime(path) > grace:
+                    os.remove(path)
+            except OSError:
+                pass
+
+# --------------------------------------------------
+# Function to get the path of the payload of a URL through the default cache
+def fetch(url, maxAge=maxAge, offline=False):
+    global default
+    if default is None:
+        default = SnapshotCache()
+    default.maxAge = maxAge
+    return default.fetch(url, offline)
+
+# --------------------------------------------------
+# Function to get when the cached payload of a URL was downloaded through the default cache
+def fetchedAt(url):
+    global default
+    if default is None:
+        default = SnapshotCache()
+    return default.fetchedAt(url)
+
+# --------------------------------------------------
+# Function to get the paths of the payloads of several URLs through the default cache
+def fetchMany(urls, maxAge=maxAge, offline=False, workers=workers):
+    global default
+    if default is None:
+        default = SnapshotCache()
+    default.maxAge = maxAge
+    return default.fetchMany(urls, offline, workers)
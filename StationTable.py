@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import json
+import numpy as np
+
+from datetime import datetime
+from GeoIndex import earthRadius
+
+############################# [ VARIABLES ] #############################
+
+fuelNames = ['Gazole', 'SP95', 'E85', 'GPLc', 'E10', 'SP98']  # Ordered by the id the feeds give them (1 to 6)
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to convert an update date of the feeds ('2023-11-10 06:43:00', '2023-11-10T06:43:00+01:00'...) to datetime64
+def parseUpdate(text):
+    try:
+        return np.datetime64(datetime.fromisoformat(text).replace(tzinfo=None), 's')  # Wall-clock time of the feed
+    except (TypeError, ValueError):
+        return np.datetime64('NaT')
+
+# --------------------------------------------------
+# Function to convert a list of update dates to a datetime64 array in one call
+def parseUpdates(texts):
+    try:
+        return np.array([text[:19] if text else 'NaT' for text in texts], dtype='datetime64[s]')  # Wall-clock part only
+    except ValueError:  # Unusual format somewhere, convert them one by one
+        return np.array([parseUpdate(text) for text in texts], dtype='datetime64[s]')
+
+# --------------------------------------------------
+# Function to get the list of prices of an export station ('prix' is a JSON string of a list, or of a dict if only one)
+def parsePrices(prix):
+    if isinstance(prix, str):
+        prix = json.loads(prix) if prix else []
+    if isinstance(prix, dict):
+        prix = [prix]
+    return prix or []
+
+# --------------------------------------------------
+# Function to get the great-circle distances in km from one point to arrays of points (GeoIndex.haversine is the scalar one)
+def haversineMany(lat, lon, lats, lons):
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * earthRadius * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+# --------------------------------------------------
+# Function to get the (north-east, south-west) corners of the box around a circle
+def boundingBox(coords, dist):
+    lat, lon = coords
+    kmTodeg = (dist / earthRadius) * (180 / np.pi)  # approx 111km/deg, same radius as the distances
+    dLon = kmTodeg / max(np.cos(np.radians(lat)), 1e-12)  # The Earth is narrower far from the equator
+    return (lat + kmTodeg, lon + dLon), (lat - kmTodeg, lon - dLon)
+
+# --------------------------------------------------
+# Class to store stations as columns (one array per field) to filter a whole snapshot at once
+class StationTable:
+    def __init__(self, lat, lon, prices=None, records=None, available=None, updates=None):
+        self.lat = np.asarray(lat, dtype=np.float64)  # nan when a station has no coordinates
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.prices = prices if prices is not None else {}  # {fuel: float array}, nan when the fuel is not sold
+        self.updates = updates if updates is not None else {}  # {fuel: datetime64 array} of the last price update
+        self.records = records  # Original station objects, row i <=> records[i]
+        self.available = available if available is not None else {}  # {fuel: bool array} of the fuels in stock
+
+    def __len__(self):
+        return len(self.lat)
+
+    # Function to build the table from the data.economie.gouv.fr export [{geom:dict,adresse:str,...},...]
+    @classmethod
+    def fromExport(cls, data):
+        lat = np.full(len(data), np.nan)
+        lon = np.full(len(data), np.nan)
+        prices = {fuel: np.full(len(data), np.nan) for fuel in fuelNames}
+        updates = {fuel: [None] * len(data) for fuel in fuelNames}  # Converted all at once at the end
+        available = {}
+        for row, station in enumerate(data):
+            geom = station.get('geom')
+            if geom:  # Some stations have no coordinates
+                lat[row], lon[row] = geom['lat'], geom['lon']
+            for fuel in station.get('carburants_disponibles') or ():
+                if fuel not in available:
+                    available[fuel] = np.zeros(len(data), dtype=bool)
+                available[fuel][row] = True
+            for price in parsePrices(station.get('prix')):  # Parsed once here, never again when sorting or printing
+                if price.get('@nom') in prices and price.get('@valeur'):
+                    prices[price['@nom']][row] = float(price['@valeur'])
+                    updates[price['@nom']][row] = price.get('@maj')
+        updates = {fuel: parseUpdates(texts) for fuel, texts in updates.items()}
+        return cls(lat, lon, prices, data, available, updates)
+
+    # Function to get the [(fuel, update, price), ...] of the fuels sold by a station
+    def pricesOf(self, row):
+        return [(fuel, str(self.updates[fuel][row]).replace('T', ' '), float(self.prices[fuel][row]))
+                for fuel in fuelNames if not np.isnan(self.prices[fuel][row])]
+
+    # Function to get the rows of the stations selling every fuel of a list
+    def selling(self, fuels, rows=None):
+        if rows is None:
+            rows = np.arange(len(self))
+        for fuel in fuels:
+            if fuel not in self.available:  # No station sells it
+                return rows[:0]
+            rows = rows[self.available[fuel][rows]]
+        return rows
+
+    # Function to change the number of rows (new rows have no coordinates and no prices)
+    def resize(self, size):
+        grow = lambda array, fill: np.concatenate((array[:size], np.full(max(size - len(array), 0), fill, dtype=array.dtype)))
+        old = len(self)
+        self.lat, self.lon = grow(self.lat, np.nan), grow(self.lon, np.nan)
+        self.prices = {fuel: grow(values, np.nan) for fuel, values in self.prices.items()}
+        self.updates = {fuel: grow(values, np.datetime64('NaT')) for fuel, values in self.updates.items()}
+        self.available = {fuel: grow(values, False) for fuel, values in self.available.items()}
+        self.records = (list(self.records or []) + [None] * max(size - old, 0))[:size]
+
+    # Function to write a station of the export in a row, in place of the one stored there ({} to empty the row)
+    def setExport(self, row, station):
+        geom = station.get('geom')
+        self.lat[row], self.lon[row] = (geom['lat'], geom['lon']) if geom else (np.nan, np.nan)
+        for fuel in self.prices:
+            self.prices[fuel][row] = np.nan
+            self.updates[fuel][row] = np.datetime64('NaT')
+        for available in self.available.values():
+            available[row] = False
+        for fuel in station.get('carburants_disponibles') or ():
+            if fuel not in self.available:
+                self.available[fuel] = np.zeros(len(self), dtype=bool)
+            self.available[fuel][row] = True
+        for price in parsePrices(station.get('prix')):
+            if price.get('@nom') in self.prices and price.get('@valeur'):
+                self.prices[price['@nom']][row] = float(price['@valeur'])
+                self.updates[price['@nom']][row] = parseUpdate(price.get('@maj'))
+        self.records[row] = station if station else None
+
+    # Function to build the table from the <pdv> elements of the roulez-eco XML feed
+    @classmethod
+    def fromPumps(cls, pumps):
+        lat = np.full(len(pumps), np.nan)
+        lon = np.full(len(pumps), np.nan)
+        prices = {fuel: np.full(len(pumps), np.nan) for fuel in fuelNames}
+        updates = {fuel: [None] * len(pumps) for fuel in fuelNames}  # Converted all at once at the end
+        for row, pump in enumerate(pumps):
+            if pump.get('latitude') and pump.get('longitude'):  # Some stations have no coordinates
+                lat[row] = float(pump.get('latitude')) / 10 ** 5  # Get the good lat format
+                lon[row] = float(pump.get('longitude')) / 10 ** 5  # Get the good lon format
+            for price in pump.iter('prix'):
+                if price.get('nom') in prices and price.get('valeur'):
+                    prices[price.get('nom')][row] = float(price.get('valeur'))
+                    updates[price.get('nom')][row] = price.get('maj')
+        updates = {fuel: parseUpdates(texts) for fuel, texts in updates.items()}
+        return cls(lat, lon, prices, pumps, updates=updates)
+
+    # Function to get the (rows, distances) of the stations in a given distance, ordered by row
+    def within(self, coords, dist, rows=None):
+        if rows is None:  # Whole snapshot
+            rows = np.arange(len(self))
+        rows = np.sort(np.asarray(rows, dtype=np.intp))
+        lats, lons = self.lat[rows], self.lon[rows]
+        # Cheap prefilter : keep the stations in the box around the circle
+        (maxLat, maxLon), (minLat, minLon) = boundingBox(coords, dist)
+        inBox = (lats >= minLat) & (lats <= maxLat) & (lons >= minLon) & (lons <= maxLon)
+        rows, lats, lons = rows[inBox], lats[inBox], lons[inBox]
+        # Exact test : keep the stations in the circle
+        distances = haversineMany(coords[0], coords[1], lats, lons)
+        inCircle = distances <= dist
+        return rows[inCircle], distances[inCircle]
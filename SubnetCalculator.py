@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
 ############################# [ IMPORTS ] #############################
 
-from tabulate import tabulate
-import ipaddress, argparse, re
+from bisect import bisect_right
+from itertools import count, repeat
+import argparse, io, ipaddress, re, socket, struct, sys
+
+import RowWriter
+# numpy is imported by the lookup only
 
 ############################# [ VARIABLES ] #############################
 
 pattern = r"(\b25[0-5]|\b2[0-4][0-9]|\b[01]?[0-9][0-9]?)(\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)){3}\/([1-9]|[12]\d|3[01]?|32)"  # Regex pattern of an ip address X.X.X.X/Y with X = [0-255] and Y = [1-32]
+pattern6 = r"[0-9A-Fa-f:.]+\/([1-9]|[1-9]\d|1[01]\d|12[0-8])"  # Regex pattern of an IPv6 address X:X::X/Y with Y = [1-128] (the address is checked by inet_pton)
+families = {32: socket.AF_INET, 128: socket.AF_INET6}  # Bits of the addresses => socket family
+columns = ["Network ID", "Network IP", "Broadcast IP", "Subnet Range", "CIDR Mask", "DD Mask", "Anti-DD Mask", "Usable Hosts"]  # Columns of the table
+packIPv4 = struct.Struct(">I").pack  # Integer => 4 bytes of an IPv4 address
+octetPattern = r"(?:25[0-5]|2[0-4]\d|[01]?\d?\d)"  # Decimal octet of 1 to 3 digits up to 255 ('010' is 10)
+addressPattern = re.compile(rf"^.*?(?<!\d)(?<!\d\.)({octetPattern}\.{octetPattern}\.{octetPattern}\.{octetPattern})(?!\d)", re.M)  # First valid IPv4 address of each line of a log, the invalid ones before it are skipped
+readSize = 1 << 22  # Characters of the log read at once
+lookupColumns = ["Network ID", "Network IP", "CIDR Mask", "Addresses"]  # Columns of the addresses counted by subnet
+mapColumns = ["Address", "Network ID"]  # Columns of the subnet of each address
 
 ############################# [ FUNCTIONS ] #############################
 
@@ -15,92 +28,271 @@ def getArgs():
     parser = argparse.ArgumentParser("python3 SubnetCalculator.py")
     parser.add_argument("-I", "-i", "--ip", dest="netIP", help="Enter the network's address you want to cut", type=str)
     parser.add_argument("-n", "--subnet", dest="nbSubnets", help="Enter the number of subnets you want (if the option is empty, the default number is 4)", type=int)
+    parser.add_argument("-H", "--hosts", nargs="+", dest="hosts", help="Enter the number of hosts of each subnet instead, they are allocated largest first (VLSM)", type=int)
+    parser.add_argument("-L", "-l", "--lookup", dest="lookup", help="Count the addresses of a log file ('-' for stdin) in each subnet, the first valid IPv4 address of each line is read")
+    parser.add_argument("-M", "-m", "--map", dest="map", help="With --lookup, write the subnet of every address instead of the counts", action="store_true")
+    parser.add_argument("--offset", dest="offset", help="Index of the first subnet written, the ones before are not computed (default: 0)", type=int, default=0)
+    parser.add_argument("--count", dest="count", help="Number of subnets written from the offset (default: all of them)", type=int)
+    parser.add_argument("-F", "-f", "--format", dest="format", help="Print the subnets as a 'table' (streamed as 'github' above 1000 rows), or stream them as 'github', 'csv' or 'jsonl' rows (default: 'table')", choices=RowWriter.formats, default="table")
+    parser.add_argument("-O", "-o", "--output", dest="output", help="File to write the subnets in (default: stdout)")
     options = parser.parse_args()
 
     if options.netIP is None:  # Check is IP empty
         parser.error("\n    [-] Error in the command: network address option is empty")
         parser.error("Check -h or --help for help")
         exit()
-    elif not re.fullmatch(pattern, options.netIP):  # Check is IP valid
-        parser.error("\n    [-] Error in the command: The specified address does not seem to be a valid IPv4 address in CIDR format")
+    elif not checkNetwork(options.netIP):  # Check is IP valid
+        parser.error("\n    [-] Error in the command: The specified address does not seem to be a valid IPv4 or IPv6 address in CIDR format")
         parser.error("Check -h or --help for help")
         exit()
 
-    if options.nbSubnets is not None:  # Check is nbSubnets empty
-        try:
-            int(options.nbSubnets)
-        except ValueError:
-            parser.error("\n    [-] Error in the command: Please enter an integer value for the subnet number")
+    if options.hosts is not None:  # Check is hosts valid
+        if options.nbSubnets is not None or not all(hosts > 0 for hosts in options.hosts):
+            parser.error("\n    [-] Error in the command: Please enter numbers of hosts above 0, without a number of subnets")
             parser.error("Check -h or --help for help")
             exit()
-
-        if not 0 < int(options.nbSubnets) <= getMaxSub(int(options.netIP.split("/")[1])):  # Check is nbSubnets is valid
+    elif options.nbSubnets is not None:  # Check is nbSubnets empty
+        if not 0 < options.nbSubnets <= getMaxSub(int(options.netIP.split("/")[1]), bitsOf(options.netIP)):  # Check is nbSubnets is valid
             parser.error("\n    [-] Error in the command: Please enter a valid number of subnets")
             parser.error("Check -h or --help for help")
             exit()
     else:
         options.nbSubnets = 4
 
+    if options.offset < 0 or (options.count is not None and options.count < 1):
+        parser.error("\n    [-] Error in the command: Please enter an offset above or equal to 0 and a count above 0")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.lookup is not None and bitsOf(options.netIP) != 32:
+        parser.error("\n    [-] Error in the command: --lookup reads IPv4 addresses only")
+        parser.error("Check -h or --help for help")
+        exit()
+
+    if options.map and options.lookup is None:
+        parser.error("\n    [-] Error in the command: --map needs a log file to --lookup")
+        parser.error("Check -h or --help for help")
+        exit()
+
     return options
 
 
+# --------------------------------------------------
+# Function to check an IPv4 or IPv6 address in CIDR format
+def checkNetwork(netIP):
+    if re.fullmatch(pattern, netIP):
+        return True
+    if not re.fullmatch(pattern6, netIP):
+        return False
+    try:
+        socket.inet_pton(socket.AF_INET6, netIP.split("/")[0])
+    except OSError:
+        return False
+    return True
+
+
+# --------------------------------------------------
+# Function to get the bits of the addresses of a CIDR : 32 for IPv4, 128 for IPv6
+def bitsOf(netIP):
+    return 128 if ":" in netIP else 32
+
+
 # --------------------------------------------------
 # Function to get the maximum number of subnets (or hosts)
-def getMaxSub(mask):
+def getMaxSub(mask, bits=32):
     subnetMask = int(mask)
-    if not 1 <= subnetMask <= 32:
+    if not 1 <= subnetMask <= bits:
         print("\n    [-] Error in the command: Please enter a valid subnet mask")
         exit()
 
-    maxSubnets = 2 ** (32 - subnetMask)
-    # maxHosts = (2 ** (32 - subnetMask)) // options.nbSubnets
+    maxSubnets = 2 ** (bits - subnetMask)
     return maxSubnets
 
 
 # --------------------------------------------------
-# Function to calculate every subnet info
-def subnetCalc():
-    subnetMask = int(IP.split("/")[1])
-    nbSubnets = int(options.nbSubnets)
-    network = ipaddress.ip_network(IP, strict=False)
-    maxPrefixlenDiff = 4 if subnetMask <= 26 else 2
-    subnets = list(network.subnets(prefixlen_diff=maxPrefixlenDiff))  # TODO : make proper maxPrefixlenDiff
-    subnetInfo = {
-        "Network ID": [str(x) for x in range(options.nbSubnets)],
-        "Network IP": [],
-        "Broadcast IP": [],
-        "Subnet Range": [],
-        "CIDR Mask": [],
-        "DD Mask": [],
-        "Anti-DD Mask": [],
-        "Usable Hosts": []
-    }
- 
-    for i,subnet in enumerate(subnets[:nbSubnets]):  # Limit the iteration to the desired number of subnets 
-        #subnetInfo["Network ID"].append(subnet.network_address)
-        subnetInfo["Network IP"].append(subnet.network_address)
-        subnetInfo["Broadcast IP"].append(subnet.broadcast_address)
-        subnetInfo["Subnet Range"].append(f"{subnet.network_address + 1} - {subnet.broadcast_address - 1}")
-        subnetInfo["CIDR Mask"].append(subnet.prefixlen)
-        subnetInfo["DD Mask"].append(str(subnet.netmask))
-        subnetInfo["Anti-DD Mask"].append(str(subnet.hostmask))
-        subnetInfo["Usable Hosts"].append(subnet.num_addresses - 2)
-
-    return subnetInfo
-
-
-# --------------------------------------------------
-# Function to make a pretty table print
-def tablePrint(): 
-    return tabulate(subnetCalc(), headers="keys", tablefmt="github")
+# Function to get the prefix length of the subnets : the mask grows of ceil(log2(nbSubnets)) bits
+def subnetPrefix(mask, nbSubnets):
+    return int(mask) + (nbSubnets - 1).bit_length()
+
+
+# --------------------------------------------------
+# Function to write an IPv4 or IPv6 address held as an integer
+def toIP(value, bits=32):
+    if bits == 32:
+        return socket.inet_ntoa(packIPv4(value))
+    text = socket.inet_ntop(socket.AF_INET6, value.to_bytes(16, "big"))
+    return text if "." not in text else str(ipaddress.IPv6Address(value))  # IPv4 embedded : written like ipaddress does
+
+
+# --------------------------------------------------
+# Function to get the network of a CIDR (the address is not required to be the network one), its mask and its bits as integers
+def parseNetwork(netIP):
+    address, mask = netIP.split("/")
+    bits = bitsOf(netIP)
+    return int.from_bytes(socket.inet_pton(families[bits], address), "big") & ~((1 << (bits - int(mask))) - 1), int(mask), bits
+
+
+# --------------------------------------------------
+# Function to get the subnets of an equal split lazily : (id, network, prefix), ...
+# The i-th subnet is computed directly : offset and limit page huge splits (IPv6) without going through the subnets before
+def equalSubnets(netIP, nbSubnets, offset=0, limit=None):
+    start, mask, bits = parseNetwork(netIP)
+    prefix = subnetPrefix(mask, nbSubnets)
+    size = 1 << (bits - prefix)  # Addresses of each subnet
+    networks = range(start, start + nbSubnets * size, size)[offset:None if limit is None else offset + limit]  # A slice of a range is a range
+    return zip(count(offset), networks, repeat(prefix))
+
+
+# --------------------------------------------------
+# Function to allocate a subnet to each number of hosts, largest first without overlap : [(index of the hosts, network, prefix), ...]
+# Every size is a power of 2 not growing : each subnet starts aligned on its size right after the previous one
+def vlsmSubnets(netIP, hosts):
+    start, mask, bits = parseNetwork(netIP)
+    subnets, offset = [], 0
+    for i in sorted(range(len(hosts)), key=lambda i: -hosts[i]):
+        hostBits = (hosts[i] + 1).bit_length()  # Network and broadcast addresses on top of the hosts
+        subnets.append((i, start + offset, bits - hostBits))
+        offset += 1 << hostBits
+    if offset > 1 << (bits - mask):
+        raise ValueError(f"{offset} addresses are needed for {len(hosts)} subnets, {netIP} has {1 << (bits - mask)}")
+    return subnets
+
+
+# --------------------------------------------------
+# Function to get every subnet info, one row at a time (integers only, nothing is built for the subnets not read yet)
+# IPv6 has no broadcast : its columns hold the last address, and the hosts are counted the same way
+def rowsOf(subnets, bits=32):
+    full = (1 << bits) - 1
+    ntoa = socket.inet_ntoa  # Local names : this loop runs once per subnet
+    text = lambda value: toIP(value, bits)
+    lastPrefix = None
+    for i, network, prefix in subnets:
+        if prefix != lastPrefix:  # Same prefix for every subnet of an equal split
+            netmask = (full << (bits - prefix)) & full
+            lastPrefix, ddMask, antiMask = prefix, text(netmask), text(~netmask & full)
+            size = 1 << (bits - prefix)
+            hosts = size - 2
+        broadcast = network + size - 1
+        if bits == 32:  # Calls inlined for the millions of IPv4 rows
+            yield i, ntoa(packIPv4(network)), ntoa(packIPv4(broadcast)), f"{ntoa(packIPv4((network + 1) & full))} - {ntoa(packIPv4((broadcast - 1) & full))}", prefix, ddMask, antiMask, hosts
+        else:
+            yield i, text(network), text(broadcast), f"{text((network + 1) & full)} - {text((broadcast - 1) & full)}", prefix, ddMask, antiMask, hosts
+
+
+# --------------------------------------------------
+# Function to get every subnet info of an equal split, one row at a time
+def subnetRows(netIP, nbSubnets, offset=0, limit=None):
+    return rowsOf(equalSubnets(netIP, nbSubnets, offset, limit), bitsOf(netIP))
+
+
+# --------------------------------------------------
+# Class to find the subnet of addresses : sorted integer bounds, bisect for one address and searchsorted for arrays
+class SubnetIndex:
+    def __init__(self, subnets):
+        import numpy as np
+        ids, starts, prefixes = zip(*sorted(subnets, key=lambda subnet: subnet[1])) if subnets else ((), (), ())
+        self.ids = np.array(ids, dtype=np.int64)
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = self.starts + np.left_shift(1, 32 - np.array(prefixes, dtype=np.int64)) - 1  # Broadcast addresses
+        self.startList, self.endList = self.starts.tolist(), self.ends.tolist()
+
+    # Function to get the id of the subnet of an address (integer), None if it is in none
+    def lookup(self, address):
+        position = bisect_right(self.startList, address) - 1
+        return int(self.ids[position]) if position >= 0 and address <= self.endList[position] else None
+
+    # Function to get the ids of the subnets of an array of addresses (integers), -1 for the ones in none
+    def lookupMany(self, addresses):
+        import numpy as np
+        if not len(self.starts):
+            return np.full(len(addresses), -1, dtype=np.int64)
+        positions = np.maximum(np.searchsorted(self.starts, addresses, side="right") - 1, 0)
+        return np.where((addresses >= self.starts[positions]) & (addresses <= self.ends[positions]), self.ids[positions], -1)
+
+
+# --------------------------------------------------
+# Function to convert IPv4 addresses matched by addressPattern to integers, returns (addresses, array) : the octets are decimal ('010' is 10)
+def toIntegers(addresses):
+    import numpy as np
+    octets = np.fromstring(".".join(addresses), dtype=np.int64, sep=".").reshape(-1, 4) if addresses else np.zeros((0, 4), dtype=np.int64)
+    return addresses, (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+
+
+# --------------------------------------------------
+# Function to read the first IPv4 address of each line of a log by chunks : (addresses, array of integers), ...
+def readAddresses(file, readSize=readSize):
+    rest = ""
+    while True:
+        chunk = file.read(readSize)
+        if not chunk:
+            break
+        text = rest + chunk
+        cut = text.rfind("\n") + 1  # The last line may go on in the next chunk
+        text, rest = text[:cut], text[cut:]
+        yield toIntegers(addressPattern.findall(text))
+    if rest:
+        yield toIntegers(addressPattern.findall(rest))
+
+
+# --------------------------------------------------
+# Function to count the addresses of a log in each subnet, returns (array of counts by id, addresses in none)
+def classify(index, file, nbIds):
+    import numpy as np
+    counts = np.zeros(nbIds + 1, dtype=np.int64)  # The last one counts the addresses in no subnet
+    for _, addresses in readAddresses(file):
+        ids = index.lookupMany(addresses)
+        ids[ids < 0] = nbIds
+        counts += np.bincount(ids, minlength=nbIds + 1)
+    return counts[:-1], int(counts[-1])
+
+
+# --------------------------------------------------
+# Function to get the subnet of each address of a log, one row at a time : (address, id or '' if in none)
+def mapRows(index, file):
+    for addresses, integers in readAddresses(file):
+        yield from zip(addresses, [i if i >= 0 else "" for i in index.lookupMany(integers).tolist()])
+
+
+# --------------------------------------------------
+# Function to calculate every subnet info as columns
+def subnetCalc(netIP, nbSubnets):
+    return dict(zip(columns, map(list, zip(*subnetRows(netIP, nbSubnets)))))
+
+
+# --------------------------------------------------
+# Main function
+def main():
+    options = getArgs()  # Get the args
+    try:
+        subnets = vlsmSubnets(options.netIP, options.hosts) if options.hosts is not None else equalSubnets(options.netIP, options.nbSubnets)
+    except ValueError as e:
+        print(f"[-] Wasn't able to allocate the subnets: {str(e)}", file=sys.stderr)
+        exit()
+    if options.lookup is None:
+        if options.hosts is None:  # Only the subnets of the page are computed
+            subnets = equalSubnets(options.netIP, options.nbSubnets, options.offset, options.count)
+        else:
+            subnets = subnets[options.offset:None if options.count is None else options.offset + options.count]
+        RowWriter.writeRows(rowsOf(subnets, bitsOf(options.netIP)), columns, options.format, options.output)
+        return
+
+    subnets = list(subnets)
+    index = SubnetIndex(subnets)
+    # Latin-1, stdin included (not the locale encoding) : any byte is read as one character
+    log = io.TextIOWrapper(sys.stdin.buffer, encoding="latin-1") if options.lookup == "-" else open(options.lookup, encoding="latin-1")
+    with log:
+        if options.map:
+            RowWriter.writeRows(mapRows(index, log), mapColumns, options.format, options.output)
+            return
+        counts, outside = classify(index, log, len(subnets))
+    RowWriter.writeRows(((i, toIP(network), prefix, int(counts[i])) for i, network, prefix in subnets), lookupColumns, options.format, options.output)
+    print(f"[*] {int(counts.sum())} addresses in the subnets, {outside} in none", file=sys.stderr)
 
 
 ############################# [ LAUNCH ] #############################
 
-options = getArgs()  # Get the args
-IP = options.netIP
+if __name__ == "__main__":
+    main()
 
 # time.sleep(0.052)
 # time.sleep(0.045)
-
-print(tablePrint())
\ No newline at end of file
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeAlertPage
+import LowPriceFuel
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_alerts.py")
+    parser.add_argument("-a", "--alerts", dest="alerts", type=int, default=6, help="Number of alerts on the page")
+    parser.add_argument("-p", "--padding", dest="padding", nargs="*", type=int, default=[50, 500, 5000], help="Blocks of content after the alerts")
+    parser.add_argument("-r", "--repeat", dest="repeat", type=int, default=20, help="Number of runs kept (best one)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to reproduce the former parsing (whole page in BeautifulSoup, find("a") twice per div)
+def legacyAlerts(html):
+    from bs4 import BeautifulSoup
+    tree = BeautifulSoup(html, "html.parser")
+    section = tree.find("section", {"class": "container", "id": "alerte"})
+    alerts = []
+    for div in section.find_all("div", {"class": "feature col"}):
+        h3_element = div.find("h3")
+        p_element = div.find("p")
+        alerts.append({"brand": h3_element.get_text(strip=True).split()[-1], "description": p_element.get_text(),
+                       "link": div.find("a")["href"] if div.find("a") else ""})
+    return alerts
+
+# --------------------------------------------------
+# Function to get the best time of a call in milliseconds
+def timeit(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    print(f"{'page (KiB)':>10} | {'legacy (ms)':>11} | {'soup (ms)':>9} | {'strainer (ms)':>13} | {'stream (ms)':>11} | {'unchanged (ms)':>14}")
+    with tempfile.TemporaryDirectory() as path:
+        for padding in options.padding:
+            html = makeAlertPage(options.alerts, padding)
+            pagePath = os.path.join(path, "page.html")
+            with open(pagePath, "wb") as file:
+                file.write(html)
+            legacyTime, expected = timeit(lambda: legacyAlerts(html), options.repeat)
+            times = {}
+            for parser in LowPriceFuel.parsers:
+                times[parser], alerts = timeit(lambda: LowPriceFuel.parseAlerts(html, parser), options.repeat)
+                assert alerts == expected, f"The '{parser}' parser found other alerts"
+            cachePath = os.path.join(path, f"alerts-{padding}.json")
+            LowPriceFuel.alertsOf(pagePath, cachePath=cachePath)  # First run : parsed and cached
+            cachedTime, alerts = timeit(lambda: LowPriceFuel.alertsOf(pagePath, cachePath=cachePath), options.repeat)
+            assert alerts == expected, "The cached alerts differ"
+            print(f"{len(html) / 1024:>10.0f} | {legacyTime:>11.2f} | {times['soup']:>9.2f} | {times['strainer']:>13.2f} | "
+                  f"{times['stream']:>11.2f} | {cachedTime:>14.2f}")
+
+        # Nested divs, an alert without <p> and a <p>/<a> after the last alert : nothing is attached outside of its div
+        html = ('<section class="container" id="alerte"><div class="feature col"><div class="icon"></div><h3>Opération Total</h3></div>'
+                '<div class="feature col"><h3>Opération Auchan</h3><p>Du 1/11 au 2/11.</p></div>'
+                '<p>Mentions légales</p><a href="/cgu">CGU</a></section>').encode("utf-8")
+        expected = [{"brand": "Total", "description": "", "link": ""}, {"brand": "Auchan", "description": "Du 1/11 au 2/11.", "link": ""}]
+        for parser in LowPriceFuel.parsers:
+            assert LowPriceFuel.parseAlerts(html, parser) == expected, f"The '{parser}' parser attached text outside of an alert"
+
+        # Only the divs of class "feature col" are alerts, whatever the parser
+        html = ('<section class="container" id="alerte"><div class="feature"><h3>Opération Total</h3></div>'
+                '<div class="feature col highlight"><h3>Opération Leclerc</h3></div><div class="col feature"><h3>Opération Auchan</h3></div>'
+                '<div class="feature  col"><h3>Opération Carrefour</h3><p>Ce week-end.</p></div></section>').encode("utf-8")
+        expected = [{"brand": "Carrefour", "description": "Ce week-end.", "link": ""}]
+        for parser in LowPriceFuel.parsers:
+            assert LowPriceFuel.parseAlerts(html, parser) == expected, f"The '{parser}' parser took another div as an alert"
+
+        # The cached alerts of a parser are not returned for another one
+        with open(pagePath, "wb") as file:
+            file.write(html)
+        cachePath = os.path.join(path, "alerts-parsers.json")
+        for parser in LowPriceFuel.parsers:
+            LowPriceFuel.alertsOf(pagePath, parser, cachePath)
+            with open(cachePath) as file:
+                assert json.load(file)["parser"] == parser, f"The '{parser}' parser got the cached alerts of another one"
+    print("[+] Edge cases and cache by parser checked")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeJsonStations
+import numpy as np
+import FuelFinder_v2
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_asc_order.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations (the national snapshot has ~11k)")
+    parser.add_argument("-F", "--fuel", dest="fuel", default="SP95", help="First choice fuel")
+    parser.add_argument("-r", "--repeat", dest="repeat", type=int, default=5, help="Number of runs to average")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to reproduce the former ascOrder (eval of 'prix' for every station)
+def legacyAscOrder(stations, firstChoiceFuelName):
+    sortedPumpList = []
+    for station in stations:
+        fuels = eval(station['prix'])
+        firstChoiceFuelPrice = None
+        for fuel in fuels:
+            if fuel['@nom'] == firstChoiceFuelName:
+                firstChoiceFuelPrice = float(fuel['@valeur'])
+                break
+        if firstChoiceFuelPrice is not None:
+            station['firstChoiceFuel'] = {'name': firstChoiceFuelName, 'price': firstChoiceFuelPrice}
+            sortedPumpList.append(station)
+    return sorted(sortedPumpList, key=lambda x: x['firstChoiceFuel']['price'])
+
+# --------------------------------------------------
+# Function to get the mean time of a call in seconds
+def timeit(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    data = makeJsonStations(makeStations(options.stations))
+
+    legacyTime, expected = timeit(lambda: legacyAscOrder(data, options.fuel), options.repeat)
+    loadTime, stations = timeit(lambda: FuelFinder_v2.loadPumps(data), options.repeat)
+    rows = np.arange(len(stations))
+    newTime, found = timeit(lambda: FuelFinder_v2.ascOrder(stations, rows, options.fuel), options.repeat)
+
+    expectedPrices = [station['firstChoiceFuel']['price'] for station in expected]
+    assert expectedPrices == stations.prices[options.fuel][found].tolist(), "Both orders differ"
+    print(f"[+] {len(data)} stations, {len(found)} selling {options.fuel}")
+    print(f"\t[*] eval + sort (former)      : {legacyTime * 1000:8.2f} ms per call")
+    print(f"\t[*] parse once (load)         : {loadTime * 1000:8.2f} ms, once per snapshot")
+    print(f"\t[*] price table + argsort     : {newTime * 1000:8.2f} ms per call ({legacyTime / newTime:.0f}x)")
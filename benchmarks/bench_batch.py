@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, os, random, subprocess, sys, tempfile, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)  # Make the scripts importable
+from fixtures import makeStations, makeAddresses
+from fakefeeds import FakeFeeds
+from urllib.parse import urlsplit, parse_qs
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_batch.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=10000, help="Number of stations of the fake snapshot")
+    parser.add_argument("-q", "--queries", dest="queries", type=int, default=500, help="Number of queries of the batch")
+    parser.add_argument("-s", "--single", dest="single", type=int, default=10, help="Number of queries run as separate processes")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to fill a cache directory so both modes run offline (snapshots + geocoding)
+def seedCache(cacheHome, stations, addresses, queries):
+    os.environ["XDG_CACHE_HOME"] = cacheHome  # Read by GeoCache when imported
+    import FuelFinder_v2
+    from GeoCache import GeoCache
+    from SnapshotCache import SnapshotCache
+
+    feeds = FakeFeeds(stations)  # Only used to answer the queries, the server is not started
+    urls = [FuelFinder_v2.URLForger([], where) for where in FuelFinder_v2.snapshotSlices()]  # Batch mode
+    for query in queries:  # Single query mode
+        urls += [FuelFinder_v2.URLForger(query["fuels"], where) for where in FuelFinder_v2.nearSlices([addresses[query["address"]]], query["radius"])]
+    snapshots = SnapshotCache()
+    for url in urls:
+        snapshots.put(url, json.dumps(feeds.export(parse_qs(urlsplit(url).query))).encode())
+
+    geoCache = GeoCache(lambda query: (query, *addresses[query]))
+    for address in addresses:
+        geoCache.lookup(address)
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    rand = random.Random(2)
+    stations = makeStations(options.stations)
+    addresses = makeAddresses(max(options.queries // 4, 1))  # Several depots share an address
+    fuelLists = [["SP95"], ["E85"], ["Gazole"], ["E10", "SP98"]]
+    queries = [{"address": rand.choice(list(addresses)), "fuels": rand.choice(fuelLists), "radius": rand.choice([5, 10, 20])}
+               for _ in range(options.queries)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        seedCache(folder, stations, addresses, queries[:options.single])
+        batchFile = os.path.join(folder, "queries.jsonl")
+        badLines = ['{"fuels": ["SP95"], "radius": 5}', '{"address": "", "radius": 5}', '{"address": "Paris", "radius": -3}',
+                    '{"address": "Paris", "radius": "abc"}', '{"address": "Paris", "radius": 25}', '{"address": "Paris"', '["Paris"]']
+        with open(batchFile, "w") as file:
+            file.writelines(json.dumps(query) + "\n" for query in queries)
+            file.writelines(line + "\n" for line in badLines)  # Reported and skipped, the batch goes on
+
+        script = os.path.join(root, "FuelFinder_v2.py")
+        env = dict(os.environ, XDG_CACHE_HOME=folder)
+        start = time.perf_counter()
+        errors = subprocess.run([sys.executable, script, "--batch", batchFile, "--max-age", "1e9", "-o", os.devnull], env=env, check=True,
+                                capture_output=True, text=True).stderr
+        batchTime = time.perf_counter() - start
+        skipped = [line for line in errors.splitlines() if "skipped" in line]
+        sys.stderr.write("".join(line + "\n" for line in errors.splitlines() if "skipped" not in line))  # Throughput report of the batch
+        assert [line.split(" line ")[1].split()[0] for line in skipped] == [str(len(queries) + i) for i in range(1, len(badLines) + 1)], errors
+
+        start = time.perf_counter()
+        for query in queries[:options.single]:
+            output = subprocess.run([sys.executable, script, "-c", query["address"], "-f", *query["fuels"], "-d", str(query["radius"]), "--max-age", "1e9"],
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            assert "Wasn't able" not in output, output  # Must be answered from the seeded cache
+        singleTime = (time.perf_counter() - start) / min(options.single, len(queries))
+
+    print(f"[+] Batch mode         : {len(queries)} queries in {batchTime:.2f}s => {len(queries) / batchTime:.1f} queries/sec (process startup included)")
+    print(f"[+] One process/query  : {singleTime:.3f}s per query => {1 / singleTime:.1f} queries/sec")
+    print(f"[+] Speedup            : {singleTime * len(queries) / batchTime:.0f}x")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, sys, time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import BlendPlanner, FuelFinder_v2
+from FuelE85Ratio import ethanolOf, refillCalcul
+from fixtures import makeStations, makeJsonStations
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_blend.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations of the snapshot")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=200, help="Stations searched one by one (the result is extrapolated)")
+    parser.add_argument("-g", "--grid", dest="grid", type=int, default=2001, help="Liters of E85 tried per station and base fuel by the search")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to find the cheapest blend of one station by trying every amount of E85 of a grid, returns the cost (inf if none)
+def gridSearch(stations, row, fuelLasting, capacity, ethanolMin, ethanolMax, grid):
+    refill, best = refillCalcul(fuelLasting, capacity), np.inf
+    for base, grade in BlendPlanner.bases.items():
+        for e85 in np.linspace(0, refill, grid).tolist():
+            fuelLiters = refill - e85
+            ethanol = (ethanolOf[grade] * fuelLiters + 0.85 * e85) / refill
+            if not ethanolMin - 1e-9 <= ethanol <= ethanolMax + 1e-9:
+                continue
+            cost = (stations.prices[base][row] * fuelLiters if fuelLiters > 0 else 0) + (stations.prices["E85"][row] * e85 if e85 > 0 else 0)
+            if not np.isnan(cost):
+                best = min(best, cost)
+    return best
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    stations = FuelFinder_v2.loadPumps(makeJsonStations(makeStations(options.stations)))
+    rows = np.flatnonzero(~np.isnan(stations.prices["E85"]))
+    fuelLasting, capacity, ethanolMin, ethanolMax = 0.2, 50, 0.3, 0.85
+
+    planTime, plan = timeit(lambda: BlendPlanner.planBlends(stations, rows, fuelLasting, capacity, ethanolMin, ethanolMax))
+    sample = rows[:min(options.sample, len(rows))]
+    searchTime, costs = timeit(lambda: [gridSearch(stations, row, fuelLasting, capacity, ethanolMin, ethanolMax, options.grid) for row in sample.tolist()])
+    planned = dict(zip(plan["rows"].tolist(), plan["cost"].tolist()))
+    step = refillCalcul(fuelLasting, capacity) / (options.grid - 1) * 2  # The grid is at most one step away from the optimum, the prices differ by less than 2 EUR/L
+    for row, cost in zip(sample.tolist(), costs):
+        assert (row not in planned and cost == np.inf) or (planned[row] <= cost + 1e-6 and cost - planned[row] <= step), f"Station {row} differs from the search"
+    searchTime *= len(rows) / len(sample)
+
+    # Full tank : nothing to buy, every station has a free blend of 0 L
+    full = BlendPlanner.planBlends(stations, rows, 1.0, capacity, ethanolMin, ethanolMax)
+    assert len(full["rows"]) == len(rows) and not full["cost"].any() and not full["e85Liters"].any() and not full["fuelLiters"].any(), "A full tank must cost nothing"
+
+    print(f"[+] {len(rows)} stations with E85, {len(plan['rows'])} with a blend in {ethanolMin * 100:g}-{ethanolMax * 100:g} % of ethanol")
+    print(f"[+] Grid search per station ({options.grid} points) : {searchTime:.2f}s (extrapolated from {len(sample)})")
+    print(f"[+] Vectorized planner                  : {planTime * 1000:.2f}ms ({searchTime / planTime:.0f}x faster)")
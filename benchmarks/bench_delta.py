@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeJsonStations, makeAddresses
+import numpy as np
+import FuelFinder_v2
+from FeedDelta import LiveStations, AreaRanking
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_delta.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations (the national snapshot has ~11k)")
+    parser.add_argument("-p", "--polls", dest="polls", type=int, default=20, help="Number of consecutive snapshots")
+    parser.add_argument("-c", "--changes", dest="changes", nargs="*", type=int, default=[10, 100, 1000], help="Stations changing between two snapshots")
+    parser.add_argument("-a", "--areas", dest="areas", type=int, default=50, help="Number of areas ranked")
+    parser.add_argument("-D", "--distance", dest="dist", type=float, default=20, help="Radius of the areas in km")
+    parser.add_argument("-F", "--fuel", dest="fuel", default="SP95", help="Fuel ranked")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to make the next snapshot : a few stations get new prices, one appears and one disappears
+def nextSnapshot(data, nbChanges, poll, rand):
+    data = list(data)
+    newcomer = dict(data.pop(rand.randrange(len(data))))  # The removed station comes back under a new id
+    newcomer['id'] = 2000000 + poll
+    for row in rand.sample([row for row, station in enumerate(data) if station['prix'] != '[]'], nbChanges):  # Stations with prices only
+        station = dict(data[row])
+        prices = json.loads(station['prix'])
+        for price in prices:
+            price['@valeur'] = str(round(float(price['@valeur']) + rand.choice((-0.01, 0.01)), 3))
+            price['@maj'] = f"2023-12-01 {poll % 24:02d}:00:00"
+        station['prix'] = json.dumps(prices)
+        data[row] = station
+    data.append(newcomer)
+    return data
+
+# --------------------------------------------------
+# Function to rank every area from scratch, like each poll did before
+def fullPoll(data, areas, dist, fuel):
+    stations = FuelFinder_v2.loadPumps(data)
+    index = FuelFinder_v2.indexPumps(stations)
+    return stations, [FuelFinder_v2.ascOrder(stations, FuelFinder_v2.registerNearPumps(stations, coords, dist, index), fuel) for coords in areas]
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    areas = list(makeAddresses(options.areas).values())
+    print(f"{'changes':>7} | {'json (ms)':>9} | {'full poll (ms)':>14} | {'delta poll (ms)':>15} | {'speedup':>7}")
+    for nbChanges in options.changes:
+        rand = random.Random(nbChanges)
+        data = makeJsonStations(makeStations(options.stations))
+        live = LiveStations()
+        live.apply(data)
+        rankings = [AreaRanking(live, coords, options.dist, options.fuel) for coords in areas]
+        jsonTimes, fullTimes, deltaTimes = [], [], []
+        for poll in range(options.polls):
+            data = nextSnapshot(data, nbChanges, poll, rand)
+            payload = json.dumps(data)
+            start = time.perf_counter()
+            json.loads(payload)  # Paid by both pipelines, shown for scale
+            jsonTimes.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            stations, expected = fullPoll(data, areas, options.dist, options.fuel)
+            fullTimes.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            delta = live.apply(data)
+            for ranking in rankings:
+                ranking.update(delta)
+            deltaTimes.append(time.perf_counter() - start)
+            assert len(delta.updated) == nbChanges and len(delta.inserted) == 1 and len(delta.removed) == 1, "Wrong delta"
+
+            # Both pipelines must give the same stations in the same order
+            for ranking, rows in zip(rankings, expected):
+                assert [live.table.records[row]['id'] for row in ranking.top()] == [stations.records[row]['id'] for row in rows], "The rankings differ"
+        print(f"{nbChanges:>7} | {np.median(jsonTimes) * 1000:>9.1f} | {np.median(fullTimes) * 1000:>14.1f} | "
+              f"{np.median(deltaTimes) * 1000:>15.1f} | {np.median(fullTimes) / np.median(deltaTimes):>6.1f}x")
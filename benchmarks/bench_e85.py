@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, io, os, sys, tempfile, time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import FuelE85Ratio
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_e85.py")
+    parser.add_argument("-n", "--vehicles", dest="vehicles", type=int, default=1000000, help="Number of vehicles of the fleet")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=10000, help="Vehicles solved one by one (the result is extrapolated)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to make a fleet (percentages like the CSV, some targets out of reach)
+def makeFleet(nbVehicles, seed=0):
+    rand = np.random.default_rng(seed)
+    return (rand.integers(0, 100, nbVehicles).astype(np.float64), rand.choice([40.0, 50.0, 60.0, 70.0], nbVehicles),
+            rand.integers(0, 100, nbVehicles).astype(np.float64), rand.choice(["E5", "E10"], nbVehicles))
+
+# --------------------------------------------------
+# Function to solve one vehicle like the former script (2x2 matrix inverted)
+def legacySolve(fuelLasting, capacity, acceptance, fuel):
+    leftSide = np.array([[fuel, 0.85], [1, 1]])
+    rightSide = np.array([capacity * acceptance - (fuelLasting * capacity * acceptance), (1 - fuelLasting) * capacity])
+    return np.linalg.inv(leftSide).dot(rightSide)
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    lasting, capacity, ethanol, fuelTypes = makeFleet(options.vehicles)
+    fuel = np.where(fuelTypes == "E10", 0.1, 0.05)
+    solveTime, (x, y, feasible) = timeit(lambda: FuelE85Ratio.solve(lasting / 100, capacity, ethanol / 100, fuel))
+
+    # Same system with np.linalg.solve on stacked 2x2 matrices
+    def batchedSolve():
+        leftSides = np.empty((len(fuel), 2, 2))
+        leftSides[:, 0, 0], leftSides[:, 0, 1], leftSides[:, 1, :] = fuel, 0.85, 1
+        refill = (1 - lasting / 100) * capacity
+        return np.linalg.solve(leftSides, np.stack((refill * ethanol / 100, refill), axis=1)[..., None])[..., 0]
+    batchedTime, solutions = timeit(batchedSolve)
+    assert np.allclose(solutions[:, 0], x) and np.allclose(solutions[:, 1], y), "The batched solve differs"
+
+    sample = range(min(options.sample, options.vehicles))
+    loopTime, legacy = timeit(lambda: [legacySolve(lasting[i] / 100, capacity[i], ethanol[i] / 100, fuel[i]) for i in sample])
+    assert np.allclose(np.array(legacy), np.stack((x[:len(sample)], y[:len(sample)]), axis=1)), "The closed form differs from the matrix inversion"
+    loopTime *= options.vehicles / len(sample)
+
+    with tempfile.TemporaryDirectory() as path:
+        inputPath = os.path.join(path, "fleet.csv")
+        with open(inputPath, "w") as file:
+            file.write(",".join(FuelE85Ratio.columns) + "\n")
+            file.write("".join(f"{a:g},{b:g},{c:g},{d}\n" for a, b, c, d in zip(lasting.tolist(), capacity.tolist(), ethanol.tolist(), fuelTypes.tolist())))
+        readTime, vehicles = timeit(lambda: FuelE85Ratio.readVehicles(inputPath))
+        writeTime, _ = timeit(lambda: FuelE85Ratio.writeSolutions(io.StringIO(), vehicles[4], x, y, feasible))
+
+    print(f"[+] {options.vehicles} vehicles, {int((~feasible).sum())} infeasible")
+    print(f"[+] One np.linalg.inv per vehicle : {loopTime:.2f}s (extrapolated from {len(sample)})")
+    print(f"[+] Batched np.linalg.solve       : {batchedTime:.3f}s")
+    print(f"[+] Closed form                   : {solveTime:.3f}s ({loopTime / solveTime:.0f}x faster than the loop)")
+    print(f"[+] CSV read : {readTime:.2f}s, CSV write : {writeTime:.2f}s")
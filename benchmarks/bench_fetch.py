@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, asyncio, os, sys, tempfile, time
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fakefeeds import FakeFeeds, exportPath, instantPath, alertPath
+from fixtures import makeStations
+import FuelFinder_v2, FuelReport
+from FetchEngine import FetchEngine
+from SnapshotCache import SnapshotCache
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_fetch.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations in the feeds")
+    parser.add_argument("-l", "--latency", dest="latency", type=float, default=0.3, help="Seconds the fake servers wait before answering")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to download the sources like the scripts did : blocking requests.get one after another, no session
+def sequentialFetch(urls):
+    for url in urls:
+        response = requests.get(url)
+        response.raise_for_status()
+
+# --------------------------------------------------
+# Function to download the sources like the fuel report does : every source at the same time, through a fresh cache
+def concurrentFetch(feeds, path, retries=0):
+    cache = SnapshotCache(path, maxAge=0, engine=FetchEngine(retries=retries, backoff=0.05))
+    results = asyncio.run(FuelReport.fetchSources(cache, feeds.url + alertPath, feeds.url + instantPath))
+    errors = [result for result, _ in results.values() if isinstance(result, Exception)]
+    if errors:
+        raise errors[0]
+    return results
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    feeds = FakeFeeds(makeStations(options.stations)).start()
+    feeds.delay = options.latency
+    FuelFinder_v2.exportURL = feeds.url + exportPath
+    urls = [feeds.url + alertPath, feeds.url + instantPath] + [FuelFinder_v2.URLForger([], where) for where in FuelFinder_v2.snapshotSlices()]
+    try:
+        with tempfile.TemporaryDirectory() as path:
+            sequential = timeit(lambda: sequentialFetch(urls))
+            concurrent = timeit(lambda: concurrentFetch(feeds, path))
+            print(f"[+] {len(urls)} requests, {options.latency}s of latency each")
+            print(f"[+] One after another : {sequential:.2f}s")
+            print(f"[+] Fetch engine      : {concurrent:.2f}s ({sequential / concurrent:.1f}x faster)")
+            for source, (_, seconds) in concurrentFetch(feeds, path).items():
+                print(f"\t[*] {source} : {seconds:.2f}s")
+
+        # Overloaded server : the first answers are 503
+        with tempfile.TemporaryDirectory() as path:
+            feeds.failures = 3
+            try:
+                sequentialFetch(urls)
+                print("[-] The blocking fetch went through the 503 answers")
+            except requests.exceptions.HTTPError as e:
+                print(f"[+] Blocking fetch with 3 answers 503 : failed ({str(e)[:40]}...)")
+            feeds.failures = 3
+            retried = timeit(lambda: concurrentFetch(feeds, path, retries=3))
+            print(f"[+] Fetch engine with 3 answers 503 : succeeded in {retried:.2f}s thanks to the retries")
+    finally:
+        feeds.stop()
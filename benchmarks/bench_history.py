@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, sys, tempfile, time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, paris
+from PriceHistory import PriceHistory
+from StationTable import StationTable, fuelNames
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_history.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations (about the national count)")
+    parser.add_argument("-d", "--days", dest="days", type=int, default=90, help="Number of days of history")
+    parser.add_argument("-s", "--snapshots", dest="snapshots", type=int, default=4, help="Snapshots ingested per day")
+    parser.add_argument("-c", "--change", dest="change", type=float, default=0.1, help="Share of the prices changing between two snapshots")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to make the successive snapshots of the stations as StationTables (prices drift, most stay the same)
+def snapshots(nbStations, days, perDay, change, seed=0):
+    rand = np.random.default_rng(seed)
+    stations = makeStations(nbStations, seed)
+    records = [{"id": station["id"], "adresse": station["adresse"], "cp": station["cp"], "ville": station["ville"]} for station in stations]
+    lat, lon = np.array([station["lat"] for station in stations]), np.array([station["lon"] for station in stations])
+    prices = {fuel: np.full(nbStations, np.nan) for fuel in fuelNames}
+    for row, station in enumerate(stations):
+        for fuel, _, _, value in station["prix"]:
+            prices[fuel][row] = value
+    start = np.datetime64('2024-01-01T00:00:00')
+    updates = {fuel: np.full(nbStations, start) for fuel in fuelNames}
+    for snapshot in range(days * perDay):
+        now = start + np.timedelta64(snapshot * 86400 // perDay, 's')
+        for fuel in fuelNames:
+            changed = rand.random(nbStations) < change
+            prices[fuel][changed] = np.round(prices[fuel][changed] + rand.normal(0, 0.02, changed.sum()), 3)
+            updates[fuel][changed] = now - rand.integers(0, 86400 // perDay, changed.sum()).astype('timedelta64[s]')
+        yield now, StationTable(lat, lon, {fuel: values.copy() for fuel, values in prices.items()}, records,
+                                updates={fuel: values.copy() for fuel, values in updates.items()})
+
+# --------------------------------------------------
+# Function to make a StationTable of one station selling SP95 only
+def oneStation(id, price, maj):
+    prices = {fuel: np.array([price if fuel == 'SP95' else np.nan]) for fuel in fuelNames}
+    return StationTable(np.array([paris[0]]), np.array([paris[1]]), prices, [{"id": id, "adresse": "", "cp": "75001", "ville": "Paris"}],
+                        updates={'SP95': np.array([maj], dtype='datetime64[s]')})
+
+# --------------------------------------------------
+# Function to get the size of a directory in MiB
+def directorySize(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 2 ** 20
+
+# --------------------------------------------------
+# Function to get the (min, max, last) price of a station from the in-memory log of every snapshot (price column by fuel)
+def bruteForce(log, station, fuel, since, until):
+    inEffect = sorted({(table['updates'][fuel][station], table[fuel][station]) for table in log if not np.isnan(table[fuel][station])})
+    before = [price for maj, price in inEffect if maj < since]
+    inside = ([before[-1]] if before else []) + [price for maj, price in inEffect if since <= maj < until]
+    return (min(inside), max(inside), inside[-1]) if inside else None
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    with tempfile.TemporaryDirectory() as path:
+        history = PriceHistory(path)
+        ingestTimes, added, log = [], 0, []
+        for now, stations in snapshots(options.stations, options.days, options.snapshots, options.change):
+            start = time.perf_counter()
+            added += history.ingest(stations, now)
+            ingestTimes.append(time.perf_counter() - start)
+            log.append({**{fuel: stations.prices[fuel][:20] for fuel in fuelNames},
+                        'updates': {fuel: stations.updates[fuel][:20] for fuel in fuelNames}})  # Kept for the check
+        rawRows = sum(int((~np.isnan(stations.prices[fuel])).sum()) for fuel in fuelNames) * len(ingestTimes)
+        print(f"[+] {len(ingestTimes)} snapshots of {options.stations} stations over {options.days} days")
+        print(f"[+] Ingestion : median {np.median(ingestTimes) * 1000:.1f} ms, max {max(ingestTimes) * 1000:.1f} ms per snapshot")
+        print(f"[+] Rows stored : {added} price changes instead of {rawRows} rows ({rawRows / max(added, 1):.1f}x less)")
+        print(f"[+] Store size : {directorySize(path):.1f} MiB in {len(history.partitions())} day partitions")
+
+        until = np.datetime64(now, 's')
+        since = until - np.timedelta64(7, 'D')
+        ids, _ = history.near(paris, 50)
+        areaTime, areaResult = timeit(lambda: history.aggregate(since, until, 'SP95', ids))
+        nationTime, nationResult = timeit(lambda: history.aggregate(until - np.timedelta64(30, 'D'), until, 'Gazole'))
+        dailyTime, days = timeit(lambda: history.daily(until - np.timedelta64(30, 'D'), until, 'SP95', ids))
+        print(f"[+] Last week, {len(ids)} stations around Paris : {areaTime * 1000:.1f} ms")
+        print(f"[+] Last 30 days, {len(nationResult['station'])} stations nationwide : {nationTime * 1000:.1f} ms")
+        print(f"[+] Daily trend over 30 days around Paris : {dailyTime * 1000:.1f} ms ({len(days)} days)")
+        start = np.datetime64('2024-01-01T00:00:00')
+        firstTime, _ = timeit(lambda: history.aggregate(start, start + np.timedelta64(7, 'D'), 'Gazole'))
+        _, firstDays = history.needed(start, start + np.timedelta64(7, 'D'))
+        assert len(firstDays) <= 8, "The partitions ingested after the period were read"
+        print(f"[+] First week, nationwide : {firstTime * 1000:.1f} ms ({len(firstDays)} of {len(history.partitions())} partitions read)")
+
+        # Cross-check the aggregates against the full in-memory log on the first stations
+        checked = 0
+        for fuel in fuelNames:
+            result = history.aggregate(since, until, fuel, [1000000 + row for row in range(20)])
+            for row in range(20):
+                expected = bruteForce(log, row, fuel, since, until)
+                found = np.flatnonzero(result['station'] == 1000000 + row)
+                if expected is None:
+                    assert not len(found), "A price was found for a fuel not sold"
+                    continue
+                found = found[0]
+                assert np.allclose((result['min'][found], result['max'][found], result['last'][found]), expected, atol=1e-6), "The aggregates differ"
+                checked += 1
+        print(f"[+] {checked} station/fuel aggregates checked against the full log")
+
+    # A change ingested after a checkpoint but updated before it (late maj, new station) must still be in effect
+    with tempfile.TemporaryDirectory() as path:
+        history = PriceHistory(path)
+        history.ingest(oneStation(1, 1.899, '2024-01-10T08:00'), '2024-01-10T09:00')
+        history.ingest(oneStation(2, 1.799, '2024-01-09T08:00'), '2024-01-11T09:00')
+        history.ingest(oneStation(3, 1.699, '2024-01-12T08:00'), '2024-01-12T09:00')
+        result = history.aggregate('2024-01-11T13:00', '2024-01-11T20:00', 'SP95')
+        assert result['station'].tolist() == [1, 2] and np.allclose(result['last'], [1.899, 1.799]), "A late update was lost"
+        assert history.needed('2024-01-10T10:00', '2024-01-11T00:00') == (None, ['2024-01-10', '2024-01-11']), "Wrong partitions read"
+        print("[+] Late update ingested the next day found")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, subprocess, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)  # Make the scripts importable
+import holidays
+import HolidayFinder
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_holidays.py")
+    parser.add_argument("-n", "--codes", dest="codes", type=int, default=50, help="Number of subdivisions planned (US states)")
+    parser.add_argument("-y", "--years", dest="years", type=int, default=10, help="Number of years planned from 2020")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=10, help="Script invocations timed (the result is extrapolated)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    codes = ["US-" + subdiv for subdiv in holidays.list_supported_countries()["US"]][:options.codes]
+    years = list(range(2020, 2020 + options.years))
+    combos = [(code, year) for code in codes for year in years]
+
+    # One invocation of the script per code and year, like a shell loop
+    sample = combos[::max(1, len(combos) // options.sample)][:options.sample]
+    scriptTime, _ = timeit(lambda: [subprocess.run([sys.executable, os.path.join(root, "HolidayFinder.py"), "-Y", str(year), "-C", code], check=True, capture_output=True) for code, year in sample])
+    scriptTime *= len(combos) / len(sample)
+
+    # One calendar per code and year, in this process
+    HolidayFinder.calendarOf.cache_clear()
+    yearlyTime, yearly = timeit(lambda: [row for code, year in combos for row in HolidayFinder.planCode(code, [year])])
+    HolidayFinder.calendarOf.cache_clear()
+    serialTime, serial = timeit(lambda: HolidayFinder.batchPlans(codes, years, workers=1))
+    HolidayFinder.calendarOf.cache_clear()
+    poolTime, pooled = timeit(lambda: HolidayFinder.batchPlans(codes, years))
+    cachedTime = min(timeit(lambda: HolidayFinder.batchPlans(codes, years, workers=1))[0] for _ in range(3))
+    assert yearly == serial == pooled, "The batch differs from the plans computed year by year"
+
+    print(f"[+] {len(codes)} subdivisions x {len(years)} years, {len(pooled)} ranges")
+    print(f"[+] One script invocation per code and year : {scriptTime:.2f}s (extrapolated from {len(sample)})")
+    print(f"[+] One calendar per code and year          : {yearlyTime:.2f}s")
+    print(f"[+] Batch, one calendar per code            : {serialTime:.2f}s")
+    print(f"[+] Batch in a process pool                 : {poolTime:.2f}s ({scriptTime / poolTime:.0f}x faster than the script loop, {os.cpu_count()} CPUs)")
+    print(f"[+] Batch again, calendars cached           : {cachedTime:.3f}s")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, ipaddress, os, random, sys, time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import SubnetCalculator
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_ipv6.py")
+    parser.add_argument("-n", "--subnets", dest="nbSubnets", type=int, default=1 << 16, help="Subnets enumerated from the start")
+    parser.add_argument("-p", "--pages", dest="pages", type=int, default=1000, help="Random pages read in a huge IPv6 split")
+    parser.add_argument("-c", "--count", dest="count", type=int, default=100, help="Subnets of each page")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to get the row of a subnet from its ipaddress object, like the former script
+def objectRow(i, subnet):
+    first, last = subnet.network_address, subnet.broadcast_address
+    address = ipaddress.ip_address if subnet.version == 4 else ipaddress.IPv6Address
+    return (i, str(first), str(last), f"{address((int(first) + 1) % (1 << subnet.max_prefixlen))} - {address((int(last) - 1) % (1 << subnet.max_prefixlen))}",
+            subnet.prefixlen, str(subnet.netmask), str(subnet.hostmask), subnet.num_addresses - 2)
+
+# --------------------------------------------------
+# Function to get the rows of the first subnets with ipaddress.subnets
+def objectRows(netIP, nbSubnets):
+    network = ipaddress.ip_network(netIP, strict=False)
+    return [objectRow(i, subnet) for i, subnet in enumerate(islice(network.subnets(new_prefix=SubnetCalculator.subnetPrefix(network.prefixlen, nbSubnets)), nbSubnets))]
+
+# --------------------------------------------------
+# Function to get a page of rows with ipaddress objects built at the offset (ipaddress.subnets can only start at the first one)
+def objectPage(netIP, nbSubnets, offset, count):
+    network = ipaddress.ip_network(netIP, strict=False)
+    prefix = SubnetCalculator.subnetPrefix(network.prefixlen, nbSubnets)
+    size = 1 << (network.max_prefixlen - prefix)
+    return [objectRow(i, ipaddress.ip_network((int(network.network_address) + i * size, prefix))) for i in range(offset, min(offset + count, nbSubnets))]
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+
+    for netIP in ("10.0.0.0/8", "2001:db8::/32"):
+        objectTime, expected = timeit(lambda: objectRows(netIP, options.nbSubnets))
+        integerTime, rows = timeit(lambda: list(SubnetCalculator.subnetRows(netIP, options.nbSubnets)))
+        assert rows == expected, f"The rows of {netIP} differ from ipaddress"
+        print(f"[+] {netIP} in {options.nbSubnets} subnets : ipaddress {objectTime:.2f}s, integers {integerTime:.2f}s ({objectTime / integerTime:.1f}x)")
+
+    # Pages at random offsets of 2001:db8::/32 in 2^64 subnets (/96)
+    netIP, nbSubnets = "2001:db8::/32", 1 << 64
+    offsets = [random.Random(0).randrange(nbSubnets) for _ in range(options.pages)]
+    objectTime, expected = timeit(lambda: [objectPage(netIP, nbSubnets, offset, options.count) for offset in offsets])
+    integerTime, pages = timeit(lambda: [list(SubnetCalculator.subnetRows(netIP, nbSubnets, offset, options.count)) for offset in offsets])
+    assert pages == expected, "The pages differ from ipaddress"
+    print(f"[+] {netIP} in 2^64 subnets, {options.pages} pages of {options.count} at random offsets : ipaddress {objectTime:.2f}s, integers {integerTime:.2f}s ({objectTime / integerTime:.1f}x)")
+    print(f"[+] Enumerating them from the start with ipaddress.subnets : ~{objectTime / (options.pages * options.count) * nbSubnets / 3.15e7:.0e} years")
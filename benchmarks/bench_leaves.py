@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, sys, time
+import numpy as np
+from datetime import date, timedelta
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import HolidayFinder
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_leaves.py")
+    parser.add_argument("-c", "--code", dest="code", default="FR", help="Country/state code of the calendar")
+    parser.add_argument("-y", "--year", dest="year", type=int, default=2024, help="Year planned")
+    parser.add_argument("-r", "--random", dest="random", type=int, default=300, help="Random small calendars checked against the brute force")
+    parser.add_argument("-d", "--dates", dest="dates", type=int, default=5000, help="Holidays given to makeRanges")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to score a choice of leaves : days off of the runs containing at least one leave
+def daysOff(workdays, taken):
+    off = ~workdays
+    off[list(taken)] = True
+    total, run, used = 0, 0, False
+    for day, isOff in enumerate(off.tolist() + [False]):
+        if isOff:
+            run, used = run + 1, used or day in taken
+        else:
+            total, run, used = total + (run if used else 0), 0, False
+    return total
+
+# --------------------------------------------------
+# Function to find the best score by trying every choice of at most leaves working days
+def bruteForce(workdays, leaves):
+    positions = np.flatnonzero(workdays).tolist()
+    return max(daysOff(workdays, set(taken)) for size in range(min(leaves, len(positions)) + 1) for taken in combinations(positions, size))
+
+# --------------------------------------------------
+# Function to calculate ranges like the former makeRanges (list of the items rebuilt for every holiday)
+def legacyRanges(dateList):
+    rangesCoeff = [(holiday.weekday(), 4 - holiday.weekday()) for holiday in dateList.values()]
+    rangesDates = []
+    for i in range(len(rangesCoeff)):
+        currentHoliday = list(dateList.items())[i][1]
+        startDay, endDay = currentHoliday - timedelta(days=rangesCoeff[i][0]), currentHoliday + timedelta(days=rangesCoeff[i][1])
+        if startDay == currentHoliday:
+            rangesDates.append((currentHoliday + timedelta(days=1), endDay))
+        elif endDay == currentHoliday:
+            rangesDates.append((startDay, currentHoliday - timedelta(days=1)))
+        else:
+            rangesDates.append((startDay, endDay))
+    return rangesDates
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    workdays = HolidayFinder.workdaysOf(options.year, options.code)
+
+    # Against the brute force : the real year with 1 and 2 leaves, random small calendars with up to 4 leaves
+    checkTime = time.perf_counter()
+    for leaves in (1, 2):
+        assert HolidayFinder.planLeaves(workdays, leaves)[0] == bruteForce(workdays, leaves), f"{leaves} leaves differ from the brute force"
+    rand = np.random.default_rng(0)
+    for _ in range(options.random):
+        small = rand.random(rand.integers(1, 25)) < 0.7
+        leaves = int(rand.integers(0, 5))
+        total, breaks = HolidayFinder.planLeaves(small, leaves)
+        assert total == bruteForce(small, leaves), f"{small.astype(int)} with {leaves} leaves differs from the brute force"
+        taken = {day for first, last, _ in breaks for day in range(first, last + 1) if small[day]}
+        assert len(taken) <= leaves and daysOff(small, taken) == total, "The breaks do not give the days off announced"
+    checkTime = time.perf_counter() - checkTime
+
+    print(f"[+] {options.code} {options.year} : {int(workdays.sum())} working days, brute force agrees ({options.random} random calendars, {checkTime:.1f}s)")
+    for leaves in (5, 10, 25, 50):
+        planTime, (total, breaks) = timeit(lambda: HolidayFinder.planLeaves(workdays, leaves))
+        print(f"[+] {leaves:>2} paid leaves => {total:>3} days off in {len(breaks):>2} breaks, planned in {planTime * 1000:.1f}ms")
+
+    dateList = {f"Holiday {i}": date(2000, 1, 3) + timedelta(days=i * 7 // 5) for i in range(options.dates)}
+    dateList = {name: day for name, day in dateList.items() if day.weekday() < 5}
+    legacyTime, legacy = timeit(lambda: legacyRanges(dateList))
+    rangesTime, ranges = timeit(lambda: HolidayFinder.makeRanges(dateList))
+    assert legacy == ranges, "makeRanges differs from the former one"
+    print(f"[+] makeRanges on {len(dateList)} holidays : {legacyTime:.2f}s before, {rangesTime * 1000:.1f}ms now")
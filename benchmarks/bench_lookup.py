@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, ipaddress, os, sys, tempfile, time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import SubnetCalculator
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_lookup.py")
+    parser.add_argument("-I", "--ip", dest="netIP", default="10.0.0.0/8", help="Block allocated")
+    parser.add_argument("-n", "--subnets", dest="nbSubnets", type=int, default=2000, help="Number of subnets of the VLSM plan")
+    parser.add_argument("-a", "--addresses", dest="addresses", type=int, default=10000000, help="Lines of the log")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=2000, help="Addresses looked up with ipaddress (the result is extrapolated)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to write a log with one address per line (80 % of them in the block), returns the addresses as integers
+# Every 100 lines, one address is written with leading zeros (decimal octets), one after an invalid one, and two lines have no valid address : they are not returned
+def writeLog(path, nbAddresses, netIP, seed=0):
+    rand = np.random.default_rng(seed)
+    start, mask, _ = SubnetCalculator.parseNetwork(netIP)
+    addresses = np.where(rand.random(nbAddresses) < 0.8, start + rand.integers(0, 1 << (32 - mask), nbAddresses), rand.integers(0, 1 << 32, nbAddresses))
+    edgeLines = {0: lambda address: ".".join(f"{octet:03d}" for octet in map(int, SubnetCalculator.toIP(address).split("."))),  # Leading zeros
+                 1: lambda address: "- - [10/Oct/2024:13:55:36 +0200] \"GET /health HTTP/1.1\" 200 2",  # No address
+                 2: lambda address: "300." + SubnetCalculator.toIP(address).split(".", 1)[1],  # Octet above 255
+                 3: lambda address: "1" + SubnetCalculator.toIP(address),  # 4 digits octet when the first one has 3, else a valid address
+                 4: lambda address: "1.2.3.256 999.1.2.3.4 " + SubnetCalculator.toIP(address)}  # Invalid ones first, then the one read
+    with open(path, "w") as log:
+        for begin in range(0, nbAddresses, 1 << 16):
+            log.write("".join(f'{edgeLines[i % 100](address) if i % 100 in edgeLines else SubnetCalculator.toIP(address)} - - [10/Oct/2024:13:55:36 +0200] "GET /index.html HTTP/1.1" 200 2326\n'
+                              for i, address in enumerate(addresses[begin:begin + (1 << 16)].tolist(), begin)))
+    return addresses
+
+# --------------------------------------------------
+# Function to get the address expected on a line of the log written above (None if it has none), read with ipaddress octet by octet
+def expectedAddress(i, address):
+    text = SubnetCalculator.toIP(address)
+    if i % 100 == 1 or i % 100 == 2:
+        return None
+    if i % 100 == 3:
+        text = "1" + text
+        if len(text.split(".")[0]) > 3:
+            return None
+    return int(ipaddress.IPv4Address(".".join(str(int(octet)) for octet in text.split("."))))
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    rand = np.random.default_rng(1)
+    hosts = rand.integers(1, 4000, options.nbSubnets).tolist()
+    planTime, subnets = timeit(lambda: SubnetCalculator.vlsmSubnets(options.netIP, hosts))
+    indexTime, index = timeit(lambda: SubnetCalculator.SubnetIndex(subnets))
+    print(f"[+] {len(subnets)} VLSM subnets in {options.netIP} : planned in {planTime * 1000:.1f}ms, indexed in {indexTime * 1000:.1f}ms")
+
+    with tempfile.TemporaryDirectory() as path:
+        logPath = os.path.join(path, "access.log")
+        addresses = writeLog(logPath, options.addresses, options.netIP)
+        size = os.path.getsize(logPath) / (1 << 20)
+
+        with open(logPath, encoding="latin-1") as log:
+            parseTime, parsed = timeit(lambda: np.concatenate([integers for _, integers in SubnetCalculator.readAddresses(log)]))
+        with open(logPath, encoding="latin-1") as log:
+            classifyTime, (counts, outside) = timeit(lambda: SubnetCalculator.classify(index, log, len(subnets)))
+    expected = [address for address in (expectedAddress(i, address) for i, address in enumerate(addresses.tolist())) if address is not None]
+    assert parsed.tolist() == expected, "The addresses read differ from ipaddress"
+    addresses = parsed
+    lookupTime, ids = timeit(lambda: index.lookupMany(addresses))
+    print(f"[+] {options.addresses} log lines ({size:.0f} MiB) : {int(counts.sum())} addresses in the subnets, {outside} in none")
+    print(f"[+] Streamed log -> counts       : {classifyTime:.1f}s ({options.addresses / classifyTime / 1e6:.2f}M addresses/s, {parseTime:.1f}s reading the addresses)")
+    print(f"[+] searchsorted on the integers : {lookupTime:.2f}s ({options.addresses / lookupTime / 1e6:.0f}M addresses/s)")
+
+    # One address at a time : bisect, then ipaddress checking every subnet
+    sample = addresses[:options.sample].tolist()
+    bisectTime, found = timeit(lambda: [index.lookup(address) for address in sample])
+    networks = [(i, ipaddress.ip_network(f"{SubnetCalculator.toIP(network)}/{prefix}")) for i, network, prefix in subnets]
+    linearTime, expected = timeit(lambda: [next((i for i, network in networks if ipaddress.ip_address(address) in network), None) for address in sample])
+    assert found == expected == [i if i >= 0 else None for i in ids[:len(sample)].tolist()], "The lookups differ from ipaddress"
+    assert int(counts.sum()) + outside == len(addresses) and (np.bincount(ids[ids >= 0], minlength=len(subnets)) == counts).all(), "The counts differ"
+    print(f"[+] bisect, one by one           : {bisectTime * options.addresses / len(sample):.1f}s (extrapolated from {len(sample)})")
+    print(f"[+] ipaddress over every subnet  : {linearTime * options.addresses / len(sample):.0f}s (extrapolated from {len(sample)})")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, contextlib, io, json, os, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeJsonStations
+import numpy as np
+import RowWriter, SubnetCalculator, FuelFinder_v2
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_output.py")
+    parser.add_argument("-n", "--subnets", dest="nbSubnets", type=int, default=1 << 20, help="Subnet rows written")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=1 << 16, help="Subnet rows built by tabulate (the result is extrapolated)")
+    parser.add_argument("-S", "--stations", dest="stations", type=int, default=11000, help="Stations printed (the national snapshot has ~11k)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to print the stations like the former script : one print per line, the prices as in the feed
+def legacyPrint(stations, rows):
+    for row in rows:
+        station = stations.records[row]
+        print("#----------#")
+        print("[+] Coordinates:")
+        print(f"\t[+] Latitude: {station['geom']['lat']}")
+        print(f"\t[+] Longitude: {station['geom']['lon']}")
+        print("[+] Address:")
+        print(f"\t[+] {station['adresse']}, {station['cp']} {station['ville']}")
+        print("[+] Prices:")
+        for fuel in json.loads(station['prix']):
+            print(f"\t[+] Name: {fuel['@nom']}")
+            print(f"\t[+] Update: {fuel['@maj']}")
+            print(f"\t[+] Price: {fuel['@valeur']}")
+            print("\t# ----- #")
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds, stdout sent to /dev/null
+def timeit(function):
+    with open(os.devnull, "w") as output, contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+# --------------------------------------------------
+# Function to get the memory peak of a call in MiB (traced apart : tracemalloc slows the call down)
+def peakOf(function):
+    with open(os.devnull, "w") as output, contextlib.redirect_stdout(output):
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        tracemalloc.stop()
+    return peak
+
+# --------------------------------------------------
+# Function to get what a call prints
+def printed(function):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        function()
+    return output.getvalue()
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    netIP = "10.0.0.0/8"
+    rows = lambda nbSubnets: SubnetCalculator.subnetRows(netIP, nbSubnets)
+
+    # Subnets : the former table was one tabulate string of every row
+    sample = min(options.sample, options.nbSubnets)
+    scale = options.nbSubnets / sample
+    tabulateTime = timeit(lambda: print(RowWriter.tableText(rows(sample), SubnetCalculator.columns)))
+    tabulatePeak = peakOf(lambda: print(RowWriter.tableText(rows(sample), SubnetCalculator.columns)))
+    print(f"[+] {netIP} in {options.nbSubnets} subnets")
+    print(f"[+] tabulate of the whole list : {tabulateTime * scale:.1f}s, {tabulatePeak * scale:.0f} MiB peak (extrapolated from {sample})")
+    print(f"[+] Rows only                  : {timeit(lambda: sum(1 for _ in rows(options.nbSubnets))):.1f}s")
+    for format in ("github", "csv", "jsonl"):
+        write = lambda nbSubnets: RowWriter.writeRows(rows(nbSubnets), SubnetCalculator.columns, format)
+        print(f"[+] Streamed {format:<6}            : {timeit(lambda: write(options.nbSubnets)):.1f}s, {peakOf(lambda: write(sample)):.1f} MiB peak (same for any count)")
+    assert printed(lambda: print(RowWriter.tableText(rows(1000), SubnetCalculator.columns))) == printed(lambda: RowWriter.writeRows(rows(1000), SubnetCalculator.columns, "github")), "The streamed table differs from tabulate"
+
+    # Stations : the former list was printed line by line
+    data = makeJsonStations(makeStations(options.stations))
+    for station in data:  # Feed order and strings kept by the text blocks : not the order of fuelNames, trailing zeros
+        station['prix'] = json.dumps([{**fuel, "@valeur": f"{float(fuel['@valeur']):.3f}"} for fuel in reversed(json.loads(station['prix']))])
+    stations = FuelFinder_v2.loadPumps(data)
+    stationRows = np.arange(len(stations))
+    legacyTime = timeit(lambda: legacyPrint(stations, stationRows))
+    print(f"\n[+] {len(stations)} stations")
+    print(f"[+] One print per line         : {legacyTime * 1000:.0f}ms")
+    for format in FuelFinder_v2.formats:
+        formatTime = timeit(lambda: FuelFinder_v2.printStations(stations, stationRows, format))
+        print(f"[+] {format:<6}                     : {formatTime * 1000:.0f}ms ({legacyTime / formatTime:.1f}x)")
+    assert printed(lambda: legacyPrint(stations, stationRows)) == printed(lambda: FuelFinder_v2.printStations(stations, stationRows)), "The text blocks differ"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, os, random, sys, tempfile, threading, time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()  # Fresh caches, read when the modules are imported
+from fixtures import makeStations, latRange, lonRange
+from fakefeeds import FakeFeeds, exportPath
+import FuelFinder_v2, FuelServer
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_server.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of stations of the fake feed")
+    parser.add_argument("-q", "--queries", dest="queries", type=int, default=2000, help="Number of queries sent")
+    parser.add_argument("-c", "--clients", dest="clients", type=int, default=8, help="Number of clients sending queries at the same time")
+    return parser.parse_args()
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    feeds = FakeFeeds(makeStations(options.stations)).start()
+    FuelFinder_v2.exportURL = feeds.url + exportPath
+
+    service = FuelServer.FuelService(refresh=1)
+    refresh = threading.Thread(target=service.refreshLoop, daemon=True)
+    refresh.start()
+    server = FuelServer.PooledHTTPServer(("127.0.0.1", 0), FuelServer.makeHandler(service), options.clients)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    rand = random.Random(3)
+    urls = [f"{base}/cheapest?lat={rand.uniform(*latRange)}&lon={rand.uniform(*lonRange)}&fuel={rand.choice(FuelServer.fuels)}&radius=20"
+            for _ in range(options.queries)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.clients) as executor:
+        answers = list(executor.map(lambda url: json.load(urlopen(url)), urls))
+    elapsed = time.perf_counter() - start
+
+    # A new snapshot published by the feed is swapped in by the background refresh
+    feeds.setStations(makeStations(options.stations // 2, seed=1))
+    time.sleep(2.5)
+    stats = json.load(urlopen(f"{base}/stats"))
+
+    # Coordinates out of range or not finite are refused like the other wrong parameters
+    for lat, lon in [("inf", "2.35"), ("48.85", "-inf"), ("nan", "2.35"), ("91", "2.35"), ("48.85", "1e300")]:
+        try:
+            urlopen(f"{base}/cheapest?lat={lat}&lon={lon}")
+            raise AssertionError(f"lat={lat}&lon={lon} was answered")
+        except HTTPError as e:
+            assert e.code == 400, f"lat={lat}&lon={lon} gave a {e.code}"
+
+    print(f"[+] {options.queries} queries from {options.clients} clients in {elapsed:.2f}s => {options.queries / elapsed:.0f} queries/sec (HTTP included)")
+    print(f"\t[*] Service latency p50 : {stats['p50Ms']} ms, p99 : {stats['p99Ms']} ms")
+    print(f"\t[*] Stations per answer : {sum(len(answer['stations']) for answer in answers) / len(answers):.1f}")
+    print(f"\t[*] After the feed changed : {stats['stations']} stations, snapshot age {stats['snapshotAge']}s")
+
+    # A disk error while refreshing is reported and the refresh goes on, the age is the one of the last download
+    fetchMany = FuelFinder_v2.fetchMany
+    def diskFull(*args):
+        raise OSError(28, "No space left on device")
+    FuelFinder_v2.fetchMany = diskFull
+    time.sleep(2.5)
+    FuelFinder_v2.fetchMany = fetchMany
+    age = json.load(urlopen(f"{base}/stats"))['snapshotAge']
+    assert refresh.is_alive() and age >= 2, f"The refresh stopped or the age ({age}s) is not the one of the download"
+    print(f"\t[*] After 2.5s of failed refreshes : refresh still running, snapshot age {age}s")
+    server.shutdown()
+    server.server_close()
+    service.stopped.set()
+    feeds.stop()
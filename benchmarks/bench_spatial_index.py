@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeJsonStations, latRange, lonRange
+from geopy.distance import great_circle
+import FuelFinder_v2
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_spatial_index.py")
+    parser.add_argument("-n", "--sizes", dest="sizes", nargs="*", type=int, default=[1000, 10000, 100000], help="Number of stations of each fake dataset")
+    parser.add_argument("-q", "--queries", dest="queries", type=int, default=20, help="Number of addresses to answer")
+    parser.add_argument("-D", "--distance", dest="dist", type=float, default=10, help="Radius of the queries in km")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to reproduce the former linear scan (one great_circle per pump)
+def linearScan(data, coords, dist):
+    return [pump for pump in data if great_circle((pump['geom']['lat'], pump['geom']['lon']), coords).kilometers <= dist]
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    rand = random.Random(1)
+    queries = [(rand.uniform(*latRange), rand.uniform(*lonRange)) for _ in range(options.queries)]
+
+    print(f"{'stations':>9} | {'scan/query (ms)':>15} | {'numpy/query (ms)':>16} | {'build (ms)':>10} | {'index/query (ms)':>16} | {'speedup':>7}")
+    for size in options.sizes:
+        data = makeJsonStations(makeStations(size))
+
+        start = time.perf_counter()
+        expected = [linearScan(data, coords, options.dist) for coords in queries]
+        scanTime = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        stations = FuelFinder_v2.loadPumps(data)
+        index = FuelFinder_v2.indexPumps(stations)
+        buildTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [[data[row] for row in FuelFinder_v2.registerNearPumps(stations, coords, options.dist)] for coords in queries]
+        numpyTime = (time.perf_counter() - start) / len(queries)
+        assert found == expected, "The vectorized scan does not return the same pumps as the linear scan"
+
+        start = time.perf_counter()
+        found = [[data[row] for row in FuelFinder_v2.registerNearPumps(stations, coords, options.dist, index)] for coords in queries]
+        indexTime = (time.perf_counter() - start) / len(queries)
+        assert found == expected, "The index does not return the same pumps as the linear scan"
+
+        print(f"{size:>9} | {scanTime * 1000:>15.2f} | {numpyTime * 1000:>16.3f} | {buildTime * 1000:>10.1f} | {indexTime * 1000:>16.3f} | {scanTime / indexTime:>6.0f}x")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, compileall, json, os, statistics, subprocess, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+script = os.path.join(root, "HolidayFinder.py")
+launcher = os.path.join(root, "udscripts.py")
+env = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}  # Cold starts of an installed script use the .pyc
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_startup.py")
+    parser.add_argument("-r", "--runs", dest="runs", type=int, default=5, help="Runs of each command (the median is kept)")
+    parser.add_argument("-t", "--top", dest="top", type=int, default=6, help="Slowest imports shown for each command")
+    parser.add_argument("-O", "--output", dest="output", help="JSON file to save the results in, to compare them across commits")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to run a command with -X importtime, returns (seconds, {top-level module: cumulative ms})
+def importTimes(args):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, capture_output=True, text=True, env=env, cwd=root)
+    seconds = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # Imported by the script itself, not by another module
+            modules[name.strip()] = int(cumulative) / 1000
+    return seconds, modules
+
+# --------------------------------------------------
+# Function to measure a command, returns (median seconds, imports of the last run)
+def measure(args, runs):
+    results = [importTimes(args) for _ in range(runs)]
+    return statistics.median(seconds for seconds, _ in results), results[-1][1]
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    compileall.compile_dir(root, maxlevels=0, quiet=1)
+    sys.path.insert(0, root)
+    import udscripts
+
+    commands = {"Eager imports + pycountry lookup (before)": ["-c", "import pycountry, holidays, tabulate, numpy, concurrent.futures; pycountry.subdivisions.get(code='US-CA')"],
+                "Code validation only": [script, "-Y", "2024", "-C", "US-ZZ"],
+                "Table of one code": [script, "-Y", "2024", "-C", "US-CA"],
+                "Leave plan (numpy)": [script, "-Y", "2024", "-C", "US-CA", "-L", "10"],
+                "Batch CSV of 3 codes x 2 years": [script, "-Y", "2024", "2025", "-C", "US-CA", "US-NY", "FR", "-W", "1"]}
+    commands.update({f"udscripts {tool} -h": [launcher, tool, "-h"] for tool in udscripts.tools})  # Cold start of each subcommand, up to its args
+    commands["python -c pass"] = ["-c", "pass"]  # Interpreter alone
+    results = {}
+    for label, args in commands.items():
+        seconds, modules = measure(args, options.runs)
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:options.top]
+        results[label] = {"seconds": seconds, "imports": dict(slowest)}
+        print(f"[+] {label} : {seconds * 1000:.0f}ms")
+        print("\t" + ", ".join(f"{name} {ms:.0f}ms" for name, ms in slowest))
+
+    if options.output is not None:
+        with open(options.output, "w") as output:
+            json.dump({"python": sys.version.split()[0], "runs": options.runs, "commands": results}, output, indent=2)
+        print(f"[+] Results written in {options.output}")
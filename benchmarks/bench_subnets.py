@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, ipaddress, os, sys, time, tracemalloc
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import RowWriter, SubnetCalculator
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_subnets.py")
+    parser.add_argument("-I", "--ip", dest="netIP", default="10.0.0.0/8", help="Network cut")
+    parser.add_argument("-n", "--subnets", dest="nbSubnets", type=int, default=1 << 20, help="Number of subnets")
+    parser.add_argument("-s", "--sample", dest="sample", type=int, default=1 << 15, help="Subnets built with ipaddress + tabulate (the result is extrapolated)")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to build the table like the former script : every ipaddress subnet in a list, then one tabulate string
+def legacyTable(netIP, nbSubnets):
+    network = ipaddress.ip_network(netIP, strict=False)
+    subnets = list(network.subnets(new_prefix=SubnetCalculator.subnetPrefix(network.prefixlen, nbSubnets)))
+    subnetInfo = {column: [] for column in SubnetCalculator.columns}
+    for i, subnet in enumerate(subnets[:nbSubnets]):
+        for column, value in zip(SubnetCalculator.columns, (str(i), subnet.network_address, subnet.broadcast_address, f"{subnet.network_address + 1} - {subnet.broadcast_address - 1}",
+                                                             subnet.prefixlen, str(subnet.netmask), str(subnet.hostmask), subnet.num_addresses - 2)):
+            subnetInfo[column].append(value)
+    return tabulate(subnetInfo, headers="keys", tablefmt="github")
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+# --------------------------------------------------
+# Function to get the memory peak of a call in MiB (traced apart : tracemalloc slows the call down)
+def peakOf(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return peak
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    sample = min(options.sample, options.nbSubnets)
+
+    legacyTime, legacyPeak = timeit(lambda: legacyTable(options.netIP, sample)), peakOf(lambda: legacyTable(options.netIP, sample))
+    scale = options.nbSubnets / sample
+    print(f"[+] {options.netIP} in {options.nbSubnets} subnets (/{SubnetCalculator.subnetPrefix(options.netIP.split('/')[1], options.nbSubnets)})")
+    print(f"[+] ipaddress list + tabulate : {legacyTime * scale:.1f}s, {legacyPeak * scale:.0f} MiB peak (extrapolated from {sample})")
+
+    with open(os.devnull, "w") as output:
+        for format in ("csv", "jsonl"):
+            stream = lambda nbSubnets: RowWriter.streamRows(output, SubnetCalculator.subnetRows(options.netIP, nbSubnets), SubnetCalculator.columns, format)
+            print(f"[+] Streamed {format:<5}              : {timeit(lambda: stream(options.nbSubnets)):.1f}s, {peakOf(lambda: stream(sample)):.1f} MiB peak (same for any count)")
+        print(f"[+] Rows only                 : {timeit(lambda: sum(1 for _ in SubnetCalculator.subnetRows(options.netIP, options.nbSubnets))):.1f}s")
+
+    # Same text as ipaddress for the first subnets
+    assert legacyTable(options.netIP, 1000) == RowWriter.tableText(SubnetCalculator.subnetRows(options.netIP, 1000), SubnetCalculator.columns), "The table differs from the ipaddress one"
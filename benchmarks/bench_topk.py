@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, os, random, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+import FuelFinder
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_topk.py")
+    parser.add_argument("-n", "--sizes", dest="sizes", nargs="*", type=int, default=[10000, 100000, 1000000], help="Number of candidate pumps")
+    parser.add_argument("-k", "--top", dest="top", type=int, default=3, help="Number of pumps kept")
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to produce candidate offers one by one, like pumpOrdering does
+def offers(nbOffers, seed=0):
+    rand = random.Random(seed)
+    for i in range(nbOffers):
+        yield {"Address": f"{i} RUE DE LA STATION", "Latitude": 48.8, "Longitude": 2.3,
+               "Data": {"Last MAJ": f"2023-11-{rand.randint(1, 30):02d}T{rand.randint(0, 23):02d}:00:00", "Fuel": "SP95",
+                        "Price": round(rand.uniform(1.1, 2.1), 3)},
+               "Distance (km)": round(rand.uniform(0, 20), 2)}
+
+# --------------------------------------------------
+# Function to reproduce the former ascOrder (materialize then sort everything)
+def legacyAscOrder(nearPumpList, top):
+    return sorted(list(nearPumpList), key=lambda x: x['Data']['Price'])[:top]
+
+# --------------------------------------------------
+# Function to get the peak of traced memory of a call in MiB
+def peakMemory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+# --------------------------------------------------
+# Function to get the time of a call in seconds
+def timeit(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    print(f"{'offers':>9} | {'sort (s)':>8} | {'top-K (s)':>9} | {'combined (s)':>12} | {'sort peak (MiB)':>15} | {'top-K peak (MiB)':>16}")
+    for size in options.sizes:
+        candidates = list(offers(size))  # Generated beforehand so only the selection is timed
+        sortTime, expected = timeit(lambda: legacyAscOrder(iter(candidates), options.top))
+        topTime, found = timeit(lambda: FuelFinder.ascOrder(iter(candidates), options.top))
+        combinedTime, _ = timeit(lambda: FuelFinder.ascOrder(iter(candidates), options.top, "combined"))
+        assert [x['Data']['Price'] for x in found] == [x['Data']['Price'] for x in expected], "Both selections differ"
+        del candidates
+        # Memory on the real stream : offers are produced while they are selected
+        sortPeak = peakMemory(lambda: legacyAscOrder(offers(size), options.top))
+        topPeak = peakMemory(lambda: FuelFinder.ascOrder(offers(size), options.top))
+        print(f"{size:>9} | {sortTime:>8.3f} | {topTime:>9.3f} | {combinedTime:>12.3f} | {sortPeak:>15.1f} | {topPeak:>16.3f}")
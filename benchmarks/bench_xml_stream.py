@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, json, os, resource, subprocess, sys, tempfile, time, zipfile
+
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeXmlZip, paris
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/bench_xml_stream.py")
+    parser.add_argument("-n", "--sizes", dest="sizes", nargs="*", type=int, default=[10000, 50000, 200000], help="Number of stations of each fake feed")
+    parser.add_argument("-D", "--distance", dest="dist", type=float, default=5, help="Radius of the query in km")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ZIPFILE"), help=argparse.SUPPRESS)  # Internal: run one measure
+    return parser.parse_args()
+
+# --------------------------------------------------
+# Function to read the peak resident memory of this process in MiB
+def peakRss():
+    try:
+        with open("/proc/self/status") as status:  # VmHWM is reset on exec, unlike ru_maxrss
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# --------------------------------------------------
+# Function to measure one path in the current (fresh) process
+def measure(mode, zipPath, dist):
+    import FuelFinder
+    with open(zipPath, "rb") as file:
+        content = file.read()  # Stands for the response bytes
+    baseline = peakRss()
+    start = time.perf_counter()
+    if mode == "legacy":  # Former path: extract on disk, parse the whole tree, then filter
+        with tempfile.TemporaryDirectory() as folder:
+            zipfile.ZipFile(BytesIO(content)).extractall(folder)
+            pumps = FuelFinder.registerPumps(os.path.join(folder, FuelFinder.member), paris, dist)
+            count = len(pumps)
+    else:  # Streaming path: decompress and filter on the fly
+        with zipfile.ZipFile(BytesIO(content)).open(FuelFinder.member) as xmlFile:
+            count = sum(1 for _ in FuelFinder.streamPumps(xmlFile, paris, dist))
+    elapsed = time.perf_counter() - start
+    peak = peakRss()
+    return {"mode": mode, "found": count, "seconds": elapsed, "peakRssMiB": peak, "deltaRssMiB": peak - baseline}
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    if options.child:
+        print(json.dumps(measure(options.child[0], options.child[1], options.dist)))
+        sys.exit()
+
+    print(f"{'stations':>9} | {'mode':>6} | {'found':>5} | {'time (s)':>8} | {'peak RSS (MiB)':>14} | {'parse RSS (MiB)':>15}")
+    for size in options.sizes:
+        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as file:
+            file.write(makeXmlZip(makeStations(size)))
+        try:
+            for mode in ("legacy", "stream"):  # Each measure runs in its own process to get a clean peak RSS
+                output = subprocess.run([sys.executable, __file__, "--child", mode, file.name, "-D", str(options.dist)],
+                                        capture_output=True, text=True, check=True).stdout
+                result = json.loads(output)
+                print(f"{size:>9} | {mode:>6} | {result['found']:>5} | {result['seconds']:>8.3f} | {result['peakRssMiB']:>14.1f} | {result['deltaRssMiB']:>15.1f}")
+        finally:
+            os.remove(file.name)
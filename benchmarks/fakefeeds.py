@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, hashlib, json, os, re, sys, threading, time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeXmlZip, makeJsonStations, makeAlertPage
+from GeoIndex import haversine
+
+############################# [ VARIABLES ] #############################
+
+exportPath = "/api/explore/v2.1/catalog/datasets/prix-des-carburants-en-france-flux-instantane-v2/exports/json"
+instantPath = "/opendata/instantane"
+alertPath = "/alerte"
+withinPattern = re.compile(r"within_distance\(geom, geom'POINT\(([-\d.e]+) ([-\d.e]+)\)', ([\d.]+)km\)")
+startsPattern = re.compile(r'startswith\(cp, "(\w*)"\)')
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to tell if an export station matches a where clause of the subset of ODSQL the finders use
+def matchWhere(station, where):
+    match = withinPattern.fullmatch(where)
+    if match:
+        lon, lat, dist = map(float, match.groups())
+        return station.get("geom") is not None and haversine(lat, lon, station["geom"]["lat"], station["geom"]["lon"]) <= dist
+    match = startsPattern.fullmatch(where)
+    if match:
+        return (station.get("cp") or "").startswith(match.group(1))
+    if where == "cp is null":
+        return not station.get("cp")
+    raise ValueError(f"Unsupported where clause: {where}")
+
+# --------------------------------------------------
+# Class to serve fake versions of the fuel feeds (roulez-eco zip + data.economie.gouv.fr export + alert page) on localhost
+class FakeFeeds:
+    def __init__(self, stations, port=0, alertPage=None):
+        self.hits = []  # [(path, query, rows sent), ...]
+        self.setStations(stations)
+        self.alertPage = alertPage if alertPage is not None else makeAlertPage(3)
+        self.delay = 0  # Seconds waited before each answer (latency of a real server)
+        self.failures = 0  # Number of next requests answered 503
+        feeds = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                time.sleep(feeds.delay)
+                if feeds.failures > 0:  # Fail like an overloaded server
+                    feeds.failures -= 1
+                    feeds.hits.append((url.path, url.query, 503))
+                    self.send_error(503)
+                    return
+                if url.path == alertPath:
+                    body, rows = feeds.alertPage, 1
+                elif url.path == instantPath:
+                    body, rows = feeds.zip, len(feeds.stations)
+                elif url.path == exportPath:
+                    rows = feeds.export(parse_qs(url.query))
+                    body = json.dumps(rows).encode()
+                    rows = len(rows)
+                else:
+                    self.send_error(404)
+                    return
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                feeds.hits.append((url.path, url.query, rows))
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # Keep the console quiet
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    # Function to change the data served (e.g. a new snapshot)
+    def setStations(self, stations):
+        self.stations = stations
+        self.exportRows = makeJsonStations(stations)
+        self.zip = makeXmlZip(stations)
+
+    # Function to answer an export query (refine / where / limit)
+    def export(self, query):
+        rows = self.exportRows
+        for refine in query.get("refine", []):
+            field, value = refine.split(":", 1)
+            rows = [row for row in rows if value.strip('"') in (row.get(field) or [])]
+        for where in query.get("where", []):
+            rows = [row for row in rows if matchWhere(row, where)]
+        limit = int(query.get("limit", ["-1"])[0])
+        return rows if limit < 0 else rows[:limit]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("python3 benchmarks/fakefeeds.py")
+    parser.add_argument("-n", "--stations", dest="stations", type=int, default=11000, help="Number of fake stations")
+    parser.add_argument("-p", "--port", dest="port", type=int, default=8086, help="Port to listen on")
+    options = parser.parse_args()
+    feeds = FakeFeeds(makeStations(options.stations), options.port)
+    print(f"[+] Export : {feeds.url}{exportPath}")
+    print(f"[+] Zip    : {feeds.url}{instantPath}")
+    print(f"[+] Alerts : {feeds.url}{alertPath}")
+    try:
+        feeds.server.serve_forever()
+    except KeyboardInterrupt:
+        feeds.server.server_close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import json, random, zipfile
+
+from io import BytesIO
+
+############################# [ VARIABLES ] #############################
+
+fuels = ['Gazole', 'SP95', 'E85', 'GPLc', 'E10', 'SP98']
+latRange = (42.3, 51.1)  # Metropolitan France bounding box
+lonRange = (-4.8, 8.2)
+paris = (48.8566, 2.3522)
+
+############################# [ FUNCTIONS ] #############################
+
+# Function to make a list of fake stations {id, lat, lon, cp, ville, adresse, prix: [(nom, maj, valeur)]}
+def makeStations(nbStations, seed=0):
+    rand = random.Random(seed)  # Same seed => same fixture
+    stations = []
+    for i in range(nbStations):
+        prices = []
+        for fuelId, fuel in enumerate(fuels):
+            if rand.random() < 0.6:  # Not every station sells every fuel
+                prices.append((fuel, fuelId + 1, f"2023-11-{rand.randint(1, 30):02d}T{rand.randint(0, 23):02d}:{rand.randint(0, 59):02d}:00",
+                               round(rand.uniform(1.1, 2.1), 3)))
+        stations.append({"id": 1000000 + i,
+                         "lat": rand.uniform(*latRange),
+                         "lon": rand.uniform(*lonRange),
+                         "cp": f"{rand.randint(1, 95):02d}{rand.randint(0, 999):03d}",
+                         "ville": f"VILLE {i % 5000}",
+                         "adresse": f"{rand.randint(1, 300)} RUE DE LA STATION {i}",
+                         "prix": prices})
+    return stations
+
+# --------------------------------------------------
+# Function to render stations the way the roulez-eco instantane XML feed does
+def makeXmlFeed(stations):
+    lines = ['<?xml version="1.0" encoding="ISO-8859-1" standalone="yes"?>', '<pdv_liste>']
+    for station in stations:
+        lines.append(f'  <pdv id="{station["id"]}" latitude="{round(station["lat"] * 10 ** 5)}" '
+                     f'longitude="{round(station["lon"] * 10 ** 5)}" cp="{station["cp"]}" pop="R">')
+        lines.append(f'    <adresse>{station["adresse"]}</adresse>')
+        lines.append(f'    <ville>{station["ville"]}</ville>')
+        lines.append('    <services><service>Boutique alimentaire</service><service>Station de gonflage</service></services>')
+        for name, fuelId, maj, value in station["prix"]:
+            lines.append(f'    <prix nom="{name}" id="{fuelId}" maj="{maj}" valeur="{value}"/>')
+        lines.append('  </pdv>')
+    lines.append('</pdv_liste>')
+    return "\n".join(lines).encode("iso-8859-1")
+
+# --------------------------------------------------
+# Function to zip the XML feed like the roulez-eco endpoint serves it
+def makeXmlZip(stations):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip:
+        zip.writestr("PrixCarburants_instantane.xml", makeXmlFeed(stations))
+    return buffer.getvalue()
+
+# --------------------------------------------------
+# Function to render stations the way the data.economie.gouv.fr JSON export does
+def makeJsonStations(stations):
+    return [{"id": station["id"],
+             "geom": {"lon": station["lon"], "lat": station["lat"]},
+             "adresse": station["adresse"],
+             "cp": station["cp"],
+             "ville": station["ville"],
+             "carburants_disponibles": [name for name, _, _, _ in station["prix"]],
+             "prix": json.dumps([{"@nom": name, "@id": str(fuelId), "@maj": maj.replace("T", " "), "@valeur": str(value)}
+                                 for name, fuelId, maj, value in station["prix"]])}
+            for station in stations]
+
+# --------------------------------------------------
+# Function to make a list of fake addresses with their coordinates {address: (lat, lon)}
+def makeAddresses(nbAddresses, seed=0):
+    rand = random.Random(seed)
+    return {f"{i} place de la mairie, ville {i}": (rand.uniform(*latRange), rand.uniform(*lonRange)) for i in range(nbAddresses)}
+
+# --------------------------------------------------
+# Function to render a page like carburant-prix-coutant.fr : the alert section, then the rest of the site (padding blocks)
+def makeAlertPage(nbAlerts, padding=200, seed=0):
+    rand = random.Random(seed)
+    brands = ["Leclerc", "Carrefour", "Intermarché", "Auchan", "Total", "Système U"]
+    lines = ['<!DOCTYPE html>', '<html lang="fr">', '<head><meta charset="utf-8"><title>Carburant à prix coûtant</title></head>', '<body>',
+             '<header><nav><ul>' + "".join(f'<li><a href="/page-{i}">Page {i}</a></li>' for i in range(10)) + '</ul></nav></header>',
+             '<section class="container" id="alerte">']
+    for i in range(nbAlerts):
+        brand = rand.choice(brands)
+        lines.append(f'  <div class="feature col"><h3 class="fs-2">Opération {brand}</h3>'
+                     f'<p>Carburant à prix coûtant du {rand.randint(1, 28)}/11 au {rand.randint(1, 28)}/12 dans les stations {brand}.</p>'
+                     f'<a href="https://www.example.com/{brand.lower()}/{i}" class="btn">Voir</a></div>')
+    lines.append('</section>')
+    for i in range(padding):  # Articles, comments and scripts after the alerts
+        lines.append(f'<section class="container" id="article-{i}"><div class="feature col"><h3>Article {i}</h3>'
+                     f'<p>{"Le prix du carburant évolue chaque jour. " * 10}</p><a href="/article-{i}">Lire</a></div></section>')
+    lines.append('<footer><script>var tracking = {"id": 42};</script></footer></body></html>')
+    return "\n".join(lines).encode("utf-8")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, cProfile, io, json, os, pstats, random, re, statistics, subprocess, sys, tempfile, time, tracemalloc, zipfile
+from datetime import date, timedelta
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the scripts importable
+from fixtures import makeStations, makeXmlFeed, makeXmlZip, makeJsonStations, makeAlertPage, paris
+import numpy as np
+import BlendPlanner, FeedDelta, FuelE85Ratio, FuelFinder, FuelFinder_v2, HolidayFinder, LowPriceFuel, PriceHistory, RowWriter, SubnetCalculator
+
+############################# [ VARIABLES ] #############################
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+stationSizes = [1000, 20000, 200000]  # From a few departments to a national snapshot x 20
+dist = 20  # km around Paris, the largest distance the scripts accept
+cases = {}  # {name: (setup, sizes)}, setup(size, folder) builds the fixture and returns the call to time
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args
+def getArgs():
+    parser = argparse.ArgumentParser("python3 benchmarks/harness.py")
+    parser.add_argument("-k", "--keyword", nargs="+", dest="keywords", help="Run only the cases containing one of these words (e.g. 'FuelFinder_v2 subnet')")
+    parser.add_argument("-r", "--repeat", dest="repeat", type=int, default=5, help="Runs of each case (the best one is kept, the mean is saved too)")
+    parser.add_argument("-q", "--quick", dest="quick", action="store_true", help="Smallest size of each case only")
+    parser.add_argument("-O", "--output", dest="output", help="JSON file to save the results in")
+    parser.add_argument("-C", "--compare", dest="compare", help="JSON file of a former run (another commit) to compare with")
+    parser.add_argument("--profile", dest="profile", help="Folder to dump the cProfile stats (.prof) and the top functions/allocations (.txt) of each case in")
+    parser.add_argument("-l", "--list", dest="list", action="store_true", help="List the cases and their sizes")
+    options = parser.parse_args()
+
+    if options.repeat < 1:
+        parser.error("\n    [-] Error in the command : please specify a number of runs above 0")
+    return options
+
+# --------------------------------------------------
+# Function to register a case of the harness
+def case(name, sizes):
+    def register(setup):
+        cases[name] = (setup, sizes)
+        return setup
+    return register
+
+# --------------------------------------------------
+# Fixtures shared by the cases, built once per size
+@lru_cache(maxsize=None)
+def stationsOf(size):
+    return makeStations(size)
+
+@lru_cache(maxsize=None)
+def exportOf(size):
+    return makeJsonStations(stationsOf(size))
+
+@lru_cache(maxsize=None)
+def tableOf(size):
+    return FuelFinder_v2.loadPumps(exportOf(size))
+
+@lru_cache(maxsize=None)
+def xmlOf(size, folder):
+    path = os.path.join(folder, f"feed-{size}.xml")
+    with open(path, "wb") as file:
+        file.write(makeXmlFeed(stationsOf(size)))
+    return path
+
+# --------------------------------------------------
+# Function to make a holiday calendar of several years {name: date}, about 11 of them on weekdays each year (no holidays package)
+def makeCalendar(nbYears, seed=0):
+    rand = random.Random(seed)
+    calendar = {}
+    for year in range(2000, 2000 + nbYears):
+        for i in range(11):
+            day = date(year, 1, 1) + timedelta(days=rand.randrange(365))
+            calendar[f"Holiday {i} {year}"] = day
+    return calendar
+
+# --------------------------------------------------
+# Cases : FuelFinder, roulez-eco XML feed
+@case("FuelFinder.registerPumps", stationSizes)
+def registerPumpsCase(size, folder):
+    path = xmlOf(size, folder)
+    return lambda: FuelFinder.registerPumps(path, paris, dist)
+
+@case("FuelFinder.streamPumps", stationSizes)
+def streamPumpsCase(size, folder):
+    content = makeXmlZip(stationsOf(size))
+    def stream():
+        with zipfile.ZipFile(io.BytesIO(content)).open(FuelFinder.member) as xmlFile:
+            return list(FuelFinder.streamPumps(xmlFile, paris, dist))
+    return stream
+
+@case("FuelFinder.main stream (streamPumps -> circlePumps -> ascOrder)", stationSizes)
+def streamOrderCase(size, folder):
+    content = makeXmlZip(stationsOf(size))
+    def stream():
+        with zipfile.ZipFile(io.BytesIO(content)).open(FuelFinder.member) as xmlFile:
+            zonePumps = FuelFinder.circlePumps(FuelFinder.streamPumps(xmlFile, paris, dist), paris, dist)
+            return FuelFinder.ascOrder(FuelFinder.pumpOrdering(zonePumps, "SP95", paris))
+    return stream
+
+@case("FuelFinder.circleFilter", stationSizes)
+def circleFilterCase(size, folder):
+    pumps = FuelFinder.registerPumps(xmlOf(size, folder), paris, dist)
+    return lambda: FuelFinder.circleFilter(pumps, paris, dist)
+
+@case("FuelFinder.ascOrder (every pump)", stationSizes)
+def pumpAscOrderCase(size, folder):
+    pumps = list(FuelFinder.registerPumps(xmlOf(size, folder), paris, 1e4))  # The whole country
+    return lambda: FuelFinder.ascOrder(FuelFinder.pumpOrdering(pumps, "SP95", paris), 10)
+
+# --------------------------------------------------
+# Cases : FuelFinder_v2, data.economie.gouv.fr JSON export
+@case("FuelFinder_v2.mergeSlices", stationSizes)
+def mergeSlicesCase(size, folder):
+    data, paths = exportOf(size), []
+    for i in range(4):  # Overlapping slices, like the ones of the departments
+        paths.append(os.path.join(folder, f"slice-{size}-{i}.json"))
+        with open(paths[-1], "w") as file:
+            json.dump(data[i * len(data) // 4:(i + 1) * len(data) // 4 + len(data) // 100], file)
+    return lambda: FuelFinder_v2.mergeSlices(paths)
+
+@case("FuelFinder_v2.loadPumps", stationSizes)
+def loadPumpsCase(size, folder):
+    data = exportOf(size)
+    return lambda: FuelFinder_v2.loadPumps(data)
+
+@case("FuelFinder_v2.indexPumps", stationSizes)
+def indexPumpsCase(size, folder):
+    stations = tableOf(size)
+    return lambda: FuelFinder_v2.indexPumps(stations)
+
+@case("FuelFinder_v2.registerNearPumps", stationSizes)
+def registerNearPumpsCase(size, folder):
+    stations = tableOf(size)
+    index = FuelFinder_v2.indexPumps(stations)
+    return lambda: FuelFinder_v2.registerNearPumps(stations, paris, dist, index)
+
+@case("FuelFinder_v2.ascOrder (every station)", stationSizes)
+def ascOrderCase(size, folder):
+    stations = tableOf(size)
+    rows = np.arange(len(stations))
+    return lambda: FuelFinder_v2.ascOrder(stations, rows, "SP95")
+
+@case("FuelFinder_v2.printStations csv", stationSizes)
+def printStationsCase(size, folder):
+    stations = tableOf(size)
+    rows = np.arange(len(stations))
+    def write():
+        with open(os.devnull, "w") as output:
+            stdout, sys.stdout = sys.stdout, output
+            try:
+                FuelFinder_v2.printStations(stations, rows, "csv")
+            finally:
+                sys.stdout = stdout
+    return write
+
+@case("FeedDelta.LiveStations.apply (2% changed)", stationSizes)
+def applyCase(size, folder):
+    data = exportOf(size)
+    changed = [dict(station) for station in data]
+    for station in changed[::50]:
+        station["prix"] = station["prix"].replace('"@valeur": "1', '"@valeur": "2')
+    live = FeedDelta.LiveStations()
+    live.apply(data)
+    snapshots = [changed, data]
+    def apply():  # Every call applies the other snapshot : always the same delta
+        snapshots.reverse()
+        return live.apply(snapshots[0])
+    return apply
+
+@case("BlendPlanner.planBlends", stationSizes)
+def planBlendsCase(size, folder):
+    stations = tableOf(size)
+    rows = np.arange(len(stations))
+    return lambda: BlendPlanner.planBlends(stations, rows, 0.2, 50, 0.5, 0.7)
+
+@case("PriceHistory.ingest", stationSizes)
+def ingestCase(size, folder):
+    stations = tableOf(size)
+    return lambda: PriceHistory.PriceHistory(tempfile.mkdtemp(dir=folder)).ingest(stations, "2023-12-01T12:00:00")
+
+# --------------------------------------------------
+# Cases : LowPriceFuel, carburant-prix-coutant.fr page
+@case("LowPriceFuel.parseAlerts stream", [10, 100, 1000])
+def streamAlertsCase(size, folder):
+    html = makeAlertPage(size)
+    return lambda: LowPriceFuel.parseAlerts(html, "stream")
+
+@case("LowPriceFuel.parseAlerts soup", [10, 100, 1000])
+def soupAlertsCase(size, folder):
+    html = makeAlertPage(size)
+    return lambda: LowPriceFuel.parseAlerts(html, "soup")
+
+# --------------------------------------------------
+# Cases : FuelE85Ratio, vehicles
+@case("FuelE85Ratio.solve", [1000, 100000, 1000000])
+def solveCase(size, folder):
+    rand = np.random.default_rng(0)
+    vehicles = rand.random(size), rand.uniform(30, 80, size), rand.uniform(0.3, 0.8, size), rand.choice([0.05, 0.1], size)
+    return lambda: FuelE85Ratio.solve(*vehicles)
+
+# --------------------------------------------------
+# Cases : SubnetCalculator, large CIDR splits
+@case("SubnetCalculator.subnetCalc", [1 << 10, 1 << 16, 1 << 20])
+def subnetCalcCase(size, folder):
+    return lambda: SubnetCalculator.subnetCalc("10.0.0.0/8", size)
+
+@case("SubnetCalculator.subnetRows IPv6", [1 << 10, 1 << 16, 1 << 20])
+def subnetRowsCase(size, folder):
+    return lambda: sum(1 for _ in SubnetCalculator.subnetRows("2001:db8::/32", size))
+
+@case("SubnetCalculator.vlsmSubnets", [100, 2000, 20000])
+def vlsmCase(size, folder):
+    hosts = np.random.default_rng(1).integers(1, 200, size).tolist()
+    return lambda: SubnetCalculator.vlsmSubnets("10.0.0.0/8", hosts)
+
+@case("SubnetCalculator.SubnetIndex.lookupMany", [10000, 1000000, 10000000])
+def lookupCase(size, folder):
+    index = SubnetCalculator.SubnetIndex(SubnetCalculator.vlsmSubnets("10.0.0.0/8", np.random.default_rng(1).integers(1, 4000, 2000).tolist()))
+    addresses = np.random.default_rng(2).integers(10 << 24, 11 << 24, size)
+    return lambda: index.lookupMany(addresses)
+
+@case("RowWriter.streamRows csv (subnets)", [1 << 10, 1 << 16, 1 << 20])
+def streamRowsCase(size, folder):
+    def write():
+        with open(os.devnull, "w") as output:
+            return RowWriter.streamRows(output, SubnetCalculator.subnetRows("10.0.0.0/8", size), SubnetCalculator.columns, "csv")
+    return write
+
+# --------------------------------------------------
+# Cases : HolidayFinder, multi-year calendars
+@case("HolidayFinder.makeRanges", [1, 100, 1000])
+def makeRangesCase(size, folder):
+    calendar = makeCalendar(size)
+    return lambda: HolidayFinder.makeRanges(calendar)
+
+@case("HolidayFinder.planLeaves (25 leaves)", [1, 10, 100])
+def planLeavesCase(size, folder):
+    calendar = makeCalendar(size)
+    firstDay = date(2000, 1, 1)
+    workdays = np.ones((date(2000 + size, 1, 1) - firstDay).days, dtype=bool)
+    workdays[(5 - firstDay.weekday()) % 7::7] = workdays[(6 - firstDay.weekday()) % 7::7] = False  # Weekends
+    workdays[[(day - firstDay).days for day in calendar.values()]] = False
+    return lambda: HolidayFinder.planLeaves(workdays, 25)
+
+@case("HolidayFinder.planCode FR (holidays package)", [1, 10, 100])
+def planCodeCase(size, folder):
+    def plan():
+        HolidayFinder.calendarOf.cache_clear()  # The calendar is built by each call
+        return HolidayFinder.planCode("FR", list(range(2000, 2000 + size)))
+    return plan
+
+# --------------------------------------------------
+# Function to get the times of several runs of a call in seconds, after a warm-up run (lazy imports, first allocations)
+def measure(function, repeat):
+    function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+# --------------------------------------------------
+# Function to profile one run of a call : cProfile stats dumped, top functions and allocations written as text, returns the memory peak in MiB
+def profile(function, path):
+    profiler = cProfile.Profile()
+    profiler.runcall(function)
+    profiler.dump_stats(path + ".prof")
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(20)
+
+    tracemalloc.start()  # Apart from cProfile : both slow the call down
+    function()
+    snapshot, peak = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    text.write(f"\nMemory peak : {peak:.1f} MiB, largest allocations still alive at the end :\n")
+    text.write("".join(f"{stat}\n" for stat in snapshot.statistics("lineno")[:10]))
+    with open(path + ".txt", "w") as file:
+        file.write(text.getvalue())
+    return peak
+
+# --------------------------------------------------
+# Function to get the short hash of the commit benchmarked (None out of a git repository)
+def commitOf():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=root, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    options = getArgs()
+    selected = {name: (setup, sizes[:1] if options.quick else sizes) for name, (setup, sizes) in cases.items()
+                if options.keywords is None or any(keyword.lower() in name.lower() for keyword in options.keywords)}
+    if options.list:
+        for name, (_, sizes) in selected.items():
+            print(f"[*] {name} : {', '.join(map(str, sizes))}")
+        sys.exit()
+
+    former = {}
+    if options.compare is not None:
+        with open(options.compare) as file:
+            former = json.load(file)["results"]
+    if options.profile is not None:
+        os.makedirs(options.profile, exist_ok=True)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, (setup, sizes) in selected.items():
+            results[name] = {}
+            for size in sizes:
+                function = setup(size, folder)
+                times = measure(function, options.repeat)
+                result = {"best": min(times), "mean": statistics.mean(times), "runs": len(times)}
+                line = f"[+] {name} [{size}] : {result['best'] * 1000:.2f}ms (mean {result['mean'] * 1000:.2f}ms)"
+                if options.profile is not None:
+                    result["peakMiB"] = profile(function, os.path.join(options.profile, re.sub(r"\W+", "_", name) + f"-{size}"))
+                    line += f", {result['peakMiB']:.1f} MiB peak"
+                old = former.get(name, {}).get(str(size))
+                if old is not None:
+                    line += f", {old['best'] / result['best']:.2f}x vs {old['best'] * 1000:.2f}ms before"
+                results[name][str(size)] = result
+                print(line, flush=True)
+
+    if options.output is not None:
+        with open(options.output, "w") as output:
+            json.dump({"commit": commitOf(), "python": sys.version.split()[0], "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "repeat": options.repeat, "results": results}, output, indent=2)
+        print(f"[+] Results written in {options.output}")
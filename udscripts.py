@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+############################# [ IMPORTS ] #############################
+
+import argparse, importlib, sys
+# The script of a tool is imported once it is chosen : only its own dependencies are loaded
+
+############################# [ VARIABLES ] #############################
+
+tools = {"fuel": ("FuelFinder_v2", "main", "Cheapest stations around addresses (data.economie.gouv.fr export)"),
+         "fuel-xml": ("FuelFinder", "printPumps", "Cheapest stations around an address (roulez-eco XML feed)"),
+         "alerts": ("LowPriceFuel", "main", "Fuel at cost operations of carburant-prix-coutant.fr"),
+         "report": ("FuelReport", "main", "Stations and alerts of every source fetched at once"),
+         "server": ("FuelServer", "main", "HTTP server answering the station queries from one snapshot"),
+         "history": ("PriceHistory", "main", "Price history of the stations, recorded at each snapshot"),
+         "e85": ("FuelE85Ratio", "main", "Liters of E85 and E5/E10 to reach an ethanol percentage"),
+         "blend": ("BlendPlanner", "main", "Cheapest E85 blend around an address"),
+         "holidays": ("HolidayFinder", "main", "Paid leaves around the public holidays of a country/state"),
+         "subnet": ("SubnetCalculator", "main", "Subnets of a network, VLSM plans and address lookups")}  # {tool: (script, function, description)}
+
+############################# [ FUNCTIONS ] #############################
+
+# Handling the args, the ones after the tool are its own
+def getArgs(argv=None):
+    parser = argparse.ArgumentParser("udscripts", description="Run one of the scripts : udscripts <tool> [options of the tool]",
+                                     epilog="Tools:\n" + "\n".join(f"  {tool:<10}{description}" for tool, (_, _, description) in tools.items()),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tool", help="Tool to run ('udscripts <tool> -h' for its options)", choices=tools, metavar="tool")
+    parser.add_argument("args", help=argparse.SUPPRESS, nargs=argparse.REMAINDER)
+    return parser.parse_args(argv)
+
+# --------------------------------------------------
+# Main function
+def main(argv=None):
+    options = getArgs(argv)
+    module, function, _ = tools[options.tool]
+    sys.argv = [f"udscripts {options.tool}"] + options.args  # Read by the getArgs of the script
+    getattr(importlib.import_module(module), function)()
+
+
+############################# [ LAUNCH ] #############################
+
+if __name__ == "__main__":
+    main()